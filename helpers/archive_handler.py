@@ -0,0 +1,177 @@
+import datetime
+import gzip
+import json
+import os
+import re
+import threading
+
+
+class ArchiveHandler:
+    """
+    Append-only archive of the raw fetched pages, stored as compressed segments alongside a url index.
+
+    Each page is written as an independent gzip member appended to the current segment, similarly to WARC.gz files,
+    hence any page can be read back on its own by seeking to its offset. Segments are rotated once they exceed
+    segment_bytes. The index is a JSON-lines file mapping each url to its segment, offset and length; a url fetched
+    several times resolves to its latest copy and a torn trailing line is ignored.
+
+    Attributes
+    ----------
+        INDEX               Name of the index file within the archive's directory
+        directory           Directory holding the segments and the index
+        segment_bytes       Size after which a new segment is started
+        __segment           Number of the segment being appended to
+        __file              Segment file opened for appending, opened on the first record
+        __index_file        Index file opened for appending, opened on the first record
+        __lock              Serializes the writes of concurrent workers
+
+    Methods
+    -------
+        record(url, html):
+            Appends a fetched page to the archive.
+        load_index():
+            Returns the location of the latest copy of each archived url.
+        read_record(directory, location):
+            Reads a single archived page.
+        parse_record(directory, location, parse, *args):
+            Reads a single archived page and passes it to a parser, meant to run within worker processes.
+        close():
+            Closes the segment and index files.
+    """
+
+    INDEX = 'index.jsonl'
+
+    def __init__(self, directory='archive', segment_bytes=64 * 1024 ** 2):
+        """
+        :param str directory: Specify the directory holding the segments and the index
+        :param int segment_bytes: Specify the size after which a new segment is started
+        """
+
+        if not isinstance(segment_bytes, int) or segment_bytes < 1:
+            raise ValueError('segment_bytes must be a positive integer')
+
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.__file = None
+        self.__index_file = None
+        self.__lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+        # Appends to the last segment of a previous run
+        segments = [int(match.group(1)) for match in
+                    (re.fullmatch(r'segment-(\d+)\.gz', name) for name in os.listdir(directory)) if match]
+        self.__segment = max(segments, default=1)
+
+    @staticmethod
+    def __get_segment_path(directory, segment):
+        """
+        Returns the path of a segment.
+
+        :param str directory: Specify the archive's directory
+        :param int segment: Specify the segment's number
+        :return: The segment's path
+        """
+
+        return os.path.join(directory, f'segment-{segment:05d}.gz')
+
+    def record(self, url, html):
+        """
+        Appends a fetched page to the archive.
+
+        :param str url: Specify the page's url
+        :param str html: Specify the page's HTML
+        """
+
+        member = gzip.compress(html.encode('utf-8'))
+
+        with self.__lock:
+            if self.__file is None:
+                self.__file = open(ArchiveHandler.__get_segment_path(self.directory, self.__segment), 'ab')
+
+            if self.__file.tell() >= self.segment_bytes:
+                self.__file.close()
+                self.__segment += 1
+                self.__file = open(ArchiveHandler.__get_segment_path(self.directory, self.__segment), 'ab')
+
+            if self.__index_file is None:
+                self.__index_file = open(os.path.join(self.directory, ArchiveHandler.INDEX), 'a', encoding='utf-8')
+
+            offset = self.__file.tell()
+            self.__file.write(member)
+            self.__file.flush()
+
+            # The index line is written once the page is flushed, so it never points to a missing page
+            self.__index_file.write(json.dumps({'url': url, 'segment': self.__segment, 'offset': offset,
+                                                'length': len(member),
+                                                'fetched_at': str(datetime.datetime.utcnow())}) + '\n')
+            self.__index_file.flush()
+
+    def load_index(self):
+        """
+        Returns the location of the latest copy of each archived url.
+
+        :return: A dictionary mapping each url to its segment, offset, length and fetched_at
+        """
+
+        path = os.path.join(self.directory, ArchiveHandler.INDEX)
+        index = {}
+
+        if not os.path.exists(path):
+            return index
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    location = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be torn if the previous run was killed while writing it
+                    continue
+
+                index[location.pop('url')] = location
+
+        return index
+
+    @staticmethod
+    def read_record(directory, location):
+        """
+        Reads a single archived page.
+
+        :param str directory: Specify the archive's directory
+        :param dict location: Specify the page's location, as returned by load_index
+        :return: The page's HTML
+        """
+
+        with open(ArchiveHandler.__get_segment_path(directory, location['segment']), 'rb') as f:
+            f.seek(location['offset'])
+            member = f.read(location['length'])
+
+        return gzip.decompress(member).decode('utf-8')
+
+    @staticmethod
+    def parse_record(directory, location, parse, *args):
+        """
+        Reads a single archived page and passes it to a parser, meant to run within worker processes.
+
+        :param str directory: Specify the archive's directory
+        :param dict location: Specify the page's location, as returned by load_index
+        :param parse: Specify a PageParser method
+        :param args: Specify the parser's extra arguments following the page's HTML
+        :return: Whatever parse returns
+        """
+
+        return parse(ArchiveHandler.read_record(directory, location), *args)
+
+    def close(self):
+        """
+        Closes the segment and index files.
+        """
+
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+            if self.__index_file is not None:
+                self.__index_file.close()
+                self.__index_file = None
@@ -0,0 +1,161 @@
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+
+
+class CheckpointHandler:
+    """
+    Append-only journal durably recording the completed units of a crawl alongside their parsed rows.
+
+    Each completed unit is written as one JSON line and flushed to disk before the crawl moves on, hence a crawl
+    killed halfway loses at most the unit in flight. A torn trailing line is ignored when the journal is loaded.
+
+    Attributes
+    ----------
+        path                Path of the journal file
+        __file              Journal file opened for appending, opened on the first record
+        __lock              Serializes the writes of concurrent workers
+
+    Methods
+    -------
+        encode_rows(rows):
+            Converts parsed rows into JSON serializable rows.
+        decode_rows(rows):
+            Converts rows produced by encode_rows back into the parsed rows.
+        load():
+            Reads the units recorded by a previous run.
+        record(key, rows):
+            Durably appends a completed unit and its rows to the journal.
+        close():
+            Closes the journal file, keeping it on disk.
+        discard():
+            Closes and deletes the journal file once the crawl's output is safely stored.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: Specify the path of the journal file
+        """
+
+        self.path = path
+        self.__file = None
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __encode(value):
+        """
+        Converts a row value into a JSON serializable value.
+
+        :param value: Specify the row value
+        :return: A JSON serializable value
+        """
+
+        if isinstance(value, datetime.datetime):
+            return {'__datetime__': value.isoformat()}
+
+        # Thread ids coming from a cached snapshot are numpy integers
+        if isinstance(value, np.generic):
+            return value.item()
+
+        return value
+
+    @staticmethod
+    def __decode(value):
+        """
+        Converts a value produced by __encode back into the row value.
+
+        :param value: Specify the JSON value
+        :return: The row value
+        """
+
+        if isinstance(value, dict) and '__datetime__' in value:
+            return datetime.datetime.fromisoformat(value['__datetime__'])
+
+        return value
+
+    @staticmethod
+    def encode_rows(rows):
+        """
+        Converts parsed rows into JSON serializable rows.
+
+        :param list rows: Specify the parsed rows
+        :return: A list of JSON serializable rows
+        """
+
+        return [[CheckpointHandler.__encode(value) for value in row] for row in rows]
+
+    @staticmethod
+    def decode_rows(rows):
+        """
+        Converts rows produced by encode_rows back into the parsed rows.
+
+        :param list rows: Specify the JSON rows
+        :return: A list of parsed rows
+        """
+
+        return [[CheckpointHandler.__decode(value) for value in row] for row in rows]
+
+    def load(self):
+        """
+        Reads the units recorded by a previous run.
+
+        :return: A dictionary mapping each recorded key to its rows
+        """
+
+        units = {}
+
+        if not os.path.exists(self.path):
+            return units
+
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    unit = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be torn if the previous run was killed while writing it
+                    continue
+
+                units[unit['key']] = CheckpointHandler.decode_rows(unit['rows'])
+
+        return units
+
+    def record(self, key, rows):
+        """
+        Durably appends a completed unit and its rows to the journal.
+
+        :param str key: Specify the unit's key
+        :param list rows: Specify the unit's parsed rows
+        """
+
+        line = json.dumps({'key': key, 'rows': CheckpointHandler.encode_rows(rows)})
+
+        with self.__lock:
+            if self.__file is None:
+                self.__file = open(self.path, 'a', encoding='utf-8')
+
+            self.__file.write(line + '\n')
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+
+    def close(self):
+        """
+        Closes the journal file, keeping it on disk.
+        """
+
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+    def discard(self):
+        """
+        Closes and deletes the journal file once the crawl's output is safely stored.
+        """
+
+        self.close()
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,111 @@
+import concurrent.futures
+import threading
+import urllib.parse
+
+from helpers.progress_handler import ProgressHandler
+
+
+class FetchHandler:
+    """
+    Concurrent page fetching engine backed by a bounded thread pool.
+
+    Attributes
+    ----------
+        MAX_WORKERS         Default maximum number of requests in flight at once
+        PER_HOST            Default maximum number of requests in flight at once against a single host
+        max_workers         Maximum number of requests in flight at once
+        per_host            Maximum number of requests in flight at once against a single host
+        __host_limits       Semaphores limiting the requests in flight per host
+        __lock              Guards the creation of the per-host semaphores
+
+    Methods
+    -------
+        fetch_all(fetch, urls, show_progress=True, progress=None):
+            Fetches every url concurrently and returns the results in the same order as the urls.
+    """
+
+    MAX_WORKERS = 8
+    PER_HOST = 4
+
+    def __init__(self, max_workers=MAX_WORKERS, per_host=PER_HOST):
+        """
+        :param int max_workers: Specify the maximum number of requests in flight at once
+        :param int per_host: Specify the maximum number of requests in flight at once against a single host
+        """
+
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError('max_workers must be a positive integer')
+
+        if not isinstance(per_host, int) or per_host < 1:
+            raise ValueError('per_host must be a positive integer')
+
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.__host_limits = {}
+        self.__lock = threading.Lock()
+
+    def __get_host_limit(self, url):
+        """
+        Returns the semaphore limiting the requests in flight against the url's host.
+
+        :param str url: Specify the requested url
+        :return: A semaphore
+        """
+
+        host = urllib.parse.urlsplit(url).netloc
+
+        with self.__lock:
+            if host not in self.__host_limits:
+                self.__host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self.__host_limits[host]
+
+    def __fetch(self, fetch, url):
+        """
+        Calls fetch on the url while holding the host's semaphore.
+
+        :param fetch: Specify a callable receiving a url
+        :param str url: Specify the requested url
+        :return: Whatever fetch returns
+        """
+
+        with self.__get_host_limit(url):
+            return fetch(url)
+
+    def fetch_all(self, fetch, urls, show_progress=True, progress=None):
+        """
+        Fetches every url concurrently and returns the results in the same order as the urls.
+
+        Progress is reported as pages complete, regardless of the order in which they complete.
+
+        :param fetch: Specify a callable receiving a url and returning its result
+        :param list urls: Specify the urls to fetch
+        :param bool show_progress: Prints the progress of the urls as they complete
+        :param ProgressHandler progress: Specify the tracker advanced by each completed url, e.g. a task spanning
+                                         several calls, None tracks the urls of this call alone
+        :return: A list of results, ordered as urls
+        """
+
+        urls = list(urls)
+        results = [None] * len(urls)
+
+        if not urls:
+            return results
+
+        owned = show_progress and progress is None
+        if owned:
+            progress = ProgressHandler(total=len(urls))
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.__fetch, fetch, url): i for i, url in enumerate(urls)}
+
+                for future in concurrent.futures.as_completed(futures):
+                    results[futures[future]] = future.result()
+
+                    if show_progress:
+                        progress.advance(item=urls[futures[future]])
+        finally:
+            if owned:
+                progress.close()
+
+        return results
@@ -0,0 +1,322 @@
+import bisect
+import datetime
+import json
+import math
+import os
+import threading
+import time
+
+
+class MetricsHandler:
+    """
+    Thread-safe registry of the counters, gauges and histograms describing a crawl, exported through pluggable sinks.
+
+    A series is named after its metric and optional labels, e.g. responses_total{status="200"}. Sinks are callables
+    receiving a snapshot of every series; they are called by flush, which runs at most once per interval as the
+    metrics are recorded and once more at the end of each crawl. Collectors are callables returning extra gauges
+    (e.g. the session counters) evaluated on each snapshot.
+
+    Attributes
+    ----------
+        BUCKETS             Upper bounds of the histograms' buckets, in seconds
+        interval            Minimum number of seconds between two automatic flushes
+        sinks               Callables receiving each flushed snapshot
+        __collectors        Callables returning extra gauges
+        __counters          Value of each counter series
+        __gauges            Value of each gauge series
+        __histograms        Bucket counts, sum and count of each histogram series
+        __flushed_at        Time of the last flush
+        __lock              Guards the series
+        __flush_lock        Serializes the flushes, so a sink is never called concurrently
+
+    Methods
+    -------
+        increment(name, value=1, labels=None):
+            Adds a value to a counter.
+        set(name, value, labels=None):
+            Sets a gauge.
+        add(name, value, labels=None):
+            Adds a value to a gauge, e.g. +1 once an item is queued and -1 once it is dequeued.
+        observe(name, value, labels=None):
+            Records a value into a histogram.
+        add_collector(collect):
+            Registers a callable returning extra gauges.
+        snapshot():
+            Returns the current value of every series.
+        flush():
+            Passes a snapshot to every sink.
+        reset():
+            Nullifies every series.
+        to_prometheus(snapshot, namespace='forum_scraper'):
+            Formats a snapshot in the Prometheus text exposition format.
+        prometheus_sink(path, namespace='forum_scraper'):
+            Returns a sink rewriting a Prometheus text file, e.g. for node_exporter's textfile collector.
+        json_lines_sink(path):
+            Returns a sink appending each snapshot to a JSON lines file.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, sinks=None, interval=10.0):
+        """
+        :param list sinks: Specify the callables receiving each flushed snapshot, None only keeps the metrics in memory
+        :param float interval: Specify the minimum number of seconds between two automatic flushes
+        """
+
+        if not isinstance(interval, (int, float)) or interval < 0:
+            raise ValueError('interval must be a non-negative number')
+
+        self.interval = interval
+        self.sinks = list(sinks or [])
+        self.__collectors = []
+        self.__counters = {}
+        self.__gauges = {}
+        self.__histograms = {}
+        self.__flushed_at = time.monotonic()
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+
+    @staticmethod
+    def __get_series(name, labels=None):
+        """
+        Returns the name of a series, appending its labels.
+
+        :param str name: Specify the metric's name
+        :param dict labels: Specify the series' labels
+        :return: The series' name
+        """
+
+        if not labels:
+            return name
+
+        return name + '{' + ','.join(f'{key}="{value}"' for key, value in sorted(labels.items())) + '}'
+
+    def __maybe_flush(self):
+        """
+        Flushes the metrics if the interval elapsed since the last flush.
+        """
+
+        if not self.sinks:
+            return
+
+        now = time.monotonic()
+        with self.__lock:
+            if now - self.__flushed_at < self.interval:
+                return
+            self.__flushed_at = now
+
+        self.flush()
+
+    def increment(self, name, value=1, labels=None):
+        """
+        Adds a value to a counter.
+
+        :param str name: Specify the counter's name, ending with _total by convention
+        :param float value: Specify the non-negative value to add
+        :param dict labels: Specify the series' labels
+        """
+
+        series = MetricsHandler.__get_series(name, labels)
+
+        with self.__lock:
+            self.__counters[series] = self.__counters.get(series, 0) + value
+
+        self.__maybe_flush()
+
+    def set(self, name, value, labels=None):
+        """
+        Sets a gauge.
+
+        :param str name: Specify the gauge's name
+        :param float value: Specify the value
+        :param dict labels: Specify the series' labels
+        """
+
+        series = MetricsHandler.__get_series(name, labels)
+
+        with self.__lock:
+            self.__gauges[series] = value
+
+        self.__maybe_flush()
+
+    def add(self, name, value, labels=None):
+        """
+        Adds a value to a gauge, e.g. +1 once an item is queued and -1 once it is dequeued.
+
+        :param str name: Specify the gauge's name
+        :param float value: Specify the value to add, negative to subtract
+        :param dict labels: Specify the series' labels
+        """
+
+        series = MetricsHandler.__get_series(name, labels)
+
+        with self.__lock:
+            self.__gauges[series] = self.__gauges.get(series, 0) + value
+
+        self.__maybe_flush()
+
+    def observe(self, name, value, labels=None):
+        """
+        Records a value into a histogram.
+
+        :param str name: Specify the histogram's name, ending with its unit by convention (e.g. _seconds)
+        :param float value: Specify the value
+        :param dict labels: Specify the series' labels
+        """
+
+        series = MetricsHandler.__get_series(name, labels)
+        bucket = bisect.bisect_left(MetricsHandler.BUCKETS, value)
+
+        with self.__lock:
+            if series not in self.__histograms:
+                self.__histograms[series] = {'buckets': [0] * (len(MetricsHandler.BUCKETS) + 1), 'sum': 0.0,
+                                             'count': 0}
+
+            histogram = self.__histograms[series]
+            histogram['buckets'][bucket] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+        self.__maybe_flush()
+
+    def add_collector(self, collect):
+        """
+        Registers a callable returning extra gauges, evaluated on each snapshot.
+
+        :param collect: Specify a callable returning a dictionary mapping series' names to numbers
+        """
+
+        with self.__lock:
+            self.__collectors.append(collect)
+
+    def snapshot(self):
+        """
+        Returns the current value of every series, the histograms' buckets being cumulative as in Prometheus.
+
+        :return: A dictionary holding the timestamp, the counters, the gauges and the histograms
+        """
+
+        with self.__lock:
+            counters = dict(self.__counters)
+            gauges = dict(self.__gauges)
+            histograms = {series: {'buckets': list(histogram['buckets']), 'sum': histogram['sum'],
+                                   'count': histogram['count']}
+                          for series, histogram in self.__histograms.items()}
+            collectors = list(self.__collectors)
+
+        for collect in collectors:
+            gauges.update({series: value for series, value in collect().items()
+                           if isinstance(value, (int, float)) and not isinstance(value, bool)})
+
+        for histogram in histograms.values():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip([*MetricsHandler.BUCKETS, math.inf], histogram['buckets']):
+                cumulative += count
+                buckets['+Inf' if bound == math.inf else str(bound)] = cumulative
+            histogram['buckets'] = buckets
+
+        return {'timestamp': str(datetime.datetime.utcnow()), 'counters': counters, 'gauges': gauges,
+                'histograms': histograms}
+
+    def flush(self):
+        """
+        Passes a snapshot to every sink.
+        """
+
+        if not self.sinks:
+            return
+
+        with self.__flush_lock:
+            snapshot = self.snapshot()
+
+            with self.__lock:
+                self.__flushed_at = time.monotonic()
+
+            for sink in self.sinks:
+                sink(snapshot)
+
+    def reset(self):
+        """
+        Nullifies every series.
+        """
+
+        with self.__lock:
+            self.__counters = {}
+            self.__gauges = {}
+            self.__histograms = {}
+
+    @staticmethod
+    def to_prometheus(snapshot, namespace='forum_scraper'):
+        """
+        Formats a snapshot in the Prometheus text exposition format.
+
+        :param dict snapshot: Specify the snapshot, as returned by snapshot
+        :param str namespace: Specify the prefix of the series' names
+        :return: The formatted text
+        """
+
+        def split(series):
+            name, _, labels = series.partition('{')
+            return f'{namespace}_{name}', labels.rstrip('}')
+
+        def join(name, labels, extra=''):
+            labels = ','.join(label for label in [labels, extra] if label)
+            return f'{name}{{{labels}}}' if labels else name
+
+        lines = []
+        typed = set()
+
+        for kind, group in [('counter', snapshot['counters']), ('gauge', snapshot['gauges'])]:
+            for series, value in sorted(group.items()):
+                name, labels = split(series)
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f'# TYPE {name} {kind}')
+                lines.append(f'{join(name, labels)} {value}')
+
+        for series, histogram in sorted(snapshot['histograms'].items()):
+            name, labels = split(series)
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} histogram')
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{join(f"{name}_bucket", labels, f"le={json.dumps(bound)}")} {count}')
+            lines.append(f'{join(f"{name}_sum", labels)} {histogram["sum"]}')
+            lines.append(f'{join(f"{name}_count", labels)} {histogram["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def prometheus_sink(path, namespace='forum_scraper'):
+        """
+        Returns a sink rewriting a Prometheus text file, e.g. for node_exporter's textfile collector.
+
+        :param str path: Specify the file's path, conventionally ending with .prom
+        :param str namespace: Specify the prefix of the series' names
+        :return: A callable receiving a snapshot
+        """
+
+        def sink(snapshot):
+            # Scrapers never read a half written file, since it is replaced at once
+            temporary_path = f'{path}.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as f:
+                f.write(MetricsHandler.to_prometheus(snapshot, namespace=namespace))
+            os.replace(temporary_path, path)
+
+        return sink
+
+    @staticmethod
+    def json_lines_sink(path):
+        """
+        Returns a sink appending each snapshot to a JSON lines file.
+
+        :param str path: Specify the file's path, conventionally ending with .jsonl
+        :return: A callable receiving a snapshot
+        """
+
+        def sink(snapshot):
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(snapshot) + '\n')
+
+        return sink
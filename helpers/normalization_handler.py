@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+
+class NormalizationHandler:
+    """
+    Set of static methods that normalize whole scraped columns at once, rather than row by row.
+
+    Attributes
+    ----------
+        ISO_FORMAT          Format of the ISO 8601 datetimes of the forum's time tags
+        JOIN_DATE_FORMAT    Format of the users' join dates
+        __multipliers       Multiplier of each abbreviated number's suffix
+
+    Methods
+    -------
+        expand_numbers(series):
+            Converts abbreviated numbers (e.g. 1.2K, 3M or 1,234) into numbers.
+        parse_datetimes(series, date_format=ISO_FORMAT):
+            Converts date strings of the given format into UTC datetimes.
+        derive_date_parts(series, parts=('year', 'month', 'day')):
+            Extracts the given parts of each datetime.
+        derive_age(series, now=None):
+            Returns the number of whole days elapsed since each datetime.
+        truncate_text(series, length, ellipsis='..'):
+            Shortens the strings longer than length, appending the ellipsis.
+    """
+
+    ISO_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+    JOIN_DATE_FORMAT = '%b %d, %Y'
+
+    __multipliers = {'': 1, 'K': 10 ** 3, 'M': 10 ** 6}
+
+    @staticmethod
+    def expand_numbers(series):
+        """
+        Converts abbreviated numbers (e.g. 1.2K, 3M or 1,234) into numbers, rounding the expanded fractions.
+
+        Counters repeat a lot, hence only their distinct values go through the string kernels.
+
+        :param pd.Series series: Specify the series of strings or numbers
+        :return: A series of floats, NaN where the value is missing or not a number
+        """
+
+        codes, uniques = pd.factorize(series)
+
+        parts = pd.Series(uniques, dtype=object).astype(str) \
+            .str.replace(',', '', regex=False) \
+            .str.strip() \
+            .str.upper() \
+            .str.extract(r'^(\d+(?:\.\d+)?)([KM]?)$')
+
+        numbers = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float)
+        suffixes = parts[1].fillna('').to_numpy(dtype=object)
+
+        multipliers = np.select([suffixes == suffix for suffix in NormalizationHandler.__multipliers],
+                                list(NormalizationHandler.__multipliers.values()), default=np.nan)
+
+        # Missing values are coded -1, which picks the trailing NaN
+        values = np.append(np.round(numbers * multipliers), np.nan)[codes]
+
+        return pd.Series(values, index=series.index, name=series.name)
+
+    @staticmethod
+    def parse_datetimes(series, date_format=ISO_FORMAT):
+        """
+        Converts date strings of the given format into UTC datetimes, naive dates being considered as UTC.
+
+        Values which are already datetimes (e.g. rows journaled by a previous version) are kept as they are.
+
+        :param pd.Series series: Specify the series of date strings
+        :param str date_format: Specify the strptime format of the strings
+        :return: A series of UTC datetimes, NaT where the value is missing
+        """
+
+        datetimes = pd.to_datetime(series, format=date_format, utc=True, errors='coerce')
+
+        # Only the values which are not strings of the format are parsed again, raising on malformed strings
+        leftovers = datetimes.isna() & series.notna()
+        if leftovers.any():
+            datetimes[leftovers] = pd.to_datetime(series[leftovers], utc=True)
+
+        return datetimes
+
+    @staticmethod
+    def derive_date_parts(series, parts=('year', 'month', 'day')):
+        """
+        Extracts the given parts of each datetime.
+
+        :param pd.Series series: Specify the series of datetimes
+        :param tuple parts: Specify the parts, any attribute of the Series.dt accessor (e.g. 'year' or 'weekday')
+        :return: A dataframe holding one column per part
+        """
+
+        return pd.DataFrame({part: getattr(series.dt, part) for part in parts}, index=series.index)
+
+    @staticmethod
+    def derive_age(series, now=None):
+        """
+        Returns the number of whole days elapsed since each datetime.
+
+        :param pd.Series series: Specify the series of UTC datetimes
+        :param pd.Timestamp now: Specify the reference time, None uses the current time
+        :return: A series of days
+        """
+
+        now = pd.Timestamp.now(tz='UTC') if now is None else now
+
+        return (now - series).dt.days
+
+    @staticmethod
+    def truncate_text(series, length, ellipsis='..'):
+        """
+        Shortens the strings longer than length, appending the ellipsis.
+
+        :param pd.Series series: Specify the series of strings
+        :param int length: Specify the maximum number of characters kept
+        :param str ellipsis: Specify the suffix of the shortened strings
+        :return: A series of strings
+        """
+
+        return series.where(series.str.len() <= length, series.str[:length] + ellipsis)
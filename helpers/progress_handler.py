@@ -1,63 +1,256 @@
-import datetime
+import threading
+import time
 
 
 class ProgressHandler:
     """
-    Set of static methods that aid some progress manipulations.
+    Thread-safe progress tracker of a single crawl, reporting the completed items and an ETA.
+
+    A tracker may hold nested tasks (e.g. the pages of the crawled threads), each tracking its own items; once every
+    item of a group (e.g. every page of a thread) is completed, the parent task advances by one. The ETA of each task
+    is derived from an exponentially smoothed throughput, sampled at most once per refresh interval, so it follows
+    the current pace of the crawl (e.g. once it is throttled) without jumping on every page. The progress is printed
+    at most once per refresh interval, whatever the number of threads advancing it, and once more when closed.
 
     Attributes
     ----------
-        __last_accessed     Last time show_progress method has been called.
-        __remaining_time    Stores remaining time in a formatted string
+        description         Name of the tracked items, e.g. Pages
+        total               Number of items to complete
+        completed           Number of items completed so far
+        refresh_interval    Minimum number of seconds between two printed progress lines
+        smoothing           Weight of the latest throughput sample within the smoothed throughput, between 0 and 1
+        parent              Task advanced once every item of a group is completed, None for the root tracker
+        __tasks             Nested tasks, in creation order
+        __groups            Group of each item, None if the items are not grouped
+        __remaining         Number of items left to complete per group
+        __throughput        Smoothed number of items completed per second, None until the first sample
+        __sampled_at        Time of the last throughput sample
+        __sampled_completed Number of completed items at the last throughput sample
+        __rendered_at       Time the progress was last printed
+        __closed            Whether the tracker was closed
+        __lock              Guards the counters of the tracker and of its nested tasks
 
     Methods
     -------
-        show_progress(elapsed=0, total=100):
-            Shows scraping progress in a formatted manner.
-        reset_progress():
-            Nullifies the attributes in order to receive new progress.
+        add_task(description, groups=None, total=0):
+            Creates a nested task.
+        set_total(total):
+            Sets the number of items to complete.
+        advance(count=1, item=None, resumed=False):
+            Marks items as completed, printing the progress if the refresh interval elapsed.
+        get_eta():
+            Returns the estimated number of seconds left.
+        format():
+            Returns the progress of the tracker and of its nested tasks as a single line.
+        close():
+            Prints the final progress.
     """
 
-    __last_accessed = None
-    __remaining_time = None
+    def __init__(self, total=0, description='Pages', refresh_interval=0.5, smoothing=0.3, parent=None, groups=None):
+        """
+        :param int total: Specify the number of items to complete
+        :param str description: Specify the name of the tracked items
+        :param float refresh_interval: Specify the minimum number of seconds between two printed progress lines
+        :param float smoothing: Specify the weight of the latest throughput sample, higher follows the pace faster
+        :param ProgressHandler parent: Specify the task advanced once every item of a group is completed, prefer
+                                       add_task
+        :param dict groups: Specify the group of each item, e.g. the thread of each page's url
+        """
+
+        if not isinstance(total, int) or total < 0:
+            raise ValueError('total must be a non-negative integer')
+
+        if not isinstance(refresh_interval, (int, float)) or refresh_interval < 0:
+            raise ValueError('refresh_interval must be a non-negative number')
+
+        if not isinstance(smoothing, (int, float)) or not 0 < smoothing <= 1:
+            raise ValueError('smoothing must be a number between 0 (excluded) and 1')
+
+        self.description = description
+        self.total = total
+        self.completed = 0
+        self.refresh_interval = refresh_interval
+        self.smoothing = smoothing
+        self.parent = parent
+        self.__tasks = []
+        self.__groups = groups
+        self.__remaining = None
+        self.__throughput = None
+        self.__sampled_at = time.monotonic()
+        self.__sampled_completed = 0
+        self.__rendered_at = None
+        self.__closed = False
+
+        # Nested tasks share the root's lock, so a line is never printed while any task is being advanced
+        self.__lock = threading.RLock() if parent is None else parent.__lock
 
-    @staticmethod
-    def show_progress(elapsed=0, total=100):
+        if groups is not None:
+            self.__remaining = {}
+            for group in groups.values():
+                self.__remaining[group] = self.__remaining.get(group, 0) + 1
+
+    def add_task(self, description, groups=None, total=0):
         """
-        Shows scraping progress in a formatted manner.
+        Creates a nested task, printed alongside the tracker's progress.
 
-        :param int elapsed: Specify the elapsed retrieved pages
-        :param int total: Specify the total number of pages
-        :return: A string denoting the progress
+        :param str description: Specify the name of the task's items
+        :param dict groups: Specify the group of each item of the task, the tracker advancing once every item of a
+                            group is completed; the totals default to the number of items and of groups
+        :param int total: Specify the number of items of the task, ignored if groups is given
+        :return: The nested task
+        """
+
+        task = ProgressHandler(total=len(groups) if groups is not None else total, description=description,
+                               refresh_interval=self.refresh_interval, smoothing=self.smoothing, parent=self,
+                               groups=groups)
+
+        with self.__lock:
+            self.__tasks.append(task)
+            if groups is not None and self.total == 0:
+                self.total = len(set(groups.values()))
+
+        return task
+
+    def set_total(self, total):
+        """
+        Sets the number of items to complete, e.g. once the pagination is known.
+
+        :param int total: Specify the number of items
+        """
+
+        if not isinstance(total, int) or total < 0:
+            raise ValueError('total must be a non-negative integer')
+
+        with self.__lock:
+            self.total = total
+
+    def __get_root(self):
+        """
+        Returns the tracker the task is nested in, the task itself if it is not nested.
+
+        :return: The root tracker
+        """
+
+        task = self
+        while task.parent is not None:
+            task = task.parent
+
+        return task
+
+    def __sample(self, now):
+        """
+        Folds the throughput since the last sample into the smoothed throughput, at most once per refresh interval.
+
+        :param float now: Specify the current monotonic time
+        """
+
+        elapsed = now - self.__sampled_at
+        if elapsed <= 0 or elapsed < self.refresh_interval:
+            return
+
+        throughput = (self.completed - self.__sampled_completed) / elapsed
+        self.__throughput = throughput if self.__throughput is None \
+            else self.smoothing * throughput + (1 - self.smoothing) * self.__throughput
+
+        self.__sampled_at = now
+        self.__sampled_completed = self.completed
+
+    def __advance(self, count, item, resumed, now):
+        """
+        Marks items as completed, advancing the parent task once every item of a group is completed.
+
+        :param int count: Specify the number of completed items
+        :param item: Specify the completed item, looked up in the groups
+        :param bool resumed: Specify whether the items were completed by a previous run
+        :param float now: Specify the current monotonic time
+        """
+
+        self.completed += count
+
+        # Items completed by a previous run are not part of the throughput
+        if resumed:
+            self.__sampled_completed += count
+        self.__sample(now)
+
+        if self.parent is not None and self.__remaining is not None and item in self.__groups:
+            group = self.__groups[item]
+            self.__remaining[group] -= 1
+            if self.__remaining[group] == 0:
+                self.parent.__advance(1, None, resumed, now)
+
+    def advance(self, count=1, item=None, resumed=False):
+        """
+        Marks items as completed, printing the progress if the refresh interval elapsed since the last printed line.
+
+        :param int count: Specify the number of completed items
+        :param item: Specify the completed item (e.g. a page's url), required to advance the parent of grouped items
+        :param bool resumed: Specify whether the items were completed by a previous run (e.g. journaled pages), which
+                             are left out of the throughput
         """
 
-        if ProgressHandler.__last_accessed is None:
-            ProgressHandler.__last_accessed = (datetime.datetime.now() - datetime.datetime(1970, 1, 1)).total_seconds()
-            ProgressHandler.__remaining_time = total * 0.9  # Assumes 900 milliseconds for each web request
-        else:
-            elapsed_time = (datetime.datetime.now() - datetime.datetime(1970, 1, 1)).total_seconds() \
-                           - ProgressHandler.__last_accessed
-            all_time_for_downloading = (elapsed_time * total / elapsed)
-            ProgressHandler.__remaining_time = all_time_for_downloading - elapsed_time
+        if not isinstance(count, int) or count < 0:
+            raise ValueError('count must be a non-negative integer')
 
-        if not isinstance(elapsed, int):
-            raise ValueError('elapsed must be an integer')
+        root = self.__get_root()
+        now = time.monotonic()
 
-        if not isinstance(total, int):
-            raise ValueError('total must be an integer')
+        with self.__lock:
+            self.__advance(count, item, resumed, now)
 
-        if elapsed > total:
-            raise ValueError('elapsed cannot be greater than total')
+            if root.__rendered_at is not None and now - root.__rendered_at < root.refresh_interval:
+                return
 
-        return f'{elapsed}/{total}\t\t' \
-               f'{"{:.2f}".format(round(elapsed / total * 100, 2))}%\t\t' \
-               f'ETA: {"{:.2f}".format(round(ProgressHandler.__remaining_time, 2))} second(s)'
+            root.__rendered_at = now
+            line = root.format()
 
-    @staticmethod
-    def reset_progress():
+        print(line)
+
+    def get_eta(self):
         """
-        Nullifies the attributes in order to receive new progress.
+        Returns the estimated number of seconds left, assuming 900 milliseconds per item until the throughput is
+        sampled.
+
+        :return: The number of seconds, infinite if no item was completed since the crawl stalled
         """
 
-        ProgressHandler.__last_accessed = None
-        ProgressHandler.__remaining_time = None
+        with self.__lock:
+            remaining = max(self.total - self.completed, 0)
+
+            if self.__throughput is None:
+                return remaining * 0.9
+
+            if remaining == 0:
+                return 0.0
+
+            return remaining / self.__throughput if self.__throughput > 0 else float('inf')
+
+    def format(self):
+        """
+        Returns the progress of the tracker and of its nested tasks as a single line.
+
+        :return: A string denoting the progress
+        """
+
+        with self.__lock:
+            percentage = self.completed / self.total * 100 if self.total else 0.0
+
+            line = f'{self.description}: {self.completed}/{self.total}\t\t' \
+                   f'{"{:.2f}".format(round(percentage, 2))}%\t\t' \
+                   f'ETA: {"{:.2f}".format(round(self.get_eta(), 2))} second(s)'
+
+            return ' | '.join([line, *[task.format() for task in self.__tasks]])
+
+    def close(self):
+        """
+        Prints the final progress of the tracker the task is nested in, once.
+        """
+
+        root = self.__get_root()
+
+        with self.__lock:
+            if root.__closed:
+                return
+            root.__closed = True
+            line = root.format()
+
+        print(line)
@@ -0,0 +1,264 @@
+import random
+import threading
+import time
+
+import requests
+
+
+class RateLimitHandler:
+    """
+    Request scheduler pacing, retrying and adapting the concurrency of the requests sent to a rate-limited site.
+
+    Requests are paced by a token bucket refilled at rate tokens per second, up to burst tokens. Throttled (403, 429)
+    and server error (5xx) responses, timeouts and connection errors are retried after an exponential backoff with full
+    jitter, or after the server's Retry-After delay. The number of requests in flight is adapted AIMD-style: it grows
+    by one after every increase_after consecutive successes and halves once the site signals it is overloaded, that is
+    on 429 responses, on 503 responses carrying a Retry-After header and on timeouts. Other failures (e.g. a 500 on a
+    single page or a refused connection) are retried without shrinking the concurrency, since they do not tell the
+    site is overloaded by the number of requests in flight.
+
+    Attributes
+    ----------
+        RETRY_STATUSES      Response statuses which are retried
+        OVERLOAD_STATUSES   Response statuses which shrink the concurrency, 503 only alongside a Retry-After header
+        rate                Number of tokens added to the bucket per second, None does not pace the requests
+        burst               Maximum number of tokens held by the bucket
+        max_retries         Maximum number of retries of a single request
+        backoff             Base delay of the exponential backoff, in seconds
+        max_backoff         Maximum delay of the exponential backoff, in seconds
+        max_concurrency     Maximum number of requests in flight
+        increase_after      Number of consecutive successes after which one more request may be in flight
+        __tokens            Tokens currently held by the bucket
+        __refilled_at       Time the bucket was last refilled
+        __paused_until      Time before which no request is sent, following a Retry-After header
+        __concurrency       Number of requests currently allowed in flight
+        __in_flight         Number of requests currently in flight
+        __successes         Number of consecutive successes since the last adjustment
+        __condition         Guards the bucket, the concurrency and the counters
+        __counters          Per-run counts of throttled, failed and retried requests
+
+    Methods
+    -------
+        call(request):
+            Sends a request through the scheduler, retrying it until it succeeds or the retries are exhausted.
+        set_max_concurrency(max_concurrency):
+            Sets the maximum number of requests in flight.
+        get_stats():
+            Returns the per-run counts of throttled, failed and retried requests alongside the current concurrency.
+        reset_stats():
+            Nullifies the per-run counters.
+    """
+
+    RETRY_STATUSES = {403, 429, 500, 502, 503, 504}
+    OVERLOAD_STATUSES = {429, 503}
+
+    def __init__(self, rate=8.0, burst=8, max_retries=5, backoff=1.0, max_backoff=60.0, initial_concurrency=4,
+                 max_concurrency=16, increase_after=10):
+        """
+        :param float rate: Specify the number of requests per second, None does not pace the requests
+        :param int burst: Specify the number of requests which may be sent at once after an idle period
+        :param int max_retries: Specify the maximum number of retries of a single request
+        :param float backoff: Specify the base delay of the exponential backoff, in seconds
+        :param float max_backoff: Specify the maximum delay of the exponential backoff, in seconds
+        :param int initial_concurrency: Specify the number of requests initially allowed in flight
+        :param int max_concurrency: Specify the maximum number of requests in flight
+        :param int increase_after: Specify the number of consecutive successes after which the concurrency grows
+        """
+
+        if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+            raise ValueError('rate must be a positive number or None')
+
+        if not isinstance(burst, int) or burst < 1:
+            raise ValueError('burst must be a positive integer')
+
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise ValueError('max_retries must be a non-negative integer')
+
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError('max_concurrency must be a positive integer')
+
+        if not isinstance(initial_concurrency, int) or not 1 <= initial_concurrency <= max_concurrency:
+            raise ValueError('initial_concurrency must be a positive integer not exceeding max_concurrency')
+
+        if not isinstance(increase_after, int) or increase_after < 1:
+            raise ValueError('increase_after must be a positive integer')
+
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_concurrency = max_concurrency
+        self.increase_after = increase_after
+        self.__tokens = float(burst)
+        self.__refilled_at = time.monotonic()
+        self.__paused_until = 0.0
+        self.__concurrency = initial_concurrency
+        self.__in_flight = 0
+        self.__successes = 0
+        self.__condition = threading.Condition()
+        self.__counters = {'throttled': 0, 'server_errors': 0, 'connection_errors': 0, 'retried': 0, 'failed': 0}
+
+    def __acquire(self):
+        """
+        Waits for a free concurrency slot and a token of the bucket, then takes both.
+        """
+
+        with self.__condition:
+            while True:
+                now = time.monotonic()
+
+                if self.rate is not None:
+                    self.__tokens = min(self.burst, self.__tokens + (now - self.__refilled_at) * self.rate)
+                self.__refilled_at = now
+
+                if self.__in_flight >= self.__concurrency:
+                    self.__condition.wait()
+                    continue
+
+                if now < self.__paused_until:
+                    self.__condition.wait(self.__paused_until - now)
+                    continue
+
+                if self.rate is not None and self.__tokens < 1:
+                    self.__condition.wait((1 - self.__tokens) / self.rate)
+                    continue
+
+                if self.rate is not None:
+                    self.__tokens -= 1
+                self.__in_flight += 1
+                return
+
+    @staticmethod
+    def __is_overloaded(response=None, error=None):
+        """
+        Returns whether a failed request signals that the site is overloaded.
+
+        :param requests.Response response: Specify the failed response, None if no response was received
+        :param Exception error: Specify the error raised instead of a response, if any
+        :return: True on 429 responses, 503 responses carrying a Retry-After header and timeouts
+        """
+
+        if response is None:
+            return isinstance(error, requests.Timeout)
+
+        if response.status_code == 503:
+            return response.headers.get('Retry-After') is not None
+
+        return response.status_code in RateLimitHandler.OVERLOAD_STATUSES
+
+    def __release(self, succeeded, overloaded=False):
+        """
+        Frees a concurrency slot, growing the concurrency additively on success and halving it once the site is
+        overloaded.
+
+        :param bool succeeded: Specify whether the request succeeded
+        :param bool overloaded: Specify whether the failed request signals that the site is overloaded
+        """
+
+        with self.__condition:
+            self.__in_flight -= 1
+
+            if succeeded:
+                self.__successes += 1
+                if self.__successes >= self.increase_after and self.__concurrency < self.max_concurrency:
+                    self.__concurrency += 1
+                    self.__successes = 0
+            elif overloaded:
+                self.__concurrency = max(1, self.__concurrency // 2)
+                self.__successes = 0
+
+            self.__condition.notify_all()
+
+    def __get_delay(self, attempt, response=None):
+        """
+        Returns the delay before retrying a request, honouring the server's Retry-After header if any.
+
+        :param int attempt: Specify the number of attempts made so far
+        :param requests.Response response: Specify the failed response, None if no response was received
+        :return: The delay, in seconds
+        """
+
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            # Pauses every request, since the whole site is throttling rather than a single page
+            with self.__condition:
+                self.__paused_until = max(self.__paused_until, time.monotonic() + int(retry_after))
+            return int(retry_after)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, request):
+        """
+        Sends a request through the scheduler, retrying it until it succeeds or the retries are exhausted.
+
+        Responses which are neither throttled nor server errors (e.g. 404) are returned as they are.
+
+        :param request: Specify a callable sending the request and returning its response
+        :return: The response
+        :raises requests.HTTPError: If the response is still throttled or failing once the retries are exhausted
+        :raises requests.RequestException: If the request still times out or fails to connect
+        """
+
+        for attempt in range(self.max_retries + 1):
+            self.__acquire()
+
+            response = None
+            try:
+                response = request()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.__release(succeeded=False, overloaded=RateLimitHandler.__is_overloaded(error=e))
+                counter, error = 'connection_errors', e
+            else:
+                succeeded = response.status_code not in RateLimitHandler.RETRY_STATUSES
+                self.__release(succeeded=succeeded,
+                               overloaded=not succeeded and RateLimitHandler.__is_overloaded(response=response))
+
+                if succeeded:
+                    return response
+
+                counter = 'throttled' if response.status_code in (403, 429) else 'server_errors'
+                error = requests.HTTPError(f'{response.status_code} Error for url: {response.url}', response=response)
+
+            with self.__condition:
+                self.__counters[counter] += 1
+                self.__counters['retried' if attempt < self.max_retries else 'failed'] += 1
+
+            if attempt == self.max_retries:
+                raise error
+
+            time.sleep(self.__get_delay(attempt, response=response))
+
+    def set_max_concurrency(self, max_concurrency):
+        """
+        Sets the maximum number of requests in flight, e.g. once the requests the fetch engine lets in flight change,
+        lowering the current concurrency if it exceeds it.
+
+        :param int max_concurrency: Specify the maximum number of requests in flight
+        """
+
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError('max_concurrency must be a positive integer')
+
+        with self.__condition:
+            self.max_concurrency = max_concurrency
+            self.__concurrency = min(self.__concurrency, max_concurrency)
+            self.__condition.notify_all()
+
+    def get_stats(self):
+        """
+        Returns the per-run counts of throttled, failed and retried requests alongside the current concurrency.
+
+        :return: A dictionary of counters
+        """
+
+        with self.__condition:
+            return {**self.__counters, 'concurrency': self.__concurrency}
+
+    def reset_stats(self):
+        """
+        Nullifies the per-run counters.
+        """
+
+        with self.__condition:
+            self.__counters = dict.fromkeys(self.__counters, 0)
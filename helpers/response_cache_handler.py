@@ -0,0 +1,322 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseCacheHandler:
+    """
+    On-disk cache of successful HTTP responses keyed by url, stored in a SQLite database.
+
+    Entries younger than the ttl are served without issuing any request, unless their url matches always_revalidate.
+    Older entries are revalidated with their ETag or Last-Modified validators when the server sent any, otherwise
+    they are fetched again. Once the cached bodies exceed max_bytes, the expired entries then the least recently used
+    ones are evicted. In offline mode, every entry is served regardless of its age and a url missing from the cache
+    raises a LookupError.
+
+    The access times ordering the eviction are kept in memory and written in batches, so that a cache hit does not
+    cost a write to the database.
+
+    Attributes
+    ----------
+        path                Path of the SQLite database
+        ttl                 Number of seconds an entry is served without revalidation, None never expires entries
+        always_revalidate   Regular expression of the urls revalidated on every request regardless of the ttl
+        max_bytes           Maximum total size of the cached (compressed) bodies
+        offline             Serves every request from the cache without touching the network
+        __connection        SQLite connection shared by every thread
+        __lock              Serializes the access to the connection and the counters
+        __size              Total size of the cached bodies
+        __accesses          Access times of the served entries, not written to the database yet
+        __hits              Number of responses served from the cache
+        __revalidations     Number of cached responses confirmed unchanged by the server
+        __misses            Number of responses fetched from the network
+
+    Methods
+    -------
+        get(url, fetch, headers=None):
+            Serves the url from the cache, revalidating or fetching it through fetch if needed.
+        evict():
+            Removes the expired entries, then the least recently used ones until the cache fits max_bytes.
+        clear():
+            Removes every entry.
+        get_stats():
+            Returns the per-run counts of cache hits, revalidations and misses.
+        reset_stats():
+            Nullifies the per-run counters.
+        close():
+            Closes the database, once the access times held in memory are written.
+    """
+
+    # Bodies are stored decoded, hence the headers describing the transfer are dropped
+    __dropped_headers = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+    # Number of access times held in memory before they are written
+    __accesses_batch = 1000
+
+    def __init__(self, path='cached_responses.sqlite', ttl=24 * 60 * 60, max_bytes=1024 ** 3, offline=False,
+                 always_revalidate=None):
+        """
+        :param str path: Specify the path of the SQLite database
+        :param int ttl: Specify the number of seconds an entry is served without revalidation, None never expires
+        :param int max_bytes: Specify the maximum total size of the cached (compressed) bodies
+        :param bool offline: Serves every request from the cache without touching the network
+        :param str always_revalidate: Specify a regular expression of the urls revalidated on every request regardless
+                                      of the ttl, None applies the ttl to every url
+        """
+
+        if ttl is not None and (not isinstance(ttl, (int, float)) or ttl < 0):
+            raise ValueError('ttl must be a non-negative number or None')
+
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError('max_bytes must be a positive integer')
+
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.always_revalidate = None if always_revalidate is None else re.compile(always_revalidate)
+        self.__lock = threading.Lock()
+        self.__accesses = {}
+        self.__hits = 0
+        self.__revalidations = 0
+        self.__misses = 0
+
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS responses ('
+                                  'url TEXT PRIMARY KEY, status INTEGER, headers TEXT, encoding TEXT, body BLOB, '
+                                  'etag TEXT, last_modified TEXT, fetched_at REAL, accessed_at REAL, size INTEGER)')
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self.__connection.commit()
+
+        self.__size = self.__connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def __lookup(self, url):
+        """
+        Returns the cached entry of the url, marking it as recently used.
+
+        :param str url: Specify the requested url
+        :return: A dictionary of the entry's columns, None if the url is not cached
+        """
+
+        with self.__lock:
+            row = self.__connection.execute('SELECT url, status, headers, encoding, body, etag, last_modified, '
+                                            'fetched_at FROM responses WHERE url = ?', (url,)).fetchone()
+
+            if row is None:
+                return None
+
+            self.__accesses[url] = time.time()
+            if len(self.__accesses) >= ResponseCacheHandler.__accesses_batch:
+                self.__write_accesses()
+
+        return dict(zip(['url', 'status', 'headers', 'encoding', 'body', 'etag', 'last_modified', 'fetched_at'], row))
+
+    def __write_accesses(self):
+        """
+        Writes the access times held in memory to the database, the lock being held by the caller.
+        """
+
+        if not self.__accesses:
+            return
+
+        self.__connection.executemany('UPDATE responses SET accessed_at = ? WHERE url = ?',
+                                      [(accessed_at, url) for url, accessed_at in self.__accesses.items()])
+        self.__connection.commit()
+        self.__accesses.clear()
+
+    def __store(self, url, response):
+        """
+        Caches a successful response, evicting older entries if the cache grows past max_bytes.
+
+        :param str url: Specify the requested url
+        :param requests.Response response: Specify the response
+        """
+
+        headers = {key: value for key, value in response.headers.items()
+                   if key.lower() not in ResponseCacheHandler.__dropped_headers}
+        body = zlib.compress(response.content)
+        now = time.time()
+
+        with self.__lock:
+            previous = self.__connection.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+
+            self.__connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                      (url, response.status_code, json.dumps(headers), response.encoding, body,
+                                       response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                       now, now, len(body)))
+            self.__connection.commit()
+            self.__accesses.pop(url, None)
+
+            self.__size += len(body) - (previous[0] if previous is not None else 0)
+            oversized = self.__size > self.max_bytes
+
+        if oversized:
+            self.evict()
+
+    def __renew(self, url):
+        """
+        Restarts the ttl of a cached entry once the server confirmed it did not change.
+
+        :param str url: Specify the requested url
+        """
+
+        with self.__lock:
+            self.__connection.execute('UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self.__connection.commit()
+
+    def __is_fresh(self, entry):
+        """
+        Checks whether a cached entry can be served without revalidation.
+
+        :param dict entry: Specify the cached entry
+        :return: True if the entry is younger than the ttl and its url is not always revalidated
+        """
+
+        if self.always_revalidate is not None and self.always_revalidate.search(entry['url']):
+            return False
+
+        return self.ttl is None or time.time() - entry['fetched_at'] < self.ttl
+
+    @staticmethod
+    def __to_response(entry):
+        """
+        Rebuilds a response out of a cached entry.
+
+        :param dict entry: Specify the cached entry
+        :return: A requests.Response
+        """
+
+        response = requests.models.Response()
+        response.url = entry['url']
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(json.loads(entry['headers']))
+        response.encoding = entry['encoding']
+        response._content = zlib.decompress(entry['body'])
+
+        return response
+
+    def get(self, url, fetch, headers=None):
+        """
+        Serves the url from the cache, revalidating or fetching it through fetch if needed.
+
+        :param str url: Specify the requested url
+        :param fetch: Specify a callable receiving the request headers and returning the url's response
+        :param dict headers: Specify the request headers
+        :return: The response
+        """
+
+        entry = self.__lookup(url)
+
+        if self.offline:
+            if entry is None:
+                raise LookupError(f'{url} is not cached, it cannot be fetched offline')
+
+            with self.__lock:
+                self.__hits += 1
+            return ResponseCacheHandler.__to_response(entry)
+
+        if entry is not None and self.__is_fresh(entry):
+            with self.__lock:
+                self.__hits += 1
+            return ResponseCacheHandler.__to_response(entry)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag'] is not None:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified'] is not None:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = fetch(headers)
+
+        if entry is not None and response.status_code == 304:
+            self.__renew(url)
+            with self.__lock:
+                self.__revalidations += 1
+            return ResponseCacheHandler.__to_response(entry)
+
+        with self.__lock:
+            self.__misses += 1
+
+        if response.status_code == 200:
+            self.__store(url, response)
+
+        return response
+
+    def evict(self):
+        """
+        Removes the expired entries, then the least recently used ones until the cache fits max_bytes.
+
+        Expired entries holding validators are kept since they can still be revalidated cheaply, and nothing expires
+        in offline mode.
+        """
+
+        with self.__lock:
+            self.__write_accesses()
+
+            if self.ttl is not None and not self.offline:
+                self.__connection.execute('DELETE FROM responses WHERE fetched_at < ? '
+                                          'AND etag IS NULL AND last_modified IS NULL', (time.time() - self.ttl,))
+
+            self.__size = self.__connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+            evicted = []
+            for url, size in self.__connection.execute('SELECT url, size FROM responses ORDER BY accessed_at'):
+                if self.__size <= self.max_bytes:
+                    break
+
+                evicted.append((url,))
+                self.__size -= size
+
+            self.__connection.executemany('DELETE FROM responses WHERE url = ?', evicted)
+            self.__connection.commit()
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+
+        with self.__lock:
+            self.__connection.execute('DELETE FROM responses')
+            self.__connection.commit()
+            self.__accesses.clear()
+            self.__size = 0
+
+    def get_stats(self):
+        """
+        Returns the per-run counts of cache hits, revalidations and misses.
+
+        :return: A dictionary of counters
+        """
+
+        with self.__lock:
+            return {'cache_hits': self.__hits, 'cache_revalidations': self.__revalidations,
+                    'cache_misses': self.__misses, 'cache_bytes': self.__size}
+
+    def reset_stats(self):
+        """
+        Nullifies the per-run counters.
+        """
+
+        with self.__lock:
+            self.__hits = 0
+            self.__revalidations = 0
+            self.__misses = 0
+
+    def close(self):
+        """
+        Closes the database, once the access times held in memory are written.
+        """
+
+        with self.__lock:
+            self.__write_accesses()
+            self.__connection.close()
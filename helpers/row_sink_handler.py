@@ -0,0 +1,150 @@
+import datetime
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from helpers.schema_handler import SchemaHandler
+from helpers.snapshot_handler import SnapshotHandler
+
+
+class RowSinkHandler:
+    """
+    Streaming writer appending normalized dataframe batches to a snapshot file, so no batch outlives its flush.
+
+    Batches are written as Arrow record batches of a Feather snapshot, as row groups of a Parquet file or as chunks of
+    a legacy CSV snapshot. Since every batch must share the file's types, the compact dtypes of SchemaHandler (whose
+    categories and integer widths vary from a batch to another) are widened into a fixed Arrow schema; Feather
+    snapshots are marked as not compacted and compacted when read. The file is written under a temporary name and
+    only replaces the destination once closed.
+
+    Attributes
+    ----------
+        FORMATS             Supported file formats
+        path                Path of the destination file
+        kind                Snapshot kind of the batches, either 'threads' or 'threads_details'
+        file_format         Format of the destination file, one of FORMATS
+        rows                Number of rows written so far
+        __temporary_path    Path the file is written to until it is closed
+        __schema            Arrow schema of the file, set by the first batch
+        __writer            Writer of the Feather or Parquet file, opened by the first batch
+
+    Methods
+    -------
+        write(df):
+            Appends a normalized batch to the file.
+        close():
+            Finalizes the file and moves it to its destination.
+        abort():
+            Discards the partially written file.
+    """
+
+    FORMATS = ['feather', 'parquet', 'csv']
+
+    def __init__(self, path, kind, file_format='feather'):
+        """
+        :param str path: Specify the path of the destination file
+        :param str kind: Specify the snapshot kind of the batches, either 'threads' or 'threads_details'
+        :param str file_format: Specify the format of the destination file, one of FORMATS
+        """
+
+        if file_format not in RowSinkHandler.FORMATS:
+            raise ValueError(f'file_format must be one of {RowSinkHandler.FORMATS}')
+
+        SchemaHandler.get_schema(kind)
+
+        self.path = path
+        self.kind = kind
+        self.file_format = file_format
+        self.rows = 0
+        self.__temporary_path = f'{path}.tmp'
+        self.__schema = None
+        self.__writer = None
+
+    def __get_arrow_schema(self, df):
+        """
+        Returns the fixed Arrow schema of the batches, widening the compact dtypes.
+
+        :param pd.DataFrame df: Specify the first batch, with its index reset
+        :return: An Arrow schema carrying the snapshot's metadata
+        """
+
+        schema = SchemaHandler.get_schema(self.kind)
+
+        fields = []
+        for column in df.columns:
+            if column == schema['index'] or column in schema['integer']:
+                fields.append(pa.field(column, pa.int64()))
+            elif column in schema['datetime']:
+                fields.append(pa.field(column, pa.timestamp('ns', tz='UTC')))
+            elif column in schema['bool']:
+                fields.append(pa.field(column, pa.bool_()))
+            else:
+                fields.append(pa.field(column, pa.string()))
+
+        metadata = {'kind': self.kind,
+                    'timestamp': str(datetime.datetime.utcnow()),
+                    'schema_version': SnapshotHandler.SCHEMA_VERSION,
+                    'compacted': False}
+
+        return pa.schema(fields, metadata={SnapshotHandler.METADATA_KEY: json.dumps(metadata)})
+
+    def write(self, df):
+        """
+        Appends a normalized batch to the file.
+
+        :param pd.DataFrame df: Specify the batch, indexed by thread_id
+        """
+
+        df = df.reset_index()
+
+        if self.file_format == 'csv':
+            if self.rows == 0:
+                with open(self.__temporary_path, 'w') as f:
+                    f.write(f'# Timestamp: {datetime.datetime.utcnow()}\n')
+
+            # noinspection PyTypeChecker
+            df.to_csv(self.__temporary_path, mode='a', header=self.rows == 0, index=False)
+            self.rows += len(df)
+            return
+
+        if self.__schema is None:
+            self.__schema = self.__get_arrow_schema(df)
+
+            if self.file_format == 'feather':
+                self.__writer = pa.ipc.new_file(self.__temporary_path, self.__schema)
+            else:
+                self.__writer = pq.ParquetWriter(self.__temporary_path, self.__schema)
+
+        # Categories are written as plain strings, since each batch holds its own categories
+        df = df.astype({column: object for column in df.select_dtypes('category').columns})
+        table = pa.Table.from_pandas(df, preserve_index=False).select(self.__schema.names)
+        table = table.cast(self.__schema.remove_metadata()).replace_schema_metadata(self.__schema.metadata)
+
+        self.__writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        """
+        Finalizes the file and moves it to its destination.
+        """
+
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+
+        if os.path.exists(self.__temporary_path):
+            os.replace(self.__temporary_path, self.path)
+
+    def abort(self):
+        """
+        Discards the partially written file.
+        """
+
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+
+        if os.path.exists(self.__temporary_path):
+            os.remove(self.__temporary_path)
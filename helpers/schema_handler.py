@@ -0,0 +1,149 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+class SchemaHandler:
+    """
+    Set of static methods that convert the scraped dataframes into compact dtypes.
+
+    Repeated strings become categoricals, counters become the smallest nullable integer fitting their range, flags
+    become booleans and the remaining free text is interned so identical values share one object.
+
+    Attributes
+    ----------
+        __schemas           Index and column groups of each dataframe kind
+
+    Methods
+    -------
+        get_schema(kind):
+            Returns the index and column groups of the dataframe kind.
+        compact(df, kind):
+            Converts the dataframe's columns into the compact dtypes of its kind.
+        memory_report(before_df, after_df):
+            Returns the memory used by each column before and after compaction.
+    """
+
+    __schemas = {
+        'threads': {
+            'index': 'thread_id',
+            'integer': ['poster_id', 'last_replier_id', 'replies', 'views', 'forum_id'],
+            'datetime': ['last_replied_date', 'date_posted'],
+            'bool': ['is_locked', 'is_sticky'],
+            'category': ['poster_name', 'poster_image', 'last_replier_name', 'last_replier_image'],
+            'intern': [],
+        },
+        'threads_details': {
+            'index': 'thread_id',
+            'integer': ['user_id', 'user_messages', 'post_reaction_like', 'post_reaction_thanks',
+                        'post_reaction_hug'],
+            'datetime': ['user_join_date', 'user_post_date'],
+            'bool': [],
+            'category': ['user_name', 'user_image', 'user_title', 'user_banner_1', 'user_banner_2', 'user_location'],
+            'intern': ['user_post'],
+        },
+    }
+
+    @staticmethod
+    def get_schema(kind):
+        """
+        Returns the index and column groups of the dataframe kind.
+
+        :param str kind: Specify the dataframe kind, either 'threads' or 'threads_details'
+        :return: A dictionary of column lists
+        """
+
+        if kind not in SchemaHandler.__schemas:
+            raise ValueError(f'kind must be one of {list(SchemaHandler.__schemas)}')
+
+        return SchemaHandler.__schemas[kind]
+
+    @staticmethod
+    def __to_smallest_integer(series):
+        """
+        Converts a numeric series into the smallest nullable integer dtype fitting its range.
+
+        :param pd.Series series: Specify the series
+        :return: A series of a nullable integer dtype, the series itself if it holds fractions
+        """
+
+        series = pd.to_numeric(series, errors='coerce')
+
+        values = series.dropna()
+        if not np.array_equal(values, np.floor(values)):
+            return series
+
+        if values.empty:
+            return series.astype('UInt8')
+
+        minimum, maximum = values.min(), values.max()
+        for dtype in ['UInt8', 'UInt16', 'UInt32', 'UInt64'] if minimum >= 0 else ['Int8', 'Int16', 'Int32', 'Int64']:
+            information = np.iinfo(dtype.lower())
+            if information.min <= minimum and maximum <= information.max:
+                return series.astype(dtype)
+
+        return series
+
+    @staticmethod
+    def compact(df, kind):
+        """
+        Converts the dataframe's columns into the compact dtypes of its kind.
+
+        :param pd.DataFrame df: Specify the dataframe, indexed by thread_id
+        :param str kind: Specify the dataframe kind, either 'threads' or 'threads_details'
+        :return: A compacted dataframe
+        """
+
+        schema = SchemaHandler.get_schema(kind)
+
+        df = df.copy()
+        # An index holding any id which is not a number is kept as it is
+        index = pd.to_numeric(df.index, errors='coerce')
+        if not (pd.isna(index) & ~pd.isna(df.index)).any():
+            df.index = index
+        df.index.name = schema['index']
+
+        for column in schema['integer']:
+            if column in df:
+                df[column] = SchemaHandler.__to_smallest_integer(df[column])
+
+        for column in schema['datetime']:
+            if column in df:
+                df[column] = pd.to_datetime(df[column], utc=True)
+
+        for column in schema['bool']:
+            if column in df:
+                df[column] = df[column].astype('boolean' if df[column].isna().any() else bool)
+
+        for column in schema['category']:
+            if column in df:
+                df[column] = df[column].astype('category')
+
+        for column in schema['intern']:
+            if column in df:
+                df[column] = df[column].map(lambda x: sys.intern(x) if isinstance(x, str) else x)
+
+        return df
+
+    @staticmethod
+    def memory_report(before_df, after_df):
+        """
+        Returns the memory used by each column before and after compaction.
+
+        :param pd.DataFrame before_df: Specify the dataframe before compaction
+        :param pd.DataFrame after_df: Specify the dataframe after compaction
+        :return: A dataframe of bytes before, after and saved per column, with a trailing total row
+        """
+
+        report_df = pd.DataFrame({'before_bytes': before_df.memory_usage(deep=True),
+                                  'after_bytes': after_df.memory_usage(deep=True)})
+
+        report_df['before_dtype'] = before_df.dtypes.astype(str)
+        report_df['after_dtype'] = after_df.dtypes.astype(str)
+        report_df['saved_bytes'] = report_df['before_bytes'] - report_df['after_bytes']
+
+        report_df.loc['Total'] = [report_df['before_bytes'].sum(), report_df['after_bytes'].sum(), '', '',
+                                  report_df['saved_bytes'].sum()]
+
+        return report_df
@@ -0,0 +1,250 @@
+import queue
+import threading
+import time
+import weakref
+
+import cloudscraper as cloudscraper
+from cloudscraper.cloudflare import Cloudflare
+
+
+class SessionHandler:
+    """
+    Pool of reusable cloudscraper sessions shared across a whole crawl.
+
+    Every session keeps its own keep-alive connections and the cookies of any solved Cloudflare challenge, so a
+    session is created (and a challenge solved) once per pool slot instead of once per page.
+
+    Attributes
+    ----------
+        pool_size           Maximum number of sessions kept alive at once
+        cache               Response cache serving the requests, None always hits the network
+        rate_limiter        Scheduler pacing and retrying the requests sent over the network, None sends them at once
+        timeout             Number of seconds to wait for the server's response before giving up
+        metrics             Registry recording the latency, status and size of each response, None records nothing
+        __sessions          Idle sessions ready to be borrowed
+        __created           Number of sessions created so far
+        __lock              Guards the pool bookkeeping and the counters
+        __challenges        Number of Cloudflare challenges solved during the run
+        __requests          Number of requests issued during the run
+        __baselines         Number of connections each connection pool had opened when the counters were last reset
+
+    Methods
+    -------
+        __request(url, **kwargs):
+            Issues a GET request using a pooled session.
+        __iter_pools():
+            Yields the connection pools of every session.
+        __get(url, **kwargs):
+            Issues a GET request through the rate limiter if any.
+        get(url, **kwargs):
+            Serves a GET request from the response cache if any, otherwise issues it using a pooled session.
+        get_stats():
+            Returns the per-run counts of requests, sessions, handshakes and challenge solves.
+        reset_stats():
+            Nullifies the per-run counters.
+        close():
+            Closes every idle session in the pool.
+    """
+
+    def __init__(self, pool_size=4, cache=None, rate_limiter=None, timeout=30, metrics=None):
+        """
+        :param int pool_size: Specify the maximum number of sessions kept alive at once
+        :param ResponseCacheHandler cache: Specify the response cache, None always hits the network
+        :param RateLimitHandler rate_limiter: Specify the scheduler of the requests, None sends them at once
+        :param float timeout: Specify the number of seconds to wait for the server's response, None waits forever
+        :param MetricsHandler metrics: Specify the registry recording each response, None records nothing
+        """
+
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError('pool_size must be a positive integer')
+
+        self.pool_size = pool_size
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.metrics = metrics
+        self.__sessions = queue.LifoQueue()
+        self.__all_sessions = []
+        self.__created = 0
+        self.__lock = threading.Lock()
+        self.__challenges = 0
+        self.__requests = 0
+        self.__baselines = weakref.WeakKeyDictionary()
+
+    def __create_session(self):
+        """
+        Creates a new cloudscraper session which counts the challenges it solves.
+
+        :return: A cloudscraper session
+        """
+
+        def count_challenges(session, response):
+            if Cloudflare(session).is_Challenge_Request(response):
+                with self.__lock:
+                    self.__challenges += 1
+            return response
+
+        # This site is protected under CloudFlare bot spam detection, a normal http request would not suffice
+        return cloudscraper.create_scraper(browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False},
+                                           requestPostHook=count_challenges)
+
+    def __acquire(self):
+        """
+        Borrows an idle session, creating one if the pool is not full yet, otherwise waits for one to be released.
+
+        :return: A cloudscraper session
+        """
+
+        try:
+            return self.__sessions.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.__lock:
+            if self.__created < self.pool_size:
+                self.__created += 1
+                session = self.__create_session()
+                self.__all_sessions.append(session)
+                return session
+
+        return self.__sessions.get()
+
+    def __release(self, session):
+        """
+        Returns a borrowed session back to the pool.
+
+        :param session: Specify the session to return
+        """
+
+        self.__sessions.put(session)
+
+    def __request(self, url, **kwargs):
+        """
+        Issues a GET request using a pooled session.
+
+        :param str url: Specify the requested url
+        :param kwargs: Specify any extra keyword arguments passed to the session
+        :return: The response
+        """
+
+        session = self.__acquire()
+        try:
+            with self.__lock:
+                self.__requests += 1
+
+            started_at = time.perf_counter()
+            try:
+                response = session.get(url, **{'timeout': self.timeout, **kwargs})
+            except Exception as e:
+                if self.metrics is not None:
+                    self.metrics.increment('request_errors_total', labels={'error': type(e).__name__})
+                raise
+
+            if self.metrics is not None:
+                self.metrics.observe('request_seconds', time.perf_counter() - started_at)
+                self.metrics.increment('responses_total', labels={'status': response.status_code})
+                self.metrics.increment('response_bytes_total', len(response.content))
+
+            return response
+        finally:
+            self.__release(session)
+
+    def __iter_pools(self):
+        """
+        Yields the connection pools of every session, the lock being held by the caller.
+
+        :return: A generator of urllib3 connection pools
+        """
+
+        for session in self.__all_sessions:
+            for adapter in session.adapters.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        yield pool
+
+    def __get(self, url, **kwargs):
+        """
+        Issues a GET request through the rate limiter if any.
+
+        :param str url: Specify the requested url
+        :param kwargs: Specify any extra keyword arguments passed to the session
+        :return: The response
+        """
+
+        if self.rate_limiter is None:
+            return self.__request(url, **kwargs)
+
+        return self.rate_limiter.call(lambda: self.__request(url, **kwargs))
+
+    def get(self, url, **kwargs):
+        """
+        Serves a GET request from the response cache if any, otherwise issues it using a pooled session.
+
+        :param str url: Specify the requested url
+        :param kwargs: Specify any extra keyword arguments passed to the session
+        :return: The response
+        """
+
+        if self.cache is None:
+            return self.__get(url, **kwargs)
+
+        headers = kwargs.pop('headers', None)
+
+        return self.cache.get(url, lambda request_headers: self.__get(url, headers=request_headers, **kwargs),
+                              headers=headers)
+
+    def get_stats(self):
+        """
+        Returns the per-run counts of requests, sessions, handshakes and challenge solves.
+
+        Handshakes are counted as the number of connections opened by the underlying connection pools since the
+        counters were last reset, the counters of the response cache and the rate limiter are included if they are set.
+
+        :return: A dictionary of counters
+        """
+
+        with self.__lock:
+            handshakes = sum(pool.num_connections - self.__baselines.get(pool, 0) for pool in self.__iter_pools())
+
+            stats = {'requests': self.__requests, 'sessions': self.__created,
+                     'handshakes': handshakes, 'challenges': self.__challenges}
+
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+
+        if self.rate_limiter is not None:
+            stats.update(self.rate_limiter.get_stats())
+
+        return stats
+
+    def reset_stats(self):
+        """
+        Nullifies the per-run counters.
+        """
+
+        with self.__lock:
+            self.__requests = 0
+            self.__challenges = 0
+            # The pools' own counters are left untouched, the handshakes being counted from these baselines
+            for pool in self.__iter_pools():
+                self.__baselines[pool] = pool.num_connections
+
+        if self.cache is not None:
+            self.cache.reset_stats()
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.reset_stats()
+
+    def close(self):
+        """
+        Closes every idle session in the pool, the response cache is left open since it may outlive the pool.
+        """
+
+        with self.__lock:
+            for session in self.__all_sessions:
+                session.close()
+            self.__all_sessions = []
+            self.__created = 0
+            self.__sessions = queue.LifoQueue()
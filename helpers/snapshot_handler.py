@@ -0,0 +1,142 @@
+import datetime
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from helpers.schema_handler import SchemaHandler
+
+
+class SnapshotHandler:
+    """
+    Set of static methods that read and write typed columnar snapshots (Feather, i.e. Arrow IPC files).
+
+    The snapshot's kind, timestamp and schema version are stored in the file's schema metadata, which replaces the
+    '# Timestamp' header line of the legacy CSV snapshots. Files are written uncompressed so they can be
+    memory-mapped when read.
+
+    Attributes
+    ----------
+        SCHEMA_VERSION      Version of the snapshot layout, bumped whenever the stored columns change
+        METADATA_KEY        Key of the snapshot's metadata within the Arrow schema metadata
+
+    Methods
+    -------
+        write(df, path, kind):
+            Atomically writes the dataframe as a Feather snapshot.
+        read(path, columns=None):
+            Reads a Feather snapshot, optionally projecting a subset of its columns.
+        open_table(path):
+            Memory-maps a Feather snapshot as an Arrow table without reading its columns.
+        to_frame(table, columns=None):
+            Converts a subset of a snapshot table's columns into a dataframe, sharing memory where possible.
+        read_metadata(path):
+            Reads the snapshot's metadata without loading its columns.
+    """
+
+    SCHEMA_VERSION = 2
+    METADATA_KEY = b'forum_scraper'
+
+    @staticmethod
+    def write(df, path, kind):
+        """
+        Atomically writes the dataframe as a Feather snapshot.
+
+        :param pd.DataFrame df: Specify the dataframe, indexed by thread_id
+        :param str path: Specify the snapshot's path
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        """
+
+        df = SchemaHandler.compact(df, kind).reset_index()
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = {'kind': kind,
+                    'timestamp': str(datetime.datetime.utcnow()),
+                    'schema_version': SnapshotHandler.SCHEMA_VERSION}
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               SnapshotHandler.METADATA_KEY: json.dumps(metadata)})
+
+        temporary_path = f'{path}.tmp'
+        feather.write_feather(table, temporary_path, compression='uncompressed')
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def read(path, columns=None):
+        """
+        Reads a Feather snapshot, optionally projecting a subset of its columns.
+
+        :param str path: Specify the snapshot's path
+        :param list columns: Specify the columns to read besides the index, None reads every column
+        :return: A dataframe indexed by thread_id
+        """
+
+        return SnapshotHandler.to_frame(SnapshotHandler.open_table(path), columns=columns)
+
+    @staticmethod
+    def open_table(path):
+        """
+        Memory-maps a Feather snapshot as an Arrow table without reading its columns.
+
+        The operating system pages the columns in on first access, hence opening a snapshot is nearly free and the
+        same pages are shared by every dataframe converted from the table.
+
+        :param str path: Specify the snapshot's path
+        :return: A memory-mapped Arrow table
+        """
+
+        SnapshotHandler.read_metadata(path)
+
+        return feather.read_table(path, memory_map=True)
+
+    @staticmethod
+    def to_frame(table, columns=None):
+        """
+        Converts a subset of a snapshot table's columns into a dataframe, sharing memory where possible.
+
+        Numeric and datetime columns without missing values are not copied, they point straight into the
+        memory-mapped snapshot and are therefore read-only; assign new columns instead of modifying them in place.
+        Snapshots written by an older schema version, or streamed without compaction, are compacted after the
+        conversion.
+
+        :param pa.Table table: Specify the snapshot table, as returned by open_table
+        :param list columns: Specify the columns to convert besides the index, None converts every column
+        :return: A dataframe indexed by thread_id
+        """
+
+        metadata = json.loads(table.schema.metadata[SnapshotHandler.METADATA_KEY])
+        index = SchemaHandler.get_schema(metadata['kind'])['index']
+
+        if columns is None:
+            columns = [column for column in table.column_names if column != index]
+
+        # Assigns the index rather than calling set_index, which would copy every column
+        df = table.select([column for column in columns if column != index]).to_pandas(split_blocks=True)
+        df.index = pd.Index(table.column(index).to_numpy(), name=index)
+
+        if metadata['schema_version'] < SnapshotHandler.SCHEMA_VERSION or not metadata.get('compacted', True):
+            df = SchemaHandler.compact(df, metadata['kind'])
+
+        return df
+
+    @staticmethod
+    def read_metadata(path):
+        """
+        Reads the snapshot's metadata without loading its columns.
+
+        :param str path: Specify the snapshot's path
+        :return: A dictionary holding the snapshot's kind, timestamp and schema version
+        """
+
+        with pa.memory_map(path) as source:
+            schema = pa.ipc.open_file(source).schema
+
+        metadata = json.loads(schema.metadata[SnapshotHandler.METADATA_KEY])
+
+        # Older snapshots are still readable, their columns are compacted when converted into a dataframe
+        if metadata['schema_version'] > SnapshotHandler.SCHEMA_VERSION:
+            raise ValueError(f'{path} has schema version {metadata["schema_version"]}, '
+                             f'expected at most {SnapshotHandler.SCHEMA_VERSION}')
+
+        return metadata
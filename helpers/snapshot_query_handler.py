@@ -0,0 +1,307 @@
+import datetime
+import json
+import sqlite3
+import threading
+
+import pandas as pd
+
+from helpers.schema_handler import SchemaHandler
+
+
+class SnapshotQueryHandler:
+    """
+    Indexed copy of the snapshots stored in a SQLite database, answering filtered, paginated and projected reads
+    without loading the whole dataframes.
+
+    Each snapshot kind is stored in a table of the same name, in the snapshot's row order, alongside the version of
+    the data it was built from; a table is rebuilt only once that version changes. Tables are rebuilt aside then
+    swapped in a single transaction, hence readers in other processes never see a partially built table. Datetimes
+    are stored as fixed-width UTC strings to the microsecond, which sort chronologically.
+
+    Attributes
+    ----------
+        INDEXES             Columns indexed in the table of each kind
+        DATE_COLUMNS        Column filtered by the since and until bounds of each kind
+        DATE_FORMAT         Format of the stored datetimes
+        path                Path of the SQLite database
+        __connection        SQLite connection shared by every thread
+        __lock              Serializes the access to the connection
+
+    Methods
+    -------
+        get_version(kind):
+            Returns the version of the data the kind's table was built from.
+        build(kind, df, version, chunk_rows=50000):
+            Replaces the kind's table with the dataframe's rows.
+        query(kind, columns=None, filters=None, since=None, until=None, order_by=None, descending=False, limit=100,
+              offset=0):
+            Returns a page of the rows matching the filters.
+        count(kind, filters=None, since=None, until=None):
+            Returns the number of rows matching the filters.
+        close():
+            Closes the database.
+    """
+
+    INDEXES = {
+        'threads': ['thread_id', 'poster_id'],
+        'threads_details': ['thread_id', 'user_id', 'user_post_date'],
+    }
+    DATE_COLUMNS = {'threads': 'date_posted', 'threads_details': 'user_post_date'}
+    DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+    def __init__(self, path='cached_snapshots.sqlite'):
+        """
+        :param str path: Specify the path of the SQLite database
+        """
+
+        self.path = path
+        self.__lock = threading.Lock()
+
+        # Transactions are issued explicitly, so a rebuilt table is swapped in at once
+        self.__connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS versions (kind TEXT PRIMARY KEY, version TEXT)')
+
+    @staticmethod
+    def __to_column_type(kind, column, series):
+        """
+        Returns the SQLite type of a column.
+
+        :param str kind: Specify the snapshot kind
+        :param str column: Specify the column's name
+        :param pd.Series series: Specify the column's values
+        :return: The column's type
+        """
+
+        schema = SchemaHandler.get_schema(kind)
+
+        if column in schema['integer'] or column in schema['bool'] or column == schema['index']:
+            return 'INTEGER'
+
+        if column in schema['datetime'] or not pd.api.types.is_numeric_dtype(series):
+            return 'TEXT'
+
+        return 'REAL'
+
+    @staticmethod
+    def __to_values(series):
+        """
+        Converts a column into values SQLite stores, missing values being None.
+
+        :param pd.Series series: Specify the column
+        :return: A list of values
+        """
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime(SnapshotQueryHandler.DATE_FORMAT)
+
+        return series.astype(object).where(series.notna(), None).tolist()
+
+    @staticmethod
+    def __to_date(value):
+        """
+        Converts a date bound into the format of the stored datetimes, naive dates being considered as UTC.
+
+        :param value: Specify a date string, datetime or timestamp
+        :return: The formatted date
+        """
+
+        timestamp = pd.Timestamp(value)
+        timestamp = timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+        return timestamp.strftime(SnapshotQueryHandler.DATE_FORMAT)
+
+    @staticmethod
+    def __to_parameter(value):
+        """
+        Converts a filtered value into a value SQLite compares with the stored ones.
+
+        :param value: Specify the value, e.g. an id or a datetime
+        :return: The converted value
+        """
+
+        if isinstance(value, (pd.Timestamp, datetime.datetime)):
+            return SnapshotQueryHandler.__to_date(value)
+
+        # Numpy scalars, e.g. taken from a dataframe, are not supported by sqlite3
+        return value.item() if hasattr(value, 'item') else value
+
+    def __get_columns(self, kind):
+        """
+        Returns the columns of the kind's table.
+
+        :param str kind: Specify the snapshot kind
+        :return: A list of column names, in table order
+        """
+
+        SchemaHandler.get_schema(kind)
+
+        columns = [row[1] for row in self.__connection.execute(f'PRAGMA table_info({kind})').fetchall()]
+        if not columns:
+            raise FileNotFoundError(f'{self.path} holds no {kind} table, build must be called first')
+
+        return columns
+
+    def get_version(self, kind):
+        """
+        Returns the version of the data the kind's table was built from.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :return: The version as passed to build, None if the table was never built
+        """
+
+        with self.__lock:
+            row = self.__connection.execute('SELECT version FROM versions WHERE kind = ?', (kind,)).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def build(self, kind, df, version, chunk_rows=50000):
+        """
+        Replaces the kind's table with the dataframe's rows, indexing the columns of INDEXES.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :param pd.DataFrame df: Specify the dataframe, indexed by thread_id
+        :param version: Specify a JSON serializable version of the data, e.g. ForumScraper.get_version
+        :param int chunk_rows: Specify the number of rows converted and inserted at once
+        """
+
+        schema = SchemaHandler.get_schema(kind)
+        df = df.rename_axis(schema['index']).reset_index()
+
+        definitions = ', '.join(f'"{column}" {SnapshotQueryHandler.__to_column_type(kind, column, df[column])}'
+                                for column in df.columns)
+        placeholders = ', '.join('?' for _ in df.columns)
+        building = f'{kind}_building'
+
+        with self.__lock:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.__connection.execute(f'DROP TABLE IF EXISTS {building}')
+                self.__connection.execute(f'CREATE TABLE {building} ({definitions})')
+
+                for start in range(0, len(df), chunk_rows):
+                    chunk_df = df.iloc[start:start + chunk_rows]
+                    rows = zip(*[SnapshotQueryHandler.__to_values(chunk_df[column]) for column in chunk_df.columns])
+                    self.__connection.executemany(f'INSERT INTO {building} VALUES ({placeholders})', rows)
+
+                self.__connection.execute(f'DROP TABLE IF EXISTS {kind}')
+                self.__connection.execute(f'ALTER TABLE {building} RENAME TO {kind}')
+
+                for column in SnapshotQueryHandler.INDEXES[kind]:
+                    if column in df:
+                        self.__connection.execute(f'CREATE INDEX {kind}_{column} ON {kind} ("{column}")')
+
+                self.__connection.execute('INSERT OR REPLACE INTO versions (kind, version) VALUES (?, ?)',
+                                          (kind, json.dumps(version)))
+                self.__connection.execute('COMMIT')
+            except BaseException:
+                self.__connection.execute('ROLLBACK')
+                raise
+
+            self.__connection.execute('ANALYZE')
+
+    def __get_where(self, kind, columns, filters, since, until):
+        """
+        Builds the WHERE clause of the filters.
+
+        :param str kind: Specify the snapshot kind
+        :param list columns: Specify the columns of the kind's table
+        :param dict filters: Specify the value, or list of values, each filtered column must hold
+        :param since: Specify the earliest date of the kind's date column, None does not bound it
+        :param until: Specify the latest date (excluded) of the kind's date column, None does not bound it
+        :return: A tuple of the clause, empty if there is no filter, and its parameters
+        """
+
+        conditions = []
+        parameters = []
+
+        for column, value in (filters or {}).items():
+            if column not in columns:
+                raise ValueError(f'{kind} has no column {column}')
+
+            if isinstance(value, (list, tuple, set)):
+                values = [SnapshotQueryHandler.__to_parameter(item) for item in value]
+                conditions.append(f'"{column}" IN ({", ".join("?" for _ in values)})' if values else '0')
+                parameters.extend(values)
+            elif value is None:
+                conditions.append(f'"{column}" IS NULL')
+            else:
+                conditions.append(f'"{column}" = ?')
+                parameters.append(SnapshotQueryHandler.__to_parameter(value))
+
+        date_column = SnapshotQueryHandler.DATE_COLUMNS[kind]
+        for operator, bound in [('>=', since), ('<', until)]:
+            if bound is not None:
+                conditions.append(f'"{date_column}" {operator} ?')
+                parameters.append(SnapshotQueryHandler.__to_date(bound))
+
+        return (f' WHERE {" AND ".join(conditions)}' if conditions else ''), parameters
+
+    def query(self, kind, columns=None, filters=None, since=None, until=None, order_by=None, descending=False,
+              limit=100, offset=0):
+        """
+        Returns a page of the rows matching the filters, e.g. the posts of a user or those of a thread between two
+        dates. Filters on the indexed columns are answered without scanning the table.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :param list columns: Specify the columns to read besides thread_id, None reads every column
+        :param dict filters: Specify the value, or list of values, each filtered column must hold, e.g.
+                             {'user_id': 42}
+        :param since: Specify the earliest date of DATE_COLUMNS' column, None does not bound it
+        :param until: Specify the latest date (excluded) of DATE_COLUMNS' column, None does not bound it
+        :param str order_by: Specify the column ordering the rows, None keeps the snapshot's order
+        :param bool descending: Orders the rows in descending order
+        :param int limit: Specify the maximum number of rows, None reads every matching row
+        :param int offset: Specify the number of matching rows to skip
+        :return: A dataframe indexed by thread_id, in the compact dtypes of its kind
+        """
+
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            raise ValueError('limit must be a non-negative integer or None')
+
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError('offset must be a non-negative integer')
+
+        schema = SchemaHandler.get_schema(kind)
+
+        with self.__lock:
+            table_columns = self.__get_columns(kind)
+
+            for column in [*(columns or []), *([order_by] if order_by is not None else [])]:
+                if column not in table_columns:
+                    raise ValueError(f'{kind} has no column {column}')
+
+            selected = table_columns if columns is None \
+                else [schema['index'], *[column for column in columns if column != schema['index']]]
+            where, parameters = self.__get_where(kind, table_columns, filters, since, until)
+            projection = ', '.join(f'"{column}"' for column in selected)
+            order = 'rowid' if order_by is None else f'"{order_by}" {"DESC" if descending else "ASC"}, rowid'
+
+            df = pd.read_sql_query(f'SELECT {projection} FROM {kind}{where} ORDER BY {order} LIMIT ? OFFSET ?',
+                                   self.__connection, params=[*parameters, -1 if limit is None else limit, offset])
+
+        return SchemaHandler.compact(df.set_index(schema['index']), kind)
+
+    def count(self, kind, filters=None, since=None, until=None):
+        """
+        Returns the number of rows matching the filters, e.g. to paginate query.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :param dict filters: Specify the value, or list of values, each filtered column must hold
+        :param since: Specify the earliest date of DATE_COLUMNS' column, None does not bound it
+        :param until: Specify the latest date (excluded) of DATE_COLUMNS' column, None does not bound it
+        :return: The number of rows
+        """
+
+        with self.__lock:
+            where, parameters = self.__get_where(kind, self.__get_columns(kind), filters, since, until)
+
+            return self.__connection.execute(f'SELECT COUNT(*) FROM {kind}{where}', parameters).fetchone()[0]
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        with self.__lock:
+            self.__connection.close()
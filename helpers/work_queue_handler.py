@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from helpers.checkpoint_handler import CheckpointHandler
+
+
+class WorkQueueHandler:
+    """
+    Durable work queue shared by the coordinator and the workers of a crawl, stored in a SQLite database.
+
+    Workers claim units under a lease: a claimed unit belongs to its worker until the lease expires, after which any
+    worker may claim it again, hence the units of a crashed worker are reassigned once their lease expires. Units are
+    completed alongside their parsed rows, the database thereby acting as the sink shared by every worker. A unit
+    claimed max_attempts times without being completed is considered failed and is no longer claimed.
+
+    Claims are atomic across processes, hence the workers may run on any machine sharing the database's directory,
+    as long as its file system supports SQLite's locking.
+
+    Attributes
+    ----------
+        path                Path of the SQLite database
+        lease_seconds       Number of seconds a claimed unit belongs to its worker
+        max_attempts        Maximum number of claims of a single unit
+        __connection        SQLite connection shared by every thread
+        __lock              Serializes the access to the connection
+
+    Methods
+    -------
+        enqueue(units):
+            Appends units to the queue, keeping the units already enqueued as they are.
+        claim(worker, limit=1):
+            Leases the next pending or expired units to a worker.
+        complete(worker, key, rows):
+            Stores the parsed rows of a unit, completing it.
+        release(worker, keys):
+            Hands the units leased to a worker back to the queue.
+        get_stats():
+            Returns the number of pending, leased, expired, done and failed units.
+        is_finished():
+            Checks whether every unit is either done or failed.
+        load_results():
+            Returns the payload and parsed rows of every completed unit, in enqueuing order.
+        close():
+            Closes the database.
+        discard():
+            Closes and deletes the database once the crawl's output is safely stored.
+    """
+
+    def __init__(self, path='crawl_queue.sqlite', lease_seconds=300, max_attempts=5):
+        """
+        :param str path: Specify the path of the SQLite database
+        :param float lease_seconds: Specify the number of seconds a claimed unit belongs to its worker
+        :param int max_attempts: Specify the maximum number of claims of a single unit
+        """
+
+        if not isinstance(lease_seconds, (int, float)) or lease_seconds <= 0:
+            raise ValueError('lease_seconds must be a positive number')
+
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError('max_attempts must be a positive integer')
+
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.__lock = threading.Lock()
+
+        # Transactions are issued explicitly, so a claim locks the database from its read to its write
+        self.__connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS units ('
+                                  'key TEXT PRIMARY KEY, position INTEGER, payload TEXT, status TEXT, worker TEXT, '
+                                  'lease_expires REAL, attempts INTEGER, rows TEXT)')
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS units_status_position ON units (status, position)')
+
+    def enqueue(self, units):
+        """
+        Appends units to the queue, keeping the units already enqueued as they are.
+
+        :param list units: Specify the units as tuples of a unique key and a JSON serializable payload, in the order
+                           they should be claimed
+        :return: The number of newly enqueued units
+        """
+
+        with self.__lock:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            try:
+                position = self.__connection.execute('SELECT COALESCE(MAX(position), -1) FROM units').fetchone()[0]
+                changes = self.__connection.total_changes
+
+                self.__connection.executemany(
+                    "INSERT OR IGNORE INTO units (key, position, payload, status, attempts) "
+                    "VALUES (?, ?, ?, 'pending', 0)",
+                    [(key, position + i, json.dumps(payload)) for i, (key, payload) in enumerate(units, start=1)])
+
+                self.__connection.execute('COMMIT')
+            except BaseException:
+                self.__connection.execute('ROLLBACK')
+                raise
+
+            return self.__connection.total_changes - changes
+
+    def claim(self, worker, limit=1):
+        """
+        Leases the next pending or expired units to a worker.
+
+        :param str worker: Specify the worker's id
+        :param int limit: Specify the maximum number of units to lease
+        :return: A list of tuples of the leased units' keys and payloads, empty if no unit is claimable right now
+        """
+
+        now = time.time()
+
+        with self.__lock:
+            self.__connection.execute('BEGIN IMMEDIATE')
+            try:
+                units = self.__connection.execute(
+                    "SELECT key, payload FROM units WHERE attempts < ? AND "
+                    "(status = 'pending' OR (status = 'leased' AND lease_expires < ?)) ORDER BY position LIMIT ?",
+                    (self.max_attempts, now, limit)).fetchall()
+
+                self.__connection.executemany(
+                    "UPDATE units SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE key = ?", [(worker, now + self.lease_seconds, key) for key, _ in units])
+
+                self.__connection.execute('COMMIT')
+            except BaseException:
+                self.__connection.execute('ROLLBACK')
+                raise
+
+        return [(key, json.loads(payload)) for key, payload in units]
+
+    def complete(self, worker, key, rows):
+        """
+        Stores the parsed rows of a unit, completing it.
+
+        A worker whose lease expired may still complete its unit, since every worker parses a unit into the same rows;
+        the first completion is kept.
+
+        :param str worker: Specify the worker's id
+        :param str key: Specify the unit's key
+        :param list rows: Specify the unit's parsed rows
+        :return: True if the unit was not completed yet
+        """
+
+        with self.__lock:
+            cursor = self.__connection.execute(
+                "UPDATE units SET status = 'done', worker = ?, lease_expires = NULL, rows = ? "
+                "WHERE key = ? AND status != 'done'", (worker, json.dumps(CheckpointHandler.encode_rows(rows)), key))
+
+        return cursor.rowcount > 0
+
+    def release(self, worker, keys):
+        """
+        Hands the units leased to a worker back to the queue, e.g. after failing to fetch them.
+
+        :param str worker: Specify the worker's id
+        :param list keys: Specify the units' keys
+        """
+
+        with self.__lock:
+            self.__connection.executemany(
+                "UPDATE units SET status = 'pending', worker = NULL, lease_expires = NULL "
+                "WHERE key = ? AND status = 'leased' AND worker = ?", [(key, worker) for key in keys])
+
+    def get_stats(self):
+        """
+        Returns the number of pending, leased, expired, done and failed units.
+
+        :return: A dictionary of counters
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT "
+                "COALESCE(SUM(status = 'pending' AND attempts < :max_attempts), 0), "
+                "COALESCE(SUM(status = 'leased' AND lease_expires >= :now), 0), "
+                "COALESCE(SUM(status = 'leased' AND lease_expires < :now AND attempts < :max_attempts), 0), "
+                "COALESCE(SUM(status = 'done'), 0), "
+                "COALESCE(SUM(status != 'done' AND attempts >= :max_attempts AND "
+                "NOT (status = 'leased' AND lease_expires >= :now)), 0) "
+                "FROM units", {'max_attempts': self.max_attempts, 'now': time.time()}).fetchone()
+
+        return dict(zip(['pending', 'leased', 'expired', 'done', 'failed'], row))
+
+    def is_finished(self):
+        """
+        Checks whether every unit is either done or failed.
+
+        :return: True if no unit is left to claim nor leased
+        """
+
+        stats = self.get_stats()
+
+        return stats['pending'] == stats['leased'] == stats['expired'] == 0
+
+    def load_results(self):
+        """
+        Returns the payload and parsed rows of every completed unit, in enqueuing order.
+
+        :return: A list of tuples of the units' keys, payloads and parsed rows
+        """
+
+        with self.__lock:
+            units = self.__connection.execute(
+                "SELECT key, payload, rows FROM units WHERE status = 'done' ORDER BY position").fetchall()
+
+        return [(key, json.loads(payload), CheckpointHandler.decode_rows(json.loads(rows)))
+                for key, payload, rows in units]
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        with self.__lock:
+            self.__connection.close()
+
+    def discard(self):
+        """
+        Closes and deletes the database once the crawl's output is safely stored.
+        """
+
+        self.close()
+
+        for path in [self.path, f'{self.path}-wal', f'{self.path}-shm']:
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,24 +1,153 @@
+import argparse
+import time
+
+from helpers.metrics_handler import MetricsHandler
+from helpers.row_sink_handler import RowSinkHandler
+from providers.benchmark_provider import BenchmarkProvider
+from providers.forum_scraper import ForumScraper
+from providers.mock_forum_server import MockForumServer
 from providers.plots_provider import PlotsProvider
+from providers.render_provider import RenderProvider
+
+# Guards the invocations since the parsing process pool re-imports this module on platforms which spawn processes
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scrapes the forum and plots the collected data.')
+    parser.add_argument('--base-url', metavar='URL',
+                        help='root url of the XenForo forum to crawl, e.g. a local mock server '
+                             '(default: https://www.mentalhealthforum.net/forum/)')
+    parser.add_argument('--metrics', metavar='METRICS_PATH',
+                        help='exports the crawl\'s timings, queue depths and retries into METRICS_PATH, as Prometheus '
+                             'text if it ends with .prom or as JSON lines otherwise')
+    parser.add_argument('--forums', metavar='FORUM', nargs='+',
+                        help='ids, url paths or urls of the sub-forums to crawl (default: the covid-19 sub-forum)')
+    parser.add_argument('--rebuild-from-archive', metavar='ARCHIVE_DIR',
+                        help='rebuilds the snapshots by re-parsing the pages archived in ARCHIVE_DIR')
+    parser.add_argument('--stream-details', metavar='FORMAT', nargs='?', const='feather',
+                        choices=RowSinkHandler.FORMATS,
+                        help='scraps the thread\'s details in bounded memory, streaming them to disk as FORMAT '
+                             '(default: feather)')
+    parser.add_argument('--enqueue', metavar='QUEUE_PATH',
+                        help='enqueues every thread\'s page into the work queue QUEUE_PATH, to be crawled by workers')
+    parser.add_argument('--worker', metavar='QUEUE_PATH',
+                        help='crawls pages claimed from the work queue QUEUE_PATH until none is left')
+    parser.add_argument('--collect', metavar='QUEUE_PATH',
+                        help='gathers the pages crawled by the workers from QUEUE_PATH into the thread\'s details '
+                             'snapshot')
+    parser.add_argument('--benchmark', metavar='OUTPUT_PATH',
+                        help='benchmarks the parsers, the snapshot loads and the plots offline, writing the results '
+                             'into the JSON file OUTPUT_PATH')
+    parser.add_argument('--benchmark-scales', metavar='SCALE', type=int, nargs='+', default=[1, 10, 100],
+                        help='factors the snapshots are scaled by when benchmarking (default: 1 10 100)')
+    parser.add_argument('--benchmark-archive', metavar='ARCHIVE_DIR',
+                        help='archive of recorded pages parsed when benchmarking (default: pages rendered out of the '
+                             'snapshots)')
+    parser.add_argument('--benchmark-baseline', metavar='BASELINE_PATH',
+                        help='compares the benchmark results with those of BASELINE_PATH, e.g. from another commit')
+    parser.add_argument('--mock-server', metavar='PORT', type=int,
+                        help='serves a local mock of the forum out of the saved snapshots on PORT until interrupted')
+    parser.add_argument('--mock-latency', metavar='SECONDS', type=float, default=0.0,
+                        help='minimum delay of each mock response (default: 0)')
+    parser.add_argument('--mock-error-rate', metavar='PROBABILITY', type=float, default=0.0,
+                        help='probability of a mock response failing with a 5xx status (default: 0)')
+    parser.add_argument('--mock-throttle-rate', metavar='PROBABILITY', type=float, default=0.0,
+                        help='probability of a mock response being throttled with a 429 status (default: 0)')
+    parser.add_argument('--mock-rate-limit', metavar='REQUESTS', type=float,
+                        help='number of requests per second past which the mock throttles (default: unlimited)')
+    parser.add_argument('--render', metavar='OUTPUT_DIR',
+                        help='renders every plot from the saved snapshots into OUTPUT_DIR instead of showing them')
+    parser.add_argument('--format', choices=RenderProvider.FORMATS, default='png',
+                        help='image format of the rendered plots (default: png)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of parsing or rendering processes (default: every core)')
+    parser.add_argument('--force', action='store_true',
+                        help='renders every plot, even those whose snapshot did not change')
+    args = parser.parse_args()
+
+    if args.base_url is not None:
+        ForumScraper.set_base_url(args.base_url)
+
+    if args.metrics is not None:
+        if args.metrics.endswith('.prom'):
+            ForumScraper.set_metrics([MetricsHandler.prometheus_sink(args.metrics)])
+        else:
+            ForumScraper.set_metrics([MetricsHandler.json_lines_sink(args.metrics)])
+
+    if args.forums is not None:
+        ForumScraper.set_forums(args.forums)
+
+    if args.rebuild_from_archive is not None:
+        ForumScraper.rebuild_from_archive(args.rebuild_from_archive, processes=args.processes)
+
+    if args.stream_details is not None:
+        ForumScraper.stream_threads_details(file_format=args.stream_details)
+
+    if args.enqueue is not None:
+        ForumScraper.enqueue_threads_details(queue_path=args.enqueue)
+
+    if args.worker is not None:
+        ForumScraper.run_worker(queue_path=args.worker)
+
+    if args.collect is not None:
+        ForumScraper.collect_threads_details(queue_path=args.collect)
+
+    if args.mock_server is not None:
+        server = MockForumServer.from_snapshots(port=args.mock_server, latency=args.mock_latency,
+                                                error_rate=args.mock_error_rate,
+                                                throttle_rate=args.mock_throttle_rate,
+                                                rate_limit=args.mock_rate_limit)
+        print(f'Serving the mock forum at {server.start()}, press Ctrl+C to stop')
+
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+
+        print(f'Mock server stats: {server.get_stats()}')
+
+    if args.benchmark is not None:
+        BenchmarkProvider.run(args.benchmark, scales=args.benchmark_scales, archive=args.benchmark_archive)
+
+        if args.benchmark_baseline is not None:
+            regressions = BenchmarkProvider.compare(args.benchmark_baseline, args.benchmark)
+            print(f'{len(regressions)} regression(s) against {args.benchmark_baseline}')
+
+    if args.render is not None:
+        rendered = RenderProvider.render_all(args.render, image_format=args.format, processes=args.processes,
+                                             force=args.force)
+
+        for chart, paths in rendered.items():
+            print(f'{chart}: {", ".join(paths)}')
+
+        print('Done.')
+    elif all(task is None for task in [args.rebuild_from_archive, args.stream_details, args.enqueue, args.worker,
+                                       args.collect, args.benchmark, args.mock_server]):
+        print('Scraping....')
+        print('--------------------------------------------------')
+
+        # Fetches from threads
+        PlotsProvider.plot_threads_posting()
+        PlotsProvider.plot_views_with_replies()
+        PlotsProvider.plot_view_with_replies_relation()
+        PlotsProvider.plot_top_15_thread_creators()
+        PlotsProvider.plot_top_15_oldest_threads()
+        PlotsProvider.plot_locked_sticky_threads()
+
+        # Fetches from thread's details
+        PlotsProvider.plot_replies()
+        PlotsProvider.plot_top_15_repliers()
+        PlotsProvider.plot_top_15_messages()
+        PlotsProvider.plot_user_titles()
+        PlotsProvider.plot_user_banners()
+        PlotsProvider.plot_users_joining()
+        PlotsProvider.plot_user_top_10_locations()
+
+        print('--------------------------------------------------')
+        print('Done.')
 
-print('Scraping....')
-print('--------------------------------------------------')
-
-# Fetches from threads
-PlotsProvider.plot_threads_posting()
-PlotsProvider.plot_views_with_replies()
-PlotsProvider.plot_view_with_replies_relation()
-PlotsProvider.plot_top_15_thread_creators()
-PlotsProvider.plot_top_15_oldest_threads()
-PlotsProvider.plot_locked_sticky_threads()
-
-# Fetches from thread's details
-PlotsProvider.plot_replies()
-PlotsProvider.plot_top_15_repliers()
-PlotsProvider.plot_top_15_messages()
-PlotsProvider.plot_user_titles()
-PlotsProvider.plot_user_banners()
-PlotsProvider.plot_users_joining()
-PlotsProvider.plot_user_top_10_locations()
-
-print('--------------------------------------------------')
-print('Done.')
+    # Reported once for the whole run, whichever tasks crawled
+    session_stats = ForumScraper.get_session_stats()
+    if session_stats['requests']:
+        print(f'Session stats: {session_stats}')
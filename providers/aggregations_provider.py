@@ -0,0 +1,286 @@
+from helpers.normalization_handler import NormalizationHandler
+from providers.forum_scraper import ForumScraper
+
+
+class AggregationsProvider:
+    """
+    Static methods which derive the tables shared by the plots, each computed once per data version.
+
+    Every table is memoized alongside the version of the data it was derived from (see ForumScraper.get_version),
+    hence rendering every plot reads each column once and a rewritten snapshot invalidates the derived tables.
+
+    Attributes
+    ----------
+        __tables            Memoized tables, mapping each table's key to its data version and value
+
+    Methods
+    -------
+        get_threads(columns, fast_fetch=True):
+            Retrieves only the needed threads columns.
+        get_threads_details(columns, fast_fetch=True, fast_fetch_threads=True):
+            Retrieves only the needed thread's details columns.
+        __get_version(kind, fast_fetch=True, fast_fetch_threads=True):
+            Returns the version of the data a table would be derived from.
+        __memoize(key, kind, build, fast_fetch=True, fast_fetch_threads=True):
+            Returns the memoized table, building it if the data changed since it was built.
+        clear():
+            Drops every memoized table.
+
+        get_daily_threads(fast_fetch=True):
+            Returns the number of threads, views and replies per day of posting.
+        get_oldest_threads(fast_fetch=True):
+            Returns the threads titles sorted by their posting date, oldest first.
+        get_thread_counts(column, fast_fetch=True):
+            Returns the number of threads per value of the column, in descending order.
+
+        get_daily_posts(fast_fetch=True, fast_fetch_threads=True):
+            Returns the number of posts per day.
+        get_post_counts(column, fast_fetch=True, fast_fetch_threads=True):
+            Returns the number of posts per value of the column, in descending order.
+        get_unique_users(fast_fetch=True, fast_fetch_threads=True):
+            Returns the profile of each user, as shown on their first post.
+        get_user_counts(column, fast_fetch=True, fast_fetch_threads=True):
+            Returns the number of users per value of the column, in descending order.
+        get_user_messages(fast_fetch=True, fast_fetch_threads=True):
+            Returns the number of messages of each user on all forums, in descending order.
+    """
+
+    __tables = {}
+
+    @staticmethod
+    def get_threads(columns, fast_fetch=True):
+        """
+        Retrieves only the needed threads columns.
+
+        :param list columns: Specify the needed columns
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :return: A threads dataframe
+        """
+
+        if fast_fetch:
+            return ForumScraper.load_threads(columns=columns)
+
+        return ForumScraper.scrap_threads(fast_fetch=False, columns=columns)
+
+    @staticmethod
+    def get_threads_details(columns, fast_fetch=True, fast_fetch_threads=True):
+        """
+        Retrieves only the needed thread's details columns.
+
+        :param list columns: Specify the needed columns
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A thread's details dataframe
+        """
+
+        if fast_fetch:
+            return ForumScraper.load_threads_details(columns=columns)
+
+        return ForumScraper.scrap_threads_details(fast_fetch=False, fast_fetch_threads=fast_fetch_threads,
+                                                  columns=columns)
+
+    @staticmethod
+    def __get_version(kind, fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the version of the data a table would be derived from.
+
+        :param str kind: Specify the dataframe kind, either 'threads' or 'threads_details'
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A hashable token
+        """
+
+        # Scraping first, so the version is the one of the freshly scraped data
+        if not fast_fetch:
+            if kind == 'threads':
+                AggregationsProvider.get_threads([], fast_fetch=False)
+            else:
+                AggregationsProvider.get_threads_details([], fast_fetch=False, fast_fetch_threads=fast_fetch_threads)
+
+        return ForumScraper.get_version(kind)
+
+    @staticmethod
+    def __memoize(key, kind, build, fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the memoized table, building it if the data changed since it was built.
+
+        :param tuple key: Specify the table's key
+        :param str kind: Specify the kind of the dataframe the table is derived from
+        :param build: Specify a callable building the table
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A copy of the table
+        """
+
+        version = AggregationsProvider.__get_version(kind, fast_fetch=fast_fetch,
+                                                     fast_fetch_threads=fast_fetch_threads)
+
+        if key not in AggregationsProvider.__tables or AggregationsProvider.__tables[key][0] != version:
+            AggregationsProvider.__tables[key] = (version, build())
+
+        return AggregationsProvider.__tables[key][1].copy()
+
+    @staticmethod
+    def clear():
+        """
+        Drops every memoized table.
+        """
+
+        AggregationsProvider.__tables.clear()
+
+    @staticmethod
+    def get_daily_threads(fast_fetch=True):
+        """
+        Returns the number of threads, views and replies per day of posting.
+
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :return: A dataframe indexed by day, holding the threads, views and replies columns
+        """
+
+        def build():
+            df = AggregationsProvider.get_threads(['date_posted', 'views', 'replies'], fast_fetch=fast_fetch)
+
+            grouped = df[['views', 'replies']].groupby(df['date_posted'].dt.normalize())
+
+            daily_df = grouped.sum()
+            daily_df.insert(0, 'threads', grouped.size())
+
+            return daily_df
+
+        return AggregationsProvider.__memoize(('daily_threads',), 'threads', build, fast_fetch=fast_fetch)
+
+    @staticmethod
+    def get_oldest_threads(fast_fetch=True):
+        """
+        Returns the threads titles sorted by their posting date, oldest first.
+
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :return: A dataframe holding the title and date_posted columns
+        """
+
+        def build():
+            df = AggregationsProvider.get_threads(['date_posted', 'title'], fast_fetch=fast_fetch)
+
+            return df.sort_values(by=['date_posted'], kind='stable')
+
+        return AggregationsProvider.__memoize(('oldest_threads',), 'threads', build, fast_fetch=fast_fetch)
+
+    @staticmethod
+    def get_thread_counts(column, fast_fetch=True):
+        """
+        Returns the number of threads per value of the column, in descending order.
+
+        :param str column: Specify the threads column
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :return: A series indexed by the column's values
+        """
+
+        def build():
+            df = AggregationsProvider.get_threads([column], fast_fetch=fast_fetch)
+
+            return df.groupby(column, observed=True).size().sort_values(ascending=False)
+
+        return AggregationsProvider.__memoize(('thread_counts', column), 'threads', build, fast_fetch=fast_fetch)
+
+    @staticmethod
+    def get_daily_posts(fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the number of posts per day.
+
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A series indexed by day
+        """
+
+        def build():
+            df = AggregationsProvider.get_threads_details(['user_post_date'], fast_fetch=fast_fetch,
+                                                          fast_fetch_threads=fast_fetch_threads)
+
+            return df.groupby(df['user_post_date'].dt.normalize()).size()
+
+        return AggregationsProvider.__memoize(('daily_posts',), 'threads_details', build, fast_fetch=fast_fetch,
+                                              fast_fetch_threads=fast_fetch_threads)
+
+    @staticmethod
+    def get_post_counts(column, fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the number of posts per value of the column, in descending order.
+
+        :param str column: Specify the thread's details column
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A series indexed by the column's values
+        """
+
+        def build():
+            df = AggregationsProvider.get_threads_details([column], fast_fetch=fast_fetch,
+                                                          fast_fetch_threads=fast_fetch_threads)
+
+            return df.groupby(column, observed=True).size().sort_values(ascending=False)
+
+        return AggregationsProvider.__memoize(('post_counts', column), 'threads_details', build,
+                                              fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+
+    @staticmethod
+    def get_unique_users(fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the profile of each user, as shown on their first post.
+
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A dataframe holding one row per user name
+        """
+
+        def build():
+            df = AggregationsProvider.get_threads_details(['user_name', 'user_messages', 'user_title',
+                                                           'user_banner_1', 'user_banner_2', 'user_join_date',
+                                                           'user_location'],
+                                                          fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+
+            users_df = df.drop_duplicates('user_name')
+            join_dates = NormalizationHandler.derive_date_parts(users_df['user_join_date'], parts=['year'])
+            users_df = users_df.assign(user_join_year=join_dates['year'])
+
+            return users_df
+
+        return AggregationsProvider.__memoize(('unique_users',), 'threads_details', build, fast_fetch=fast_fetch,
+                                              fast_fetch_threads=fast_fetch_threads)
+
+    @staticmethod
+    def get_user_counts(column, fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the number of users per value of the column, in descending order.
+
+        :param str column: Specify the column of the unique users table
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A series indexed by the column's values
+        """
+
+        def build():
+            users_df = AggregationsProvider.get_unique_users(fast_fetch=fast_fetch,
+                                                             fast_fetch_threads=fast_fetch_threads)
+
+            return users_df.groupby(column, observed=True).size().sort_values(ascending=False)
+
+        return AggregationsProvider.__memoize(('user_counts', column), 'threads_details', build,
+                                              fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+
+    @staticmethod
+    def get_user_messages(fast_fetch=True, fast_fetch_threads=True):
+        """
+        Returns the number of messages of each user on all forums, in descending order.
+
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: A series indexed by user name
+        """
+
+        def build():
+            users_df = AggregationsProvider.get_unique_users(fast_fetch=fast_fetch,
+                                                             fast_fetch_threads=fast_fetch_threads)
+
+            return users_df.groupby('user_name', observed=True)['user_messages'].sum().sort_values(ascending=False)
+
+        return AggregationsProvider.__memoize(('user_messages',), 'threads_details', build, fast_fetch=fast_fetch,
+                                              fast_fetch_threads=fast_fetch_threads)
@@ -0,0 +1,530 @@
+import contextlib
+import datetime
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from helpers.archive_handler import ArchiveHandler
+from helpers.schema_handler import SchemaHandler
+from helpers.snapshot_handler import SnapshotHandler
+from providers.aggregations_provider import AggregationsProvider
+from providers.forum_scraper import ForumScraper
+from providers.page_parser import PageParser
+from providers.page_renderer import PageRenderer
+from providers.plots_provider import PlotsProvider
+from providers.render_provider import RenderProvider
+
+
+class BenchmarkProvider:
+    """
+    Static methods which benchmark the parsing, loading and plotting hot paths offline.
+
+    Parsers are timed over a corpus of pages stored as an archive (see ArchiveHandler), either recorded while crawling
+    through ForumScraper.set_archive or rendered out of the snapshots by PageRenderer. Snapshots are scaled by
+    replicating every thread under new ids, the thread's details being synthesized from the threads when no snapshot
+    of them was saved. Results are written as a JSON document, so the runs of two commits can be compared.
+
+    Attributes
+    ----------
+        VERSION             Version of the results document's layout
+        CORPUS_URL          Root url of the rendered corpus' pages
+        __load_columns      Columns loaded by the projected snapshot loads, per snapshot kind
+        __titles            User titles of the synthesized posts
+        __banners           User banners of the synthesized posts, None standing for no banner
+        __locations         User locations of the synthesized posts, None standing for no location
+        __words             Vocabulary of the synthesized posts
+
+    Methods
+    -------
+        scale_snapshot(df, factor):
+            Replicates every thread of a snapshot under new ids.
+        synthesize_threads_details(threads_df, seed=0):
+            Synthesizes the posts of the threads, as many as each thread's replies plus its first post.
+        build_corpus(directory, threads_df, threads_details_df, listing_pages=40, thread_pages=200):
+            Renders listing pages and thread's pages out of the snapshots into an archive.
+        load_corpus(directory):
+            Reads the listing pages and thread's pages of an archive.
+        run(output_path='benchmark.json', directory='benchmark_data', scales=(1, 10, 100), repeat=3, archive=None):
+            Runs every benchmark, writing the results into a JSON document.
+        compare(baseline_path, current_path, tolerance=0.1, noise=0.005):
+            Compares two results documents, reporting the metrics which regressed beyond the tolerance.
+    """
+
+    VERSION = 1
+    CORPUS_URL = 'https://corpus.invalid/forum/'
+
+    __load_columns = {
+        'threads': ['views', 'replies'],
+        'threads_details': ['user_name', 'user_post_date'],
+    }
+
+    __titles = ['Member', 'Well-known member', 'Registered', 'Guest', 'Forum Buddy', 'Moderator']
+    __banners = [None, None, None, None, 'Staff', 'Premium']
+    __locations = [None, None, 'UK', 'London', 'USA', 'Canada', 'Australia', 'Ireland']
+    __words = ['hope', 'you', 'are', 'well', 'the', 'lockdown', 'has', 'been', 'hard', 'for', 'me', 'anxiety', 'sleep',
+               'vaccine', 'family', 'work', 'thanks', 'sharing', 'take', 'care', 'today', 'feel', 'better', 'worse']
+
+    @staticmethod
+    @contextlib.contextmanager
+    def __within_directory(directory):
+        """
+        Switches the working directory, where ForumScraper reads its snapshots, then unloads whatever was read.
+
+        :param str directory: Specify the directory
+        """
+
+        cwd = os.getcwd()
+        os.makedirs(directory, exist_ok=True)
+        os.chdir(directory)
+        ForumScraper.unload()
+        AggregationsProvider.clear()
+
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+            ForumScraper.unload()
+            AggregationsProvider.clear()
+
+    @staticmethod
+    def __measure(function, repeat):
+        """
+        Times several calls of a function.
+
+        :param function: Specify the function, called without arguments
+        :param int repeat: Specify the number of calls
+        :return: A list of durations, in seconds
+        """
+
+        samples = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            function()
+            samples.append(time.perf_counter() - started_at)
+
+        return samples
+
+    @staticmethod
+    def __to_result(name, params, samples, unit='s', better='lower', **extra):
+        """
+        Summarizes the samples of a benchmark into a result.
+
+        :param str name: Specify the benchmark's name
+        :param dict params: Specify the benchmark's parameters, identifying it alongside its name
+        :param list samples: Specify the measured values
+        :param str unit: Specify the values' unit
+        :param str better: Specify whether a 'lower' or a 'higher' value is better
+        :param extra: Specify any extra field of the result
+        :return: A dictionary
+        """
+
+        return {'name': name, 'params': params, 'unit': unit, 'better': better,
+                'value': statistics.median(samples), 'min': min(samples), 'max': max(samples),
+                'samples': samples, **extra}
+
+    @staticmethod
+    def __get_commit():
+        """
+        Returns the commit the benchmarks ran on.
+
+        :return: The commit's hash, None outside of a git checkout
+        """
+
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def scale_snapshot(df, factor):
+        """
+        Replicates every thread of a snapshot under new ids, each copy offset by a power of ten above the largest id.
+
+        :param pd.DataFrame df: Specify the snapshot, indexed by thread_id
+        :param int factor: Specify the number of copies
+        :return: A dataframe holding factor times the rows
+        """
+
+        if not isinstance(factor, int) or factor < 1:
+            raise ValueError('factor must be a positive integer')
+
+        offset = 10 ** len(str(int(df.index.max())))
+
+        copies = [df.set_axis(df.index + copy * offset) for copy in range(factor)]
+
+        return pd.concat(copies).rename_axis(df.index.name)
+
+    @staticmethod
+    def synthesize_threads_details(threads_df, seed=0):
+        """
+        Synthesizes the posts of the threads, as many as each thread's replies plus its first post.
+
+        Each thread is opened by its poster and replied to by any other poster, the posts being evenly spread between
+        the thread's posting and last reply dates.
+
+        :param pd.DataFrame threads_df: Specify the threads, indexed by thread_id
+        :param int seed: Specify the seed of the random generator
+        :return: A thread's details dataframe
+        """
+
+        rng = np.random.default_rng(seed)
+
+        poster_ids = threads_df['poster_id'].to_numpy(dtype='int64', na_value=-1)
+
+        users = pd.DataFrame({'user_id': poster_ids,
+                              'user_name': threads_df['poster_name'].astype(object).to_numpy(),
+                              'user_image': threads_df['poster_image'].astype(object).to_numpy()}) \
+            .drop_duplicates('user_id').reset_index(drop=True)
+        users['user_title'] = rng.choice(BenchmarkProvider.__titles, len(users))
+        users['user_banner_1'] = rng.choice(np.array(BenchmarkProvider.__banners, dtype=object), len(users))
+        users['user_join_date'] = pd.Timestamp('2019-01-01', tz='UTC') - \
+            pd.to_timedelta(rng.integers(0, 10 * 365, len(users)), unit='D')
+        users['user_messages'] = rng.lognormal(5, 1.5, len(users)).astype(int)
+        users['user_location'] = rng.choice(np.array(BenchmarkProvider.__locations, dtype=object), len(users))
+
+        counts = threads_df['replies'].fillna(0).to_numpy(dtype=int) + 1
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.arange(counts.sum()) - starts
+
+        # The first post of each thread belongs to its poster
+        poster_rows = pd.Index(users['user_id']).get_indexer(poster_ids)
+        user_rows = np.where(positions == 0, np.repeat(poster_rows, counts), rng.integers(0, len(users), len(starts)))
+
+        posted = threads_df['date_posted'].to_numpy(dtype='datetime64[ns]')
+        replied = threads_df['last_replied_date'].to_numpy(dtype='datetime64[ns]')
+        spans = np.repeat((replied - posted) / np.maximum(counts - 1, 1), counts)
+
+        lengths = rng.integers(3, 30, len(starts))
+        words = iter(rng.choice(BenchmarkProvider.__words, lengths.sum()))
+
+        def reactions(probability):
+            counters = np.where(rng.random(len(starts)) < probability, rng.integers(1, 10, len(starts)), -1)
+            return pd.Series(counters, dtype='Int64').where(lambda series: series >= 0)
+
+        threads_details_df = users.iloc[user_rows].reset_index(drop=True)
+        threads_details_df.insert(5, 'user_banner_2', None)
+        threads_details_df['post_reaction_like'] = reactions(0.3)
+        threads_details_df['post_reaction_thanks'] = reactions(0.1)
+        threads_details_df['post_reaction_hug'] = reactions(0.1)
+        threads_details_df['user_post_date'] = pd.to_datetime(np.repeat(posted, counts) + spans * positions, utc=True)
+        threads_details_df['user_post'] = [' '.join(next(words) for _ in range(length)) for length in lengths]
+        threads_details_df.index = pd.Index(np.repeat(threads_df.index.to_numpy(), counts), name='thread_id')
+
+        return SchemaHandler.compact(threads_details_df, 'threads_details')
+
+    @staticmethod
+    def build_corpus(directory, threads_df, threads_details_df, listing_pages=40, thread_pages=200):
+        """
+        Renders listing pages and thread's pages out of the snapshots into an archive.
+
+        Threads are listed by their last reply date, the most recent first, and each listed thread's pages are
+        rendered until thread_pages pages are rendered.
+
+        :param str directory: Specify the archive's directory, any previous archive is replaced
+        :param pd.DataFrame threads_df: Specify the threads, indexed by thread_id
+        :param pd.DataFrame threads_details_df: Specify the thread's details, indexed by thread_id
+        :param int listing_pages: Specify the maximum number of listing pages
+        :param int thread_pages: Specify the maximum number of thread's pages
+        :return: A tuple of the numbers of rendered listing and thread's pages
+        """
+
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+
+        archive = ArchiveHandler(directory)
+        threads_per_page = 20
+        posts_per_page = 20
+
+        try:
+            threads_df = threads_df.sort_values('last_replied_date', ascending=False, kind='stable')
+            pages = -(-len(threads_df) // threads_per_page)
+
+            rendered_listing_pages = min(pages, listing_pages)
+            for page in range(1, rendered_listing_pages + 1):
+                html = PageRenderer.render_threads_page(
+                    threads_df.iloc[(page - 1) * threads_per_page:page * threads_per_page], page=page, pages=pages)
+                archive.record(f'{BenchmarkProvider.CORPUS_URL}forums/corpus.0/page-{page}', html)
+
+            rendered_thread_pages = 0
+            posts = threads_details_df.groupby(level=0, sort=False)
+            for thread_id in threads_df.index:
+                if rendered_thread_pages >= thread_pages or thread_id not in posts.groups:
+                    continue
+
+                thread_posts = posts.get_group(thread_id)
+                pages = -(-len(thread_posts) // posts_per_page)
+
+                for page in range(1, min(pages, thread_pages - rendered_thread_pages) + 1):
+                    html = PageRenderer.render_threads_details_page(
+                        thread_posts.iloc[(page - 1) * posts_per_page:page * posts_per_page], page=page, pages=pages)
+                    archive.record(f'{BenchmarkProvider.CORPUS_URL}threads/{thread_id}/page-{page}', html)
+                    rendered_thread_pages += 1
+        finally:
+            archive.close()
+
+        return rendered_listing_pages, rendered_thread_pages
+
+    @staticmethod
+    def load_corpus(directory):
+        """
+        Reads the listing pages and thread's pages of an archive.
+
+        :param str directory: Specify the archive's directory
+        :return: A tuple of the listing pages' HTML and the thread's pages as tuples of their thread_id and HTML
+        """
+
+        listing_pages = []
+        thread_pages = []
+
+        for url, location in ArchiveHandler(directory).load_index().items():
+            thread = re.search(r'/threads/(?:[^/]*\.)?(\d+)/', f'{url}/')
+            if thread is not None:
+                thread_pages.append((int(thread.group(1)), ArchiveHandler.read_record(directory, location)))
+            elif '/forums/' in url:
+                listing_pages.append(ArchiveHandler.read_record(directory, location))
+
+        return listing_pages, thread_pages
+
+    @staticmethod
+    def __benchmark_parsers(listing_pages, thread_pages, repeat):
+        """
+        Measures the number of pages each parser backend extracts per second.
+
+        :param list listing_pages: Specify the listing pages' HTML
+        :param list thread_pages: Specify the thread's pages as tuples of their thread_id and HTML
+        :param int repeat: Specify the number of passes over the corpus
+        :return: A list of results
+        """
+
+        results = []
+
+        for backend in PageParser.BACKENDS:
+            try:
+                PageParser.parse_threads_page('', backend=backend)
+            except ImportError:
+                print(f'Skipping the {backend} backend, which is not installed')
+                continue
+
+            parsers = {
+                'threads_page': (listing_pages, lambda page: PageParser.parse_threads_page(page, backend=backend)),
+                'threads_details_page': (thread_pages,
+                                         lambda page: PageParser.parse_threads_details_page(page[1], page[0],
+                                                                                            backend=backend)),
+            }
+
+            for parser, (pages, parse) in parsers.items():
+                if not pages:
+                    continue
+
+                rows = sum(len(parse(page)) for page in pages)
+                samples = BenchmarkProvider.__measure(lambda: [parse(page) for page in pages], repeat)
+
+                results.append(BenchmarkProvider.__to_result(
+                    f'parse.{parser}', {'backend': backend}, [len(pages) / seconds for seconds in samples],
+                    unit='pages/s', better='higher', pages=len(pages), rows=rows))
+
+        return results
+
+    @staticmethod
+    def __benchmark_loads(scale, repeat):
+        """
+        Measures the load time of both snapshots of the working directory, whole and projected.
+
+        :param int scale: Specify the snapshots' scale, recorded alongside the results
+        :param int repeat: Specify the number of loads
+        :return: A list of results
+        """
+
+        results = []
+
+        for kind in ['threads', 'threads_details']:
+            path = f'cached_{kind}.feather'
+            samples = BenchmarkProvider.__measure(lambda: SnapshotHandler.read(path), repeat)
+            results.append(BenchmarkProvider.__to_result(f'load.{kind}', {'scale': scale, 'columns': 'all'}, samples,
+                                                         bytes=os.path.getsize(path)))
+
+            def load_projection():
+                ForumScraper.unload()
+                if kind == 'threads':
+                    return ForumScraper.load_threads(columns=BenchmarkProvider.__load_columns[kind])
+                return ForumScraper.load_threads_details(columns=BenchmarkProvider.__load_columns[kind])
+
+            samples = BenchmarkProvider.__measure(load_projection, repeat)
+            results.append(BenchmarkProvider.__to_result(
+                f'load.{kind}', {'scale': scale, 'columns': ','.join(BenchmarkProvider.__load_columns[kind])},
+                samples, bytes=os.path.getsize(path)))
+
+        return results
+
+    @staticmethod
+    def __benchmark_plots(scale, repeat):
+        """
+        Measures each plot's time from the snapshots of the working directory, splitting the aggregation time from the
+        drawing time.
+
+        A cold call loads the snapshots and derives the plot's tables, a warm call right after only draws from the
+        memoized tables, hence their difference is the aggregation time.
+
+        :param int scale: Specify the snapshots' scale, recorded alongside the results
+        :param int repeat: Specify the number of cold and warm call pairs
+        :return: A list of results
+        """
+
+        results = []
+
+        # plt.show does nothing on Agg, the figures are closed after each call
+        plt.switch_backend('Agg')
+
+        for chart in RenderProvider.get_charts():
+            plot = getattr(PlotsProvider, chart)
+
+            def call():
+                try:
+                    plot()
+                finally:
+                    plt.close('all')
+
+            def call_cold():
+                ForumScraper.unload()
+                AggregationsProvider.clear()
+                call()
+
+            cold_samples = []
+            warm_samples = []
+            for _ in range(repeat):
+                cold_samples += BenchmarkProvider.__measure(call_cold, 1)
+                warm_samples += BenchmarkProvider.__measure(call, 1)
+
+            aggregation_samples = [max(cold - warm, 0.0) for cold, warm in zip(cold_samples, warm_samples)]
+
+            results.append(BenchmarkProvider.__to_result('plot.aggregate', {'scale': scale, 'chart': chart},
+                                                         aggregation_samples))
+            results.append(BenchmarkProvider.__to_result('plot.draw', {'scale': scale, 'chart': chart}, warm_samples))
+
+        return results
+
+    @staticmethod
+    def run(output_path='benchmark.json', directory='benchmark_data', scales=(1, 10, 100), repeat=3, archive=None):
+        """
+        Runs every benchmark, writing the results into a JSON document.
+
+        The snapshots of the working directory (or the legacy CSV) are scaled into a sub-directory of directory per
+        scale, the thread's details being synthesized if no snapshot of them was saved. No request is sent.
+
+        :param str output_path: Specify the path of the results document
+        :param str directory: Specify the directory holding the scaled snapshots and the rendered corpus
+        :param tuple scales: Specify the factors the snapshots are scaled by
+        :param int repeat: Specify the number of measures of each benchmark
+        :param str archive: Specify the directory of an archive of recorded pages to parse, None parses pages rendered
+                            out of the snapshots
+        :return: The results document as a dictionary
+        """
+
+        if not scales or not all(isinstance(scale, int) and scale >= 1 for scale in scales):
+            raise ValueError('scales must be a non-empty list of positive integers')
+
+        if not isinstance(repeat, int) or repeat < 1:
+            raise ValueError('repeat must be a positive integer')
+
+        directory = os.path.abspath(directory)
+
+        ForumScraper.unload()
+        threads_df = ForumScraper.load_threads()
+        try:
+            threads_details_df = ForumScraper.load_threads_details()
+        except FileNotFoundError:
+            print('No thread\'s details snapshot was saved, synthesizing posts from the threads...')
+            threads_details_df = BenchmarkProvider.synthesize_threads_details(threads_df)
+        ForumScraper.unload()
+
+        if archive is None:
+            archive = os.path.join(directory, 'corpus')
+            BenchmarkProvider.build_corpus(archive, threads_df, threads_details_df)
+
+        listing_pages, thread_pages = BenchmarkProvider.load_corpus(archive)
+        print(f'Parsing {len(listing_pages)} listing page(s) and {len(thread_pages)} thread\'s page(s)...')
+
+        results = BenchmarkProvider.__benchmark_parsers(listing_pages, thread_pages, repeat)
+
+        for scale in scales:
+            print(f'Benchmarking the snapshots scaled {scale}x...')
+
+            with BenchmarkProvider.__within_directory(os.path.join(directory, f'x{scale}')):
+                SnapshotHandler.write(BenchmarkProvider.scale_snapshot(threads_df, scale),
+                                      'cached_threads.feather', 'threads')
+                SnapshotHandler.write(BenchmarkProvider.scale_snapshot(threads_details_df, scale),
+                                      'cached_threads_details.feather', 'threads_details')
+
+                results += BenchmarkProvider.__benchmark_loads(scale, repeat)
+                results += BenchmarkProvider.__benchmark_plots(scale, repeat)
+
+        document = {'version': BenchmarkProvider.VERSION,
+                    'timestamp': str(datetime.datetime.utcnow()),
+                    'commit': BenchmarkProvider.__get_commit(),
+                    'python': platform.python_version(),
+                    'pandas': pd.__version__,
+                    'platform': platform.platform(),
+                    'cpus': os.cpu_count(),
+                    'rows': {'threads': len(threads_df), 'threads_details': len(threads_details_df)},
+                    'results': results}
+
+        temporary_path = f'{output_path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=4)
+        os.replace(temporary_path, output_path)
+
+        return document
+
+    @staticmethod
+    def compare(baseline_path, current_path, tolerance=0.1, noise=0.005):
+        """
+        Compares two results documents, reporting the metrics which regressed beyond the tolerance.
+
+        Durations differing by less than noise seconds are considered unchanged, since the shortest ones mostly vary
+        with the machine's load.
+
+        :param str baseline_path: Specify the path of the baseline's results document
+        :param str current_path: Specify the path of the current results document
+        :param float tolerance: Specify the relative change under which a metric is considered unchanged
+        :param float noise: Specify the absolute change, in seconds, under which a duration is considered unchanged
+        :return: A list of tuples of the regressed metrics' names, parameters and relative changes
+        """
+
+        def load(path):
+            with open(path, encoding='utf-8') as f:
+                document = json.load(f)
+
+            return {(result['name'], json.dumps(result['params'], sort_keys=True)): result
+                    for result in document['results']}
+
+        baseline = load(baseline_path)
+        current = load(current_path)
+
+        regressions = []
+        for key, result in current.items():
+            if key not in baseline or not baseline[key]['value']:
+                continue
+
+            change = result['value'] / baseline[key]['value'] - 1
+            if result['better'] == 'higher':
+                regressed = change < -tolerance
+            else:
+                regressed = change > tolerance and result['value'] - baseline[key]['value'] > noise
+
+            print(f'{"REGRESSED" if regressed else "ok":<9} {key[0]:<28} {key[1]:<70} '
+                  f'{baseline[key]["value"]:>12.4f} -> {result["value"]:>12.4f} {result["unit"]:<7} {change:+.1%}')
+
+            if regressed:
+                regressions.append((key[0], result['params'], change))
+
+        return regressions
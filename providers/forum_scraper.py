@@ -1,11 +1,28 @@
-import datetime
+import contextlib
+import itertools
+import os
+import re
+import socket
+import time
 
-import cloudscraper as cloudscraper
 import pandas as pd
 import numpy as np
-import bs4
-import re
+import concurrent.futures
+from helpers.archive_handler import ArchiveHandler
+from helpers.checkpoint_handler import CheckpointHandler
+from helpers.fetch_handler import FetchHandler
+from helpers.metrics_handler import MetricsHandler
+from helpers.normalization_handler import NormalizationHandler
 from helpers.progress_handler import ProgressHandler
+from helpers.rate_limit_handler import RateLimitHandler
+from helpers.response_cache_handler import ResponseCacheHandler
+from helpers.row_sink_handler import RowSinkHandler
+from helpers.schema_handler import SchemaHandler
+from helpers.session_handler import SessionHandler
+from helpers.snapshot_handler import SnapshotHandler
+from helpers.snapshot_query_handler import SnapshotQueryHandler
+from helpers.work_queue_handler import WorkQueueHandler
+from providers.page_parser import PageParser
 
 
 class ForumScraper:
@@ -16,182 +33,725 @@ class ForumScraper:
     ----------
         __threads           Acts as a cache for storing threads
         __threads_details   Acts as a cache for storing thread's details
+        __threads_from_snapshot Whether __threads was read from the saved snapshot rather than scraped
+        __base_url          Root url of the XenForo forum, every forum's and thread's url is built from it
+        __forums            Forums to crawl, mapping each forum id to its path under __base_url
+        __legacy_forum_id   Forum id of the snapshots saved before several forums could be crawled
+        __session_handler   Pool of cloudscraper sessions shared across the crawl
+        __metrics           Registry of the crawl's timings, sizes, retries and queue depths, None records nothing
+        __response_cache    On-disk cache of the fetched pages, None always hits the network
+        __rate_limiter      Scheduler pacing, retrying and adapting the concurrency of the requests
+        __max_concurrency   Maximum number of requests in flight asked of the scheduler, before the host limit
+        __archive           Compressed archive of the raw fetched pages, None does not archive them
+        __fetch_handler     Concurrent engine fetching pages for both scrapers
+        __parse_processes   Number of processes parsing the fetched pages, None uses every core
+        __parser_backend    Backend used by PageParser, one of PageParser.BACKENDS
+        __posts_per_page    Number of posts the forum shows on each thread's page
+        __snapshot_tables   Memory-mapped snapshot tables, opened once per snapshot kind
+        __snapshot_store    Indexed SQLite copy of the snapshots answering the queries, opened on the first query
+        __memory_reports    Memory saved by compacting the last scraped dataframe of each kind
+        __track_memory      Whether the memory reports are computed, measuring every column being costly
+        __scrape_counts     Number of times each dataframe kind was scraped during this run
+        __headers           Headers sent alongside each request
 
     Methods
     -------
-        __get_cached_threads():
+        set_forums(forums):
+            Sets the forums to crawl, given their ids, their url paths or their urls.
+        set_base_url(base_url='https://www.mentalhealthforum.net/forum/'):
+            Sets the root url of the XenForo forum every forum's and thread's url is built from.
+        __get_forum_url(forum_id, page=1):
+            Returns the url of a forum's listing page.
+        __get_thread_url(thread_id, page=1):
+            Returns the url of a thread's page.
+        __interleave(items, queues):
+            Reorders the items round-robin across their queues, keeping the order of the items within each queue.
+        set_pool_size(pool_size=4):
+            Replaces the shared session pool with one of the given size.
+        get_session_stats():
+            Returns the per-run counts of requests, handshakes, challenge solves, response cache hits and retries.
+        set_metrics(sinks=None, interval=10.0):
+            Records the crawl's metrics, exporting them through the given sinks, a None sinks disables the metrics.
+        get_metrics():
+            Returns a snapshot of the crawl's metrics.
+        set_rate_limit(rate=8.0, burst=8, max_retries=5, backoff=1.0, max_concurrency=16):
+            Replaces the scheduler of the requests, a None rate only retries them without pacing.
+        __get_host_concurrency():
+            Returns the maximum number of requests the scheduler may adapt to.
+        set_response_cache(path='cached_responses.sqlite', ttl=86400, max_bytes=1073741824, offline=False):
+            Serves the requests from an on-disk response cache, a None path disables the cache.
+        set_archive(directory='archive', segment_bytes=67108864):
+            Archives every fetched page into compressed segments, a None directory disables the archive.
+        set_concurrency(max_workers=FetchHandler.MAX_WORKERS, per_host=FetchHandler.PER_HOST):
+            Replaces the concurrent fetch engine and resizes the session pool to match.
+        set_parse_processes(processes=None):
+            Sets the number of processes parsing the fetched pages.
+        set_parser_backend(backend='bs4'):
+            Sets the backend used to parse the fetched pages.
+        set_posts_per_page(posts_per_page=20):
+            Sets the number of posts the forum shows on each thread's page.
+        set_memory_reports(enabled=True):
+            Enables or disables the memory reports of the scraped dataframes.
+        get_memory_report(kind):
+            Returns the bytes saved per column by compacting the last scraped dataframe of the given kind.
+        __get(url, headers=None):
+            Issues a GET request through the shared session pool.
+        __get_parse_executor():
+            Starts a process pool of parsers, sized by set_parse_processes.
+        __fetch_and_parse(jobs, headers=None, checkpoint=None, queues=None, prefetched=None, progress=None,
+                          failed=None, parse_executor=None):
+            Fetches the urls concurrently and feeds each page into a process pool of parsers as soon as it arrives.
+
+        __has_snapshot(kind):
+            Checks whether a snapshot of the given kind was saved, either as Feather or as a legacy CSV.
+        __get_cached_threads(columns=None):
             Retrieves the thread's snapshot.
-        cache_threads():
+        cache_threads(incremental=False):
             Collects a snapshot of the threads for faster fetch in the future.
-        __get_threads_pagination():
-            Returns the pagination of the threads
-        __scrap_threads():
+        __get_threads_first_pages():
+            Fetches the first listing page of each forum, parsing both its pagination and its threads.
+        __to_threads_df(data):
+            Converts the rows extracted from the listing pages into a threads dataframe.
+        __walk_forum_incrementally(forum_id, known_dates):
+            Walks a forum's listing pages until reaching an unchanged thread.
+        __walk_forums_incrementally(threads_df):
+            Walks the listing pages of every forum concurrently until reaching an unchanged thread.
+        __scrap_threads_incrementally():
+            Walks the listing pages of every forum until reaching an unchanged thread, then merges them into the
+            saved snapshot.
+        __scrap_threads(fast_fetch=False, incremental=False):
             Scraps data containing a list of threads.
-        scrap_threads():
+        scrap_threads(fast_fetch=False, incremental=False, columns=None):
             Calls __scrap_threads if __threads is None, otherwise, it retrieves __threads immediately.
+        load_threads(columns=None):
+            Loads a subset of the threads columns without copying the whole threads dataframe.
 
-        __get_cached_threads_details():
+        __get_cached_threads_details(columns=None):
             Retrieves the thread's details snapshot.
-        cache_threads_details():
+        cache_threads_details(delta=False):
             Collects a snapshot of the thread's details for faster fetch in the future.
-        __get_threads_details_pagination():
-            Returns the pagination of the thread's details
-        __scrap_threads_details():
+        __to_threads_details_df(data):
+            Converts the rows extracted from the thread's pages into a thread's details dataframe.
+        __scrap_threads_details_delta(threads_df):
+            Fetches only the tail pages of the threads which changed since the saved snapshot, then merges them.
+        __get_stale_threads(threads_df):
+            Returns the threads whose last_replied_date changed since the threads were scraped.
+        __get_threads_details_jobs(threads_df, from_snapshot=False):
+            Plans the pages of each thread, then lists the jobs parsing every page of the threads.
+        __scrap_threads_details(fast_fetch=False, fast_fetch_threads=False, delta=False):
             Scraps data containing a list of thread's details.
-        scrap_threads_details():
+        scrap_threads_details(fast_fetch=False, fast_fetch_threads=False, delta=False, columns=None):
             Calls __scrap_threads_details if __threads_details is None, otherwise,
             it retrieves __threads_details immediately.
+        __iter_threads_details_batches(jobs, queues, prefetched, batch_pages):
+            Fetches and parses the pages in batches, yielding the normalized dataframe of each batch.
+        stream_threads_details(file_format='feather', batch_pages=200, fast_fetch_threads=False):
+            Scraps the thread's details in batches of pages, flushing each normalized batch to disk.
+        enqueue_threads_details(queue_path='crawl_queue.sqlite', fast_fetch_threads=False):
+            Enqueues every page of the threads into a durable work queue shared by any number of workers.
+        run_worker(queue_path='crawl_queue.sqlite', worker_id=None, batch_pages=20, lease_seconds=300,
+                   poll_seconds=5):
+            Claims batches of pages from the work queue, fetches and parses them, and stores their rows back.
+        collect_threads_details(queue_path='crawl_queue.sqlite', allow_failed=False):
+            Gathers the rows stored by the workers into the thread's details snapshot, then deletes the work queue.
+        load_threads_details(columns=None):
+            Loads a subset of the thread's details columns without copying the whole thread's details dataframe.
+        unload():
+            Drops the scraped dataframes and the memory-mapped snapshot tables.
+        get_version(kind):
+            Returns a token identifying the data currently returned by load_threads or load_threads_details.
+        __get_snapshot_version(kind):
+            Returns a token identifying the saved snapshot.
+        __load(kind, columns=None):
+            Loads a subset of a snapshot's columns from memory, the memory-mapped snapshot or the legacy CSV.
+        __load_snapshot(kind, columns=None):
+            Loads a subset of a saved snapshot's columns from the memory-mapped snapshot or the legacy CSV.
+        __get_snapshot_store(kind):
+            Returns the indexed copy of the snapshots, indexing the kind's saved snapshot again if it changed.
+        query_threads(columns=None, filters=None, since=None, until=None, order_by=None, descending=False,
+                      limit=100, offset=0):
+            Returns a page of the saved threads matching the filters, read from the indexed copy of the snapshot.
+        query_threads_details(columns=None, filters=None, since=None, until=None, order_by=None, descending=False,
+                              limit=100, offset=0):
+            Returns a page of the saved posts matching the filters, read from the indexed copy of the snapshot.
+        count_threads(filters=None, since=None, until=None):
+            Returns the number of saved threads matching the filters.
+        count_threads_details(filters=None, since=None, until=None):
+            Returns the number of saved posts matching the filters.
+
+        __locate_archived_pages(index):
+            Groups the archived pages into listing pages and thread's pages, keeping the latest copy of each page.
+        rebuild_from_archive(directory='archive', processes=None):
+            Rebuilds both snapshots by re-parsing the archived pages in parallel, without any request.
     """
 
     __threads = None
     __threads_details = None
+    __threads_from_snapshot = False
+    __base_url = 'https://www.mentalhealthforum.net/forum/'
+    __forums = {394: 'coronavirus-covid-19-mental-health.394'}
+    __legacy_forum_id = 394
+    __max_concurrency = 16
+    __rate_limiter = RateLimitHandler(max_concurrency=min(__max_concurrency, FetchHandler.MAX_WORKERS,
+                                                          FetchHandler.PER_HOST))
+    __metrics = None
+    __session_handler = SessionHandler(pool_size=min(FetchHandler.MAX_WORKERS, FetchHandler.PER_HOST),
+                                       rate_limiter=__rate_limiter)
+    __response_cache = None
+    __archive = None
+    __fetch_handler = FetchHandler()
+    __parse_processes = None
+    __parser_backend = 'bs4'
+    __posts_per_page = 20
+    __snapshot_tables = {}
+    __snapshot_store = None
+    __memory_reports = {}
+    __track_memory = False
+    __scrape_counts = {'threads': 0, 'threads_details': 0}
+    # Partially prevents scraping detection
+    __headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.0; WOW64; rv:24.0) Gecko/20100101 Firefox/24.0'}
 
     @staticmethod
-    def __get_cached_threads():
+    def set_forums(forums):
         """
-        Retrieves the thread's snapshot.
+        Sets the forums to crawl, given their ids (e.g. 394), their url paths (e.g.
+        'coronavirus-covid-19-mental-health.394') or their urls under the forum's root url.
+
+        Every forum is crawled through the same fetch engine and session pool, their pages being submitted in turn so
+        a large forum does not hold back the smaller ones. The threads scraped earlier during this run are discarded.
+
+        :param list forums: Specify the forums to crawl
         """
 
-        threads_df = pd.read_csv('cached_threads.csv', index_col='thread_id', skiprows=1)
+        if isinstance(forums, (int, str)):
+            forums = [forums]
 
-        threads_df['last_replied_date'] = pd.to_datetime(threads_df['last_replied_date'], utc=True)
-        threads_df['date_posted'] = pd.to_datetime(threads_df['date_posted'], utc=True)
+        paths = {}
+        for forum in forums:
+            path = str(forum).strip()
+            if path.startswith(ForumScraper.__base_url):
+                path = re.sub(r'^forums/', '', path[len(ForumScraper.__base_url):])
 
-        return threads_df
+            path = path.strip('/')
+            match = re.fullmatch(r'(?:[\w-]+\.)?(\d+)', path)
+            if match is None:
+                raise ValueError(f'{forum} is neither a forum id, nor a forum path, nor a forum url under '
+                                 f'{ForumScraper.__base_url}')
+
+            paths[int(match.group(1))] = path
+
+        if not paths:
+            raise ValueError('forums must hold at least one forum')
+
+        ForumScraper.__forums = paths
+        ForumScraper.__threads = None
+        ForumScraper.__threads_details = None
 
     @staticmethod
-    def cache_threads():
+    def set_base_url(base_url='https://www.mentalhealthforum.net/forum/'):
         """
-        Collects a snapshot of the threads for faster fetch in the future.
+        Sets the root url of the XenForo forum every forum's and thread's url is built from, e.g. to crawl a local
+        MockForumServer rather than the live forum.
+
+        The threads scraped earlier during this run are discarded, since they belong to another forum.
+
+        :param str base_url: Specify the root url, the forums being found under {base_url}forums/
         """
-        threads_df = ForumScraper.scrap_threads()
 
-        f = open('cached_threads.csv', "w+")
-        f.write(f'# Timestamp: {datetime.datetime.utcnow()}\n')
-        f.close()
+        if not isinstance(base_url, str) or re.match(r'^https?://[^/]+', base_url) is None:
+            raise ValueError('base_url must be an http or https url')
 
-        # noinspection PyTypeChecker
-        threads_df.to_csv('cached_threads.csv', mode='a')
+        ForumScraper.__base_url = base_url if base_url.endswith('/') else f'{base_url}/'
+        ForumScraper.__threads = None
+        ForumScraper.__threads_details = None
 
     @staticmethod
-    def __get_threads_pagination():
+    def __get_forum_url(forum_id, page=1):
         """
-        Returns the pagination of the threads
+        Returns the url of a forum's listing page, the first page's url lacking a page number.
 
-        :return: The last page number
+        :param int forum_id: Specify the forum's id
+        :param int page: Specify the page number
+        :return: The page's url
         """
 
-        # This site is protected under CloudFlare bot spam detection, a normal http request would not suffice
-        scraper = cloudscraper.create_scraper(browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False})
-        # Partially prevents scraping detection
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.0; WOW64; rv:24.0) Gecko/20100101 Firefox/24.0'}
-        res = scraper.get(f'https://www.mentalhealthforum.net/forum/forums/coronavirus-covid-19-mental-health.394/',
-                          headers=headers)
+        url = f'{ForumScraper.__base_url}forums/{ForumScraper.__forums[forum_id]}/'
+
+        return url if page == 1 else f'{url}page-{page}'
+
+    @staticmethod
+    def __get_thread_url(thread_id, page=1):
+        """
+        Returns the url of a thread's page, the first page's url lacking a page number.
 
-        soup = bs4.BeautifulSoup(res.text, 'html.parser')
-        pages = soup.find('ul', attrs={'class': 'pageNav-main'})
+        :param int thread_id: Specify the thread's id
+        :param int page: Specify the page number
+        :return: The page's url
+        """
 
-        if not pages:
-            return 1
+        url = f'{ForumScraper.__base_url}threads/{thread_id}'
 
-        last_page = pages.find_all('a')[-1].text
-        return last_page
+        return url if page == 1 else f'{url}/page-{page}'
 
     @staticmethod
-    def __scrap_threads(fast_fetch=False):
+    def __interleave(items, queues):
         """
-        Scraps data containing a list of threads.
+        Reorders the items round-robin across their queues, keeping the order of the items within each queue.
 
-        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
-        :return: A threads dataframe
+        :param list items: Specify the items
+        :param dict queues: Specify the queue of each item
+        :return: A list of the items, taking one item from each queue in turn
         """
 
-        if fast_fetch:
-            return ForumScraper.__get_cached_threads()
+        grouped = {}
+        for item in items:
+            grouped.setdefault(queues[item], []).append(item)
 
-        threads_df = pd.DataFrame()
+        missing = object()
+        return [item for turn in itertools.zip_longest(*grouped.values(), fillvalue=missing)
+                for item in turn if item is not missing]
 
-        data = []
-        processed = 0
-
-        pagination = int(ForumScraper.__get_threads_pagination())
-
-        for page in np.arange(1, pagination + 1):
-            print(ProgressHandler.show_progress(processed, pagination))
-            processed += 1
-
-            # This site is protected under CloudFlare bot spam detection, a normal http request would not suffice
-            scraper = cloudscraper.create_scraper(
-                browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False})
-            # Partially prevents scraping detection
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.0; WOW64; rv:24.0) Gecko/20100101 Firefox/24.0'}
-            res = scraper.get(
-                f'https://www.mentalhealthforum.net/forum/forums/coronavirus-covid-19-mental-health.394/'
-                f'page-{page}',
-                headers=headers)
-
-            soup = bs4.BeautifulSoup(res.text, 'html.parser')
-            threads = soup \
-                .find_all('div',
-                          {'class': ['structItemContainer-group js-threadList',
-                                     'structItemContainer-group structItemContainer-group--sticky XenStickyBg']})
-
-            new_threads = []
-            for threads_container in threads:
-                new_threads.append(threads_container.find_all('div', attrs={
-                    'class': re.compile('^structItem structItem--thread js-inlineModContainer.*')}))
-
-            threads = new_threads
-
-            if not threads:
-                continue
+    @staticmethod
+    def set_pool_size(pool_size=4):
+        """
+        Replaces the shared session pool with one of the given size.
+
+        :param int pool_size: Specify the maximum number of sessions kept alive at once
+        """
+
+        ForumScraper.__session_handler.close()
+        ForumScraper.__session_handler = SessionHandler(pool_size=pool_size, cache=ForumScraper.__response_cache,
+                                                        rate_limiter=ForumScraper.__rate_limiter,
+                                                        metrics=ForumScraper.__metrics)
+
+    @staticmethod
+    def get_session_stats():
+        """
+        Returns the per-run counts of requests, handshakes, challenge solves, response cache hits and retries.
+
+        :return: A dictionary of counters
+        """
+
+        return ForumScraper.__session_handler.get_stats()
+
+    @staticmethod
+    def set_metrics(sinks=None, interval=10.0):
+        """
+        Records the crawl's metrics, exporting them through the given sinks, a None sinks disables the metrics.
+
+        Requests are timed twice: request_seconds only measures the network round trip, while fetch_seconds also
+        includes the pacing, the backoffs and the response cache. Comparing both with parse_seconds and the queue
+        depths tells whether a slow crawl is network-bound, throttled or parser-bound.
+
+        :param list sinks: Specify the callables receiving the metrics' snapshots (e.g. MetricsHandler.prometheus_sink,
+                           MetricsHandler.json_lines_sink or any callback), an empty list only keeps them in memory,
+                           None disables the metrics
+        :param float interval: Specify the minimum number of seconds between two exports
+        """
+
+        if sinks is None:
+            ForumScraper.__metrics = None
+        else:
+            ForumScraper.__metrics = MetricsHandler(sinks=sinks, interval=interval)
+            ForumScraper.__metrics.add_collector(
+                lambda: {f'session_{name}': value for name, value in ForumScraper.get_session_stats().items()})
+
+        ForumScraper.__session_handler.metrics = ForumScraper.__metrics
+
+    @staticmethod
+    def get_metrics():
+        """
+        Returns a snapshot of the crawl's metrics.
+
+        :return: A dictionary holding the counters, the gauges and the histograms, None if the metrics are disabled
+        """
+
+        if ForumScraper.__metrics is None:
+            return None
+
+        return ForumScraper.__metrics.snapshot()
+
+    @staticmethod
+    def set_rate_limit(rate=8.0, burst=8, max_retries=5, backoff=1.0, max_concurrency=16):
+        """
+        Replaces the scheduler of the requests, a None rate only retries them without pacing.
+
+        Throttled and failing requests are retried with an exponential backoff, and the number of requests in flight
+        adapts to the overload signals of the site (429, 503 with Retry-After, timeouts) within the limit set by
+        set_concurrency.
+
+        :param float rate: Specify the number of requests per second, None does not pace the requests
+        :param int burst: Specify the number of requests which may be sent at once after an idle period
+        :param int max_retries: Specify the maximum number of retries of a single request
+        :param float backoff: Specify the base delay of the exponential backoff, in seconds
+        :param int max_concurrency: Specify the maximum number of requests in flight, capped at the requests
+                                    set_concurrency lets in flight against the forum's host
+        """
+
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError('max_concurrency must be a positive integer')
+
+        ForumScraper.__max_concurrency = max_concurrency
+        host_concurrency = ForumScraper.__get_host_concurrency()
+
+        ForumScraper.__rate_limiter = RateLimitHandler(rate=rate, burst=burst, max_retries=max_retries,
+                                                       backoff=backoff,
+                                                       initial_concurrency=min(4, host_concurrency),
+                                                       max_concurrency=host_concurrency)
+        ForumScraper.__session_handler.rate_limiter = ForumScraper.__rate_limiter
+
+    @staticmethod
+    def __get_host_concurrency():
+        """
+        Returns the maximum number of requests the scheduler may adapt to, which is capped at the requests the fetch
+        engine and the session pool let in flight against the forum's host, since growing past them would not send
+        more requests.
+
+        :return: The number of requests
+        """
+
+        return min(ForumScraper.__max_concurrency, ForumScraper.__fetch_handler.max_workers,
+                   ForumScraper.__fetch_handler.per_host)
+
+    @staticmethod
+    def set_response_cache(path='cached_responses.sqlite', ttl=24 * 60 * 60, max_bytes=1024 ** 3, offline=False):
+        """
+        Serves the requests from an on-disk response cache, a None path disables the cache.
+
+        Re-running a crawl then only fetches the thread's pages older than the ttl, and offline mode re-parses the
+        cached pages without touching the network at all. The forum's listing pages are revalidated on every request
+        regardless of the ttl, since the incremental and the stale threads' crawls rely on them being current.
+
+        :param str path: Specify the path of the cache's SQLite database, None disables the cache
+        :param int ttl: Specify the number of seconds a page is served without revalidation, None never expires
+        :param int max_bytes: Specify the maximum total size of the cached (compressed) pages
+        :param bool offline: Serves every page from the cache, failing on the pages which are not cached
+        """
+
+        if ForumScraper.__response_cache is not None:
+            ForumScraper.__response_cache.close()
+
+        ForumScraper.__response_cache = None if path is None else ResponseCacheHandler(
+            path=path, ttl=ttl, max_bytes=max_bytes, offline=offline, always_revalidate=r'/forums/')
+        ForumScraper.__session_handler.cache = ForumScraper.__response_cache
+
+    @staticmethod
+    def set_archive(directory='archive', segment_bytes=64 * 1024 ** 2):
+        """
+        Archives every fetched page into compressed segments, a None directory disables the archive.
+
+        :param str directory: Specify the archive's directory, None disables the archive
+        :param int segment_bytes: Specify the size after which a new segment is started
+        """
+
+        if ForumScraper.__archive is not None:
+            ForumScraper.__archive.close()
+
+        ForumScraper.__archive = None if directory is None else ArchiveHandler(directory=directory,
+                                                                                segment_bytes=segment_bytes)
+
+    @staticmethod
+    def set_concurrency(max_workers=FetchHandler.MAX_WORKERS, per_host=FetchHandler.PER_HOST):
+        """
+        Replaces the concurrent fetch engine and resizes the session pool to match, the scheduler's concurrency being
+        capped at the requests in flight against a single host.
+
+        :param int max_workers: Specify the maximum number of requests in flight at once
+        :param int per_host: Specify the maximum number of requests in flight at once against a single host
+        """
+
+        ForumScraper.__fetch_handler = FetchHandler(max_workers=max_workers, per_host=per_host)
+        ForumScraper.set_pool_size(pool_size=min(max_workers, per_host))
+        ForumScraper.__rate_limiter.set_max_concurrency(ForumScraper.__get_host_concurrency())
+
+    @staticmethod
+    def set_parse_processes(processes=None):
+        """
+        Sets the number of processes parsing the fetched pages.
+
+        :param int processes: Specify the number of processes, None uses every core
+        """
+
+        if processes is not None and (not isinstance(processes, int) or processes < 1):
+            raise ValueError('processes must be a positive integer')
+
+        ForumScraper.__parse_processes = processes
+
+    @staticmethod
+    def set_parser_backend(backend='bs4'):
+        """
+        Sets the backend used to parse the fetched pages.
+
+        :param str backend: Specify the backend, one of PageParser.BACKENDS
+        """
+
+        if backend not in PageParser.BACKENDS:
+            raise ValueError(f'backend must be one of {PageParser.BACKENDS}')
+
+        ForumScraper.__parser_backend = backend
+
+    @staticmethod
+    def set_posts_per_page(posts_per_page=20):
+        """
+        Sets the number of posts the forum shows on each thread's page.
+
+        :param int posts_per_page: Specify the number of posts per page
+        """
+
+        if not isinstance(posts_per_page, int) or posts_per_page < 1:
+            raise ValueError('posts_per_page must be a positive integer')
+
+        ForumScraper.__posts_per_page = posts_per_page
+
+    @staticmethod
+    def set_memory_reports(enabled=True):
+        """
+        Enables or disables the memory reports of the scraped dataframes, disabled by default since measuring the deep
+        memory usage of every column costs as much as the compaction itself.
+
+        :param bool enabled: Specify whether the memory reports are computed
+        """
+
+        ForumScraper.__track_memory = enabled
+        if not enabled:
+            ForumScraper.__memory_reports = {}
+
+    @staticmethod
+    def get_memory_report(kind):
+        """
+        Returns the bytes saved per column by compacting the last scraped dataframe of the given kind.
+
+        :param str kind: Specify the dataframe kind, either 'threads' or 'threads_details'
+        :return: A dataframe as returned by SchemaHandler.memory_report, None if nothing was scraped since the reports
+                 were enabled by set_memory_reports
+        """
+
+        SchemaHandler.get_schema(kind)
+
+        return ForumScraper.__memory_reports.get(kind)
+
+    @staticmethod
+    def __get(url, headers=None):
+        """
+        Issues a GET request through the shared session pool, archiving the fetched page if an archive is set.
+
+        :param str url: Specify the requested url
+        :param dict headers: Specify the request headers
+        :return: The response
+        """
+
+        started_at = time.perf_counter()
+        res = ForumScraper.__session_handler.get(url, headers=headers)
+
+        if ForumScraper.__metrics is not None:
+            ForumScraper.__metrics.observe('fetch_seconds', time.perf_counter() - started_at)
+
+        if ForumScraper.__archive is not None and res.status_code == 200:
+            ForumScraper.__archive.record(url, res.text)
+
+        return res
+
+    @staticmethod
+    def __get_parse_executor():
+        """
+        Starts a process pool of parsers, sized by set_parse_processes.
+
+        :return: A ProcessPoolExecutor, to shut down once the pages are parsed
+        """
+
+        return concurrent.futures.ProcessPoolExecutor(max_workers=ForumScraper.__parse_processes)
+
+    @staticmethod
+    def __fetch_and_parse(jobs, headers=None, checkpoint=None, queues=None, prefetched=None, progress=None,
+                          failed=None, parse_executor=None):
+        """
+        Fetches the urls concurrently and feeds each page into a process pool of parsers as soon as it arrives.
+
+        Urls spread over several queues (i.e. forums) are submitted round-robin across the queues, so every queue
+        progresses at the same pace whatever its size.
+
+        :param dict jobs: Specify the urls to fetch, each mapped to a tuple of a PageParser method and its extra
+                          arguments following the page's HTML
+        :param dict headers: Specify the request headers
+        :param CheckpointHandler checkpoint: Specify a journal to skip the urls completed by a previous run and to
+                                             record each url as soon as it is parsed
+        :param dict queues: Specify the queue of each url, None submits the urls in jobs order
+        :param dict prefetched: Specify the rows of the urls already fetched and parsed, which are not fetched again
+        :param ProgressHandler progress: Specify the tracker of the urls, e.g. a task spanning several calls, None
+                                         tracks the urls left to fetch by this call alone
+        :param dict failed: Specify a dictionary collecting the error of each url failing to be fetched or parsed,
+                            whose rows are then None, None raises the first error instead
+        :param concurrent.futures.ProcessPoolExecutor parse_executor: Specify the process pool parsing the pages,
+                                                                      e.g. shared across the batches of a crawl,
+                                                                      None starts a pool for this call alone
+        :return: A list of parsed rows per url, ordered as jobs
+        """
+
+        completed = checkpoint.load() if checkpoint is not None else {}
+        if completed:
+            print(f'Resuming from checkpoint, {len(completed)} page(s) already completed')
+
+        completed = {**(prefetched or {}), **completed}
+
+        if progress is not None:
+            for url in jobs:
+                if url in completed:
+                    progress.advance(item=url, resumed=True)
+
+        metrics = ForumScraper.__metrics
+
+        def record(parse, done):
+            # Pages parsed alongside their pagination hold a tuple of the last page number and the rows
+            metrics.add('parse_queue_depth', -1)
+            if done.exception() is None:
+                seconds, rows = done.result()
+                rows = rows[1] if isinstance(rows, tuple) else rows
+                metrics.observe('parse_seconds', seconds, labels={'parser': parse.__name__})
+                metrics.increment('rows_total', len(rows), labels={'parser': parse.__name__})
+
+        try:
+            with ForumScraper.__get_parse_executor() if parse_executor is None \
+                    else contextlib.nullcontext(parse_executor) as parse_executor:
+                def fetch(url):
+                    parse, *args = jobs[url]
+                    try:
+                        html = ForumScraper.__get(url, headers=headers).text
+                    finally:
+                        if metrics is not None:
+                            metrics.add('fetch_queue_depth', -1)
+                    future = parse_executor.submit(PageParser.time_parse, html, parse, *args)
+                    if metrics is not None:
+                        metrics.add('parse_queue_depth', 1)
+                        parser = args[0] if parse == PageParser.parse_with_pagination else parse
+                        future.add_done_callback(lambda done: record(parser, done))
+                    if checkpoint is not None:
+                        future.add_done_callback(
+                            lambda done: checkpoint.record(url, done.result()[1]) if done.exception() is None else None)
+                    return future
+
+                def fetch_or_fail(url):
+                    try:
+                        return fetch(url)
+                    except Exception as e:
+                        failed[url] = e
+                        return None
+
+                pending = [url for url in jobs if url not in completed]
+                if queues is not None:
+                    pending = ForumScraper.__interleave(pending, queues)
+
+                if metrics is not None:
+                    metrics.set('fetch_queue_depth', len(pending))
+
+                futures = dict(zip(pending, ForumScraper.__fetch_handler.fetch_all(
+                    fetch if failed is None else fetch_or_fail, pending, progress=progress)))
+
+                if failed is None:
+                    return [completed[url] if url in completed else futures[url].result()[1] for url in jobs]
+
+                results = []
+                for url in jobs:
+                    if url in completed:
+                        results.append(completed[url])
+                    elif futures[url] is None:
+                        results.append(None)
+                    elif futures[url].exception() is not None:
+                        failed[url] = futures[url].exception()
+                        results.append(None)
+                    else:
+                        results.append(futures[url].result()[1])
+
+                return results
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+            if metrics is not None:
+                metrics.set('fetch_queue_depth', 0)
+                metrics.flush()
+
+    @staticmethod
+    def __has_snapshot(kind):
+        """
+        Checks whether a snapshot of the given kind was saved, either as Feather or as a legacy CSV.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :return: True if a snapshot exists
+        """
+
+        return os.path.exists(f'cached_{kind}.feather') or os.path.exists(f'cached_{kind}.csv')
+
+    @staticmethod
+    def __get_cached_threads(columns=None):
+        """
+        Retrieves the thread's snapshot.
+
+        :param list columns: Specify the columns to read, None reads every column
+        """
+
+        if os.path.exists('cached_threads.feather'):
+            threads_df = SnapshotHandler.read('cached_threads.feather', columns=columns)
+        else:
+            # Falls back to the legacy CSV snapshot
+            usecols = None if columns is None else \
+                ['thread_id'] + [column for column in columns if column != 'thread_id']
+            threads_df = SchemaHandler.compact(pd.read_csv('cached_threads.csv', index_col='thread_id', skiprows=1,
+                                                           usecols=usecols), 'threads')
+
+        # Snapshots saved before several forums could be crawled only hold the threads of a single forum
+        if columns is None and 'forum_id' not in threads_df:
+            threads_df = SchemaHandler.compact(threads_df.assign(forum_id=ForumScraper.__legacy_forum_id), 'threads')
+
+        return threads_df
+
+    @staticmethod
+    def cache_threads(incremental=False):
+        """
+        Collects a snapshot of the threads for faster fetch in the future.
+
+        :param bool incremental: Only scraps the threads which changed since the saved snapshot, if any
+        """
+        threads_df = ForumScraper.scrap_threads(incremental=incremental)
 
-            for threads_container in threads:
-                for thread in threads_container:
-                    thread_id = thread['class'][-1].split('-')[-1]
-                    poster_id = thread.find_all(['span', 'a'], {'class', 'username'})[0]['data-user-id']
-                    poster_name = thread.find_all(['span', 'a'], {'class', 'username'})[0].text
-
-                    poster_image = None
-                    poster_image_container = thread.find('span', {'class', 'avatar avatar--s'})
-                    if poster_image_container is not None:
-                        poster_image = poster_image_container.find('img')['src']
-
-                    last_replier_id = thread.find_all(['span', 'a'], {'class', 'username'})[-1]['data-user-id']
-                    last_replier_name = thread.find_all(['span', 'a'], {'class', 'username'})[-1].text
-
-                    last_replier_image = None
-                    last_replier_image_container = thread.find('span', {'class', 'avatar avatar--xxs'})
-                    if last_replier_image_container is not None:
-                        last_replier_image = last_replier_image_container.find('img')['src']
-
-                    last_replied_date = datetime.datetime.strptime(thread.find_all('time')[-1]['datetime'],
-                                                                   '%Y-%m-%dT%H:%M:%S%z')
-                    date_posted = datetime.datetime.strptime(thread.find_all('time')[0]['datetime'],
-                                                             '%Y-%m-%dT%H:%M:%S%z')
-                    title = thread.find('div', {'class': 'structItem-title'}).find('a').text
-                    is_locked = thread.find('i', {'class': 'structItem-status structItem-status--locked'}) is not None
-                    is_sticky = thread.find('i', {'class': 'structItem-status structItem-status--sticky'}) is not None
-                    replies = thread.find('div', {'class', 'structItem-cell structItem-cell--meta'}).find_all('dd')[
-                        0].text
-                    views = thread.find('div', {'class', 'structItem-cell structItem-cell--meta'}).find_all('dd')[
-                        -1].text
-
-                    data.append(
-                        [thread_id, poster_id, poster_name, poster_image,
-                         last_replier_id, last_replier_name, last_replier_image, last_replied_date,
-                         date_posted, title,
-                         is_locked, is_sticky, replies, views])
-
-        threads_df = threads_df.append(data)
+        ForumScraper.__snapshot_tables.pop('threads', None)
+        SnapshotHandler.write(threads_df, 'cached_threads.feather', 'threads')
+
+    @staticmethod
+    def __get_threads_first_pages():
+        """
+        Fetches the first listing page of each forum, parsing both its pagination and its threads, so the first page
+        is not fetched again alongside the remaining pages.
+
+        :return: A dictionary mapping each forum id to a tuple of its last page number and its first page's rows
+        """
+
+        forum_ids = list(ForumScraper.__forums)
+
+        first_pages = ForumScraper.__fetch_handler.fetch_all(
+            lambda url: PageParser.parse_with_pagination(ForumScraper.__get(url, headers=ForumScraper.__headers).text,
+                                                         PageParser.parse_threads_page, ForumScraper.__parser_backend),
+            [ForumScraper.__get_forum_url(forum_id) for forum_id in forum_ids], show_progress=False)
+
+        return dict(zip(forum_ids, first_pages))
+
+    @staticmethod
+    def __to_threads_df(data):
+        """
+        Converts the rows extracted from the listing pages into a threads dataframe.
+
+        :param list data: Specify the rows extracted by PageParser.parse_threads_page, each followed by its forum id
+        :return: A threads dataframe
+        """
+
+        threads_df = pd.DataFrame(data)
 
         if threads_df.empty:
-            threads_df = pd.DataFrame(np.empty((0, 11)))
+            threads_df = pd.DataFrame(np.empty((0, 15)))
 
         threads_df.columns = ['thread_id', 'poster_id', 'poster_name', 'poster_image',
                               'last_replier_id', 'last_replier_name', 'last_replier_image', 'last_replied_date',
                               'date_posted', 'title',
-                              'is_locked', 'is_sticky', 'replies', 'views']
+                              'is_locked', 'is_sticky', 'replies', 'views', 'forum_id']
 
         threads_df = threads_df.replace(r'^\s*$', np.nan, regex=True) \
             .fillna(value=np.nan) \
@@ -200,196 +760,218 @@ class ForumScraper:
 
         threads_df.set_index('thread_id', inplace=True)
 
-        threads_df['replies'] = (threads_df['replies'].replace(r'[KM]+$', '', regex=True).astype(int) *
-                                 threads_df['replies'].str.extract(r'[\d\.]+([KM]+)', expand=False)
-                                 .fillna(1)
-                                 .replace(['K', 'M'], [10 ** 3, 10 ** 6]).astype(int))
-
-        threads_df['views'] = (threads_df['views'].replace(r'[KM]+$', '', regex=True).astype(int) *
-                               threads_df['views'].str.extract(r'[\d\.]+([KM]+)', expand=False)
-                               .fillna(1)
-                               .replace(['K', 'M'], [10 ** 3, 10 ** 6]).astype(int))
+        for column in ['replies', 'views']:
+            threads_df[column] = NormalizationHandler.expand_numbers(threads_df[column])
 
-        cols = ['replies', 'views']
-        threads_df[cols] = threads_df[cols].apply(pd.to_numeric)
+        for column in ['last_replied_date', 'date_posted']:
+            threads_df[column] = NormalizationHandler.parse_datetimes(threads_df[column])
 
-        threads_df['last_replied_date'] = pd.to_datetime(threads_df['last_replied_date'], utc=True)
-        threads_df['date_posted'] = pd.to_datetime(threads_df['date_posted'], utc=True)
+        compact_threads_df = SchemaHandler.compact(threads_df, 'threads')
+        if ForumScraper.__track_memory:
+            ForumScraper.__memory_reports['threads'] = SchemaHandler.memory_report(threads_df, compact_threads_df)
 
-        ProgressHandler.reset_progress()
-        return threads_df
+        return compact_threads_df
 
     @staticmethod
-    def scrap_threads(fast_fetch=False):
+    def __walk_forum_incrementally(forum_id, known_dates):
         """
-        Calls __scrap_threads if __threads is None, otherwise, it retrieves __threads immediately.
+        Walks a forum's listing pages, which are sorted by the last reply, until reaching a non-sticky thread whose
+        last_replied_date did not change since the saved snapshot.
 
-        :param bool fast_fetch: Retrieves thread's details from a saved snapshot instantly
-        :return: A thread dataframe
+        :param int forum_id: Specify the forum's id
+        :param dict known_dates: Specify the last_replied_date of each thread of the saved snapshot
+        :return: A tuple of the visited rows, each followed by the forum id, and the number of visited pages
         """
 
-        if ForumScraper.__threads is None:
-            print('Fetching threads, this is a one time process...')
-            ForumScraper.__threads = ForumScraper.__scrap_threads(fast_fetch=fast_fetch)
-            print('Received threads\n')
+        data = []
 
-        return ForumScraper.__threads.copy()
+        page = 1
+        pagination = 1
+        while page <= pagination:
+            print(f'Incremental crawl of forum {forum_id}, page {page}')
 
-    @staticmethod
-    def __get_cached_threads_details():
-        """
-        Retrieves the thread's details snapshot.
-        """
+            res = ForumScraper.__get(ForumScraper.__get_forum_url(forum_id, page), headers=ForumScraper.__headers)
 
-        threads_details_df = pd.read_csv('cached_threads_details.csv', index_col='thread_id', skiprows=1)
+            # The first page provides the pagination alongside its rows, so it is parsed once
+            if page == 1:
+                pagination, rows = PageParser.parse_with_pagination(res.text, PageParser.parse_threads_page,
+                                                                    ForumScraper.__parser_backend)
+            else:
+                rows = PageParser.parse_threads_page(res.text, backend=ForumScraper.__parser_backend)
+            data.extend([*row, forum_id] for row in rows)
 
-        threads_details_df['user_join_date'] = pd.to_datetime(threads_details_df['user_join_date'], utc=True)
-        threads_details_df['user_post_date'] = pd.to_datetime(threads_details_df['user_post_date'], utc=True)
+            last_replied_dates = NormalizationHandler.parse_datetimes(pd.Series([row[7] for row in rows], dtype=object))
 
-        return threads_details_df
+            reached_known_thread = False
+            for row, last_replied_date in zip(rows, last_replied_dates):
+                thread_id, is_sticky = int(row[0]), row[11]
+                if not is_sticky and known_dates.get(thread_id) == last_replied_date:
+                    reached_known_thread = True
+                    break
+
+            if reached_known_thread:
+                break
+
+            page += 1
+
+        return data, min(page, pagination)
 
     @staticmethod
-    def cache_threads_details():
+    def __walk_forums_incrementally(threads_df):
         """
-        Collects a snapshot of the thread's details for faster fetch in the future.
+        Walks the listing pages of every forum concurrently until reaching a thread which did not change since the
+        given threads were scraped.
+
+        :param pd.DataFrame threads_df: Specify the threads dataframe, e.g. the saved snapshot
+        :return: A list of walks, each a tuple of the visited rows, each followed by the forum id, and the number of
+                 visited pages
         """
-        threads_details_df = ForumScraper.scrap_threads_details()
 
-        f = open('cached_threads_details.csv', "w+")
-        f.write(f'# Timestamp: {datetime.datetime.utcnow()}\n')
-        f.close()
+        # The walks run on concurrent threads, which must not share the lazily built hash table of a pandas index
+        known_dates = dict(zip(threads_df.index, threads_df['last_replied_date']))
+
+        forum_ids = {ForumScraper.__get_forum_url(forum_id): forum_id for forum_id in ForumScraper.__forums}
 
-        # noinspection PyTypeChecker
-        threads_details_df.to_csv('cached_threads_details.csv', mode='a')
+        return ForumScraper.__fetch_handler.fetch_all(
+            lambda url: ForumScraper.__walk_forum_incrementally(forum_ids[url], known_dates), list(forum_ids),
+            show_progress=False)
 
     @staticmethod
-    def __get_threads_details_pagination(thread_id):
+    def __scrap_threads_incrementally():
         """
-        Returns the pagination of the thread's details
+        Walks the listing pages of every forum concurrently until reaching an unchanged thread, then merges the
+        visited threads into the saved snapshot.
 
-        :return: The last page number
+        :return: A threads dataframe
         """
 
-        # This site is protected under CloudFlare bot spam detection, a normal http request would not suffice
-        scraper = cloudscraper.create_scraper(browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False})
-        # Partially prevents scraping detection
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.0; WOW64; rv:24.0) Gecko/20100101 Firefox/24.0'}
-        res = scraper.get(f'https://www.mentalhealthforum.net/forum/threads/{thread_id}', headers=headers)
+        cached_threads_df = ForumScraper.__get_cached_threads()
+        walks = ForumScraper.__walk_forums_incrementally(cached_threads_df)
+
+        data = [row for rows, _ in walks for row in rows]
 
-        soup = bs4.BeautifulSoup(res.text, 'html.parser')
-        pages = soup.find('ul', attrs={'class': 'pageNav-main'})
+        if not data:
+            return cached_threads_df
 
-        if not pages:
-            return 1
+        threads_df = ForumScraper.__to_threads_df(data)
+        threads_df.index = threads_df.index.astype(cached_threads_df.index.dtype)
+        threads_df = threads_df[~threads_df.index.duplicated(keep='first')]
 
-        last_page = pages.find_all('a')[-1].text
-        return last_page
+        print(f'Merged {len(threads_df)} thread(s) from {sum(pages for _, pages in walks)} page(s) into the snapshot')
+
+        # Concatenating categoricals of different categories yields strings, hence the merge is compacted again
+        return SchemaHandler.compact(pd.concat([threads_df, cached_threads_df.drop(threads_df.index, errors='ignore')]),
+                                     'threads')
 
     @staticmethod
-    def __scrap_threads_details(fast_fetch=False, fast_fetch_threads=False):
+    def __scrap_threads(fast_fetch=False, incremental=False):
         """
-        Scraps data containing a list of thread's details.
+        Scraps data containing a list of threads.
 
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
-        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
-        :return: A thread's details dataframe
+        :param bool incremental: Only scraps the threads which changed since the saved snapshot, if any
+        :return: A threads dataframe
         """
 
         if fast_fetch:
-            return ForumScraper.__get_cached_threads_details()
+            return ForumScraper.__get_cached_threads()
 
-        threads_details_df = pd.DataFrame()
+        if incremental and ForumScraper.__has_snapshot('threads'):
+            return ForumScraper.__scrap_threads_incrementally()
 
         data = []
 
-        processed = 0
+        first_pages = ForumScraper.__get_threads_first_pages()
 
-        threads_ids = ForumScraper.scrap_threads(fast_fetch=fast_fetch_threads).index
+        units = [(forum_id, page)
+                 for forum_id, (pagination, _) in first_pages.items()
+                 for page in np.arange(1, pagination + 1)]
 
-        for thread_id in threads_ids:
-            processed += 1
-            pagination = int(ForumScraper.__get_threads_details_pagination(thread_id=thread_id))
-            for page in np.arange(1, pagination + 1):
-                print(ProgressHandler.show_progress(processed, len(threads_ids)))
+        jobs = {ForumScraper.__get_forum_url(forum_id, page): (PageParser.parse_threads_page,
+                                                               ForumScraper.__parser_backend)
+                for forum_id, page in units}
+        queues = {ForumScraper.__get_forum_url(forum_id, page): forum_id for forum_id, page in units}
+        prefetched = {ForumScraper.__get_forum_url(forum_id): rows for forum_id, (_, rows) in first_pages.items()}
+        parsed = ForumScraper.__fetch_and_parse(jobs, headers=ForumScraper.__headers, queues=queues,
+                                                prefetched=prefetched)
 
-                # This site is protected under CloudFlare bot spam detection, a normal http request would not suffice
-                scraper = cloudscraper.create_scraper(
-                    browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False})
-                res = scraper.get(
-                    f'https://www.mentalhealthforum.net/forum/threads/'
-                    f'{thread_id}/'
-                    f'page-{page}')
+        for (forum_id, _), rows in zip(units, parsed):
+            data.extend([*row, forum_id] for row in rows)
 
-                soup = bs4.BeautifulSoup(res.text, 'html.parser')
+        threads_df = ForumScraper.__to_threads_df(data)
 
-                thread_details = soup \
-                    .find_all('article', {'class': 'message message--post js-post js-inlineModContainer'})
+        return threads_df
 
-                if not thread_details:
-                    continue
+    @staticmethod
+    def scrap_threads(fast_fetch=False, incremental=False, columns=None):
+        """
+        Calls __scrap_threads if __threads is None, otherwise, it retrieves __threads immediately.
+
+        :param bool fast_fetch: Retrieves thread's details from a saved snapshot instantly
+        :param bool incremental: Only scraps the threads which changed since the saved snapshot, if any
+        :param list columns: Specify the columns to retrieve, None retrieves every column
+        :return: A thread dataframe
+        """
+
+        # Projected reads of the snapshot are not kept, since __threads must hold every column
+        if fast_fetch and columns is not None and ForumScraper.__threads is None:
+            return ForumScraper.__get_cached_threads(columns=columns)
+
+        if ForumScraper.__threads is None:
+            print('Fetching threads, this is a one time process...')
+            ForumScraper.__threads = ForumScraper.__scrap_threads(fast_fetch=fast_fetch, incremental=incremental)
+            ForumScraper.__threads_from_snapshot = fast_fetch
+            ForumScraper.__scrape_counts['threads'] += 1
+            print('Received threads\n')
+
+        if columns is not None:
+            return ForumScraper.__threads[columns].copy()
+
+        return ForumScraper.__threads.copy()
+
+    @staticmethod
+    def __get_cached_threads_details(columns=None):
+        """
+        Retrieves the thread's details snapshot.
+
+        :param list columns: Specify the columns to read, None reads every column
+        """
+
+        if os.path.exists('cached_threads_details.feather'):
+            return SnapshotHandler.read('cached_threads_details.feather', columns=columns)
+
+        # Falls back to the legacy CSV snapshot
+        usecols = None if columns is None else ['thread_id'] + [column for column in columns if column != 'thread_id']
+        threads_details_df = pd.read_csv('cached_threads_details.csv', index_col='thread_id', skiprows=1,
+                                         usecols=usecols)
+
+        return SchemaHandler.compact(threads_details_df, 'threads_details')
+
+    @staticmethod
+    def cache_threads_details(delta=False):
+        """
+        Collects a snapshot of the thread's details for faster fetch in the future.
+
+        :param bool delta: Only fetches the tail pages of the threads which changed since the saved snapshot, if any
+        """
+        threads_details_df = ForumScraper.scrap_threads_details(delta=delta)
+
+        ForumScraper.__snapshot_tables.pop('threads_details', None)
+        SnapshotHandler.write(threads_details_df, 'cached_threads_details.feather', 'threads_details')
+
+    @staticmethod
+    def __to_threads_details_df(data):
+        """
+        Converts the rows extracted from the thread's pages into a thread's details dataframe.
+
+        :param list data: Specify the rows extracted by PageParser.parse_threads_details_page
+        :return: A thread's details dataframe
+        """
 
-                for post in thread_details:
-                    user_id = post.find_all(['span', 'a'], {'class', 'username'})[0]['data-user-id']
-                    user_name = post.find_all(['span', 'a'], {'class', 'username'})[0].text
-
-                    user_image = None
-                    user_image_container = post.find('span', {'class', 'avatar avatar--m'})
-                    if user_image_container is not None:
-                        user_image = user_image_container.find('img')['src']
-
-                    user_title = post.find('h5', {'class', 'userTitle message-userTitle'}).text
-
-                    banners = post.find('div', {'class', 'message-userDetails'}) \
-                        .find_all('div', {'class': re.compile('^userBanner userBanner.*')})
-                    user_banner_1 = None
-                    user_banner_2 = None
-                    if banners is not None:
-                        if len(banners) >= 1:
-                            user_banner_1 = banners[0].find('strong').text
-                        if len(banners) > 1:
-                            user_banner_2 = banners[1].find('strong').text
-
-                    user_extras = post.find('div', {'class': 'message-userExtras'})
-                    user_join_date = None
-                    user_messages = None
-                    user_location = None
-                    if user_extras:
-                        user_extras = user_extras.find_all('dd')
-                        user_join_date = datetime.datetime.strptime(user_extras[0].text, '%b %d, %Y')
-                        user_messages = user_extras[1].text.replace(',', '')
-                        if len(user_extras) > 2:
-                            user_location = user_extras[2].find('a').text
-
-                    reactions = post.find('ul', {'class': 'sv-rating-bar__ratings'})
-                    post_reaction_like = None
-                    post_reaction_thanks = None
-                    post_reaction_hug = None
-                    if reactions:
-                        post_reaction_like = reactions.find('a', {'title': 'Like'})
-                        post_reaction_thanks = reactions.find('a', {'title': 'Thanks'})
-                        post_reaction_hug = reactions.find('a', {'title': 'Hug'})
-                        if post_reaction_like is not None:
-                            post_reaction_like = post_reaction_like.find('div', {'class', 'sv-rating__count'}).text
-                        if post_reaction_thanks is not None:
-                            post_reaction_thanks = post_reaction_thanks.find('div', {'class', 'sv-rating__count'}).text
-                        if post_reaction_hug is not None:
-                            post_reaction_hug = post_reaction_hug.find('div', {'class', 'sv-rating__count'}).text
-
-                    user_post_date = datetime.datetime.strptime(
-                        post.find('time', {'class', 'u-dt'})['datetime'], '%Y-%m-%dT%H:%M:%S%z')
-
-                    user_post = ' '.join(post.find('div', {'class', 'message-userContent'}).text.split())
-
-                    data.append(
-                        [thread_id, user_id, user_name, user_image, user_title, user_banner_1,
-                         user_banner_2, user_join_date, user_messages, user_location,
-                         post_reaction_like, post_reaction_thanks, post_reaction_hug,
-                         user_post_date, user_post])
-
-        threads_details_df = threads_details_df.append(data)
+        threads_details_df = pd.DataFrame(data)
 
         if threads_details_df.empty:
-            threads_details_df = pd.DataFrame(np.empty((0, 13)))
+            threads_details_df = pd.DataFrame(np.empty((0, 15)))
 
         threads_details_df.columns = ['thread_id', 'user_id', 'user_name', 'user_image', 'user_title', 'user_banner_1',
                                       'user_banner_2', 'user_join_date', 'user_messages', 'user_location',
@@ -403,30 +985,833 @@ class ForumScraper:
 
         threads_details_df.set_index('thread_id', inplace=True)
 
-        cols = ['user_messages', 'post_reaction_like', 'post_reaction_thanks', 'post_reaction_hug']
-        threads_details_df[cols] = threads_details_df[cols].apply(pd.to_numeric)
+        for column in ['user_messages', 'post_reaction_like', 'post_reaction_thanks', 'post_reaction_hug']:
+            threads_details_df[column] = NormalizationHandler.expand_numbers(threads_details_df[column])
 
-        threads_details_df['user_join_date'] = pd.to_datetime(threads_details_df['user_join_date'], utc=True)
-        threads_details_df['user_post_date'] = pd.to_datetime(threads_details_df['user_post_date'], utc=True)
+        threads_details_df['user_join_date'] = NormalizationHandler.parse_datetimes(
+            threads_details_df['user_join_date'], date_format=NormalizationHandler.JOIN_DATE_FORMAT)
+        threads_details_df['user_post_date'] = NormalizationHandler.parse_datetimes(
+            threads_details_df['user_post_date'])
 
-        ProgressHandler.reset_progress()
-        return threads_details_df
+        compact_threads_details_df = SchemaHandler.compact(threads_details_df, 'threads_details')
+        if ForumScraper.__track_memory:
+            ForumScraper.__memory_reports['threads_details'] = SchemaHandler.memory_report(
+                threads_details_df, compact_threads_details_df)
+
+        return compact_threads_details_df
 
     @staticmethod
-    def scrap_threads_details(fast_fetch=False, fast_fetch_threads=False):
+    def __scrap_threads_details_delta(threads_df):
         """
-        Calls __scrap_threads_details if __threads_details is None, otherwise,
-        it retrieves __threads_details immediately.
+        Fetches only the tail pages of the threads whose replies or last_replied_date changed since the saved
+        thread's details snapshot, then merges them into it.
 
-        :param bool fast_fetch: Retrieves thread's details from a saved snapshot instantly
-        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        The snapshot keeps the posts of each thread in page order, hence the number of stored posts tells the page
+        holding the last known post; that page is re-fetched alongside every page after it. Replies over a thousand
+        are abbreviated by the forum (e.g. 1.2K), hence the first page of those changed threads is fetched
+        beforehand, its pagination telling their last page.
+
+        :param pd.DataFrame threads_df: Specify the current threads dataframe
         :return: A thread's details dataframe
         """
 
-        if ForumScraper.__threads_details is None:
-            print('Fetching threads_details, this is a one time process...')
-            ForumScraper.__threads_details = ForumScraper.__scrap_threads_details(fast_fetch=fast_fetch,
-                                                                                  fast_fetch_threads=fast_fetch_threads)
-            print('Received threads_details\n')
+        cached_threads_details_df = ForumScraper.__get_cached_threads_details()
+        threads_df = threads_df.copy()
+        threads_df.index = threads_df.index.astype(cached_threads_details_df.index.dtype)
+
+        posts_per_page = ForumScraper.__posts_per_page
+        known_posts = cached_threads_details_df.groupby(level=0).size()
+        known_last_post = cached_threads_details_df.groupby(level=0)['user_post_date'].max()
+
+        forum_ids = dict(zip(threads_df.index, threads_df['forum_id']))
+
+        changed = {}
+        total_posts = {}
+        unplanned = []
+        for thread_id, replies, last_replied_date in zip(threads_df.index, threads_df['replies'],
+                                                         threads_df['last_replied_date']):
+            posts = int(known_posts.get(thread_id, 0))
+            is_unchanged = known_last_post.get(thread_id) == last_replied_date
+
+            # Abbreviated replies cannot be compared with the stored posts, the last post date tells the change alone
+            if pd.isna(replies) or replies >= 1000:
+                if is_unchanged:
+                    continue
+
+                changed[thread_id] = None
+                unplanned.append(thread_id)
+                continue
+
+            total_posts[thread_id] = int(replies) + 1
+
+            if posts == total_posts[thread_id] and is_unchanged:
+                continue
+
+            changed[thread_id] = int(np.ceil(total_posts[thread_id] / posts_per_page))
+
+        paginations, prefetched = ForumScraper.__prefetch_first_pages(unplanned, forum_ids)
+        changed.update(paginations)
+        total_posts.update({thread_id: pagination * posts_per_page for thread_id, pagination in paginations.items()})
+
+        first_pages = {}
+        units = []
+        for thread_id, pagination in changed.items():
+            posts = int(known_posts.get(thread_id, 0))
+            # Threads holding fewer posts than stored, e.g. once posts were deleted, are re-fetched whole
+            first_page = max(posts - 1, 0) // posts_per_page + 1 if posts <= total_posts[thread_id] else 1
+            last_page = max(pagination, first_page)
+
+            first_pages[thread_id] = first_page
+            units.extend((thread_id, page) for page in range(first_page, last_page + 1))
+
+        # The prefetched first pages are kept only for the threads re-fetched from their first page
+        prefetched = {ForumScraper.__get_thread_url(thread_id): prefetched[ForumScraper.__get_thread_url(thread_id)]
+                      for thread_id in paginations if first_pages[thread_id] == 1}
+
+        print(f'{len(first_pages)} thread(s) changed, fetching {len(units)} page(s)...')
+
+        if not units:
+            return cached_threads_details_df
+
+        jobs = {ForumScraper.__get_thread_url(thread_id, page): (PageParser.parse_threads_details_page, thread_id,
+                                                                 ForumScraper.__parser_backend)
+                for thread_id, page in units}
+        queues = {ForumScraper.__get_thread_url(thread_id, page): forum_ids[thread_id] for thread_id, page in units}
+
+        checkpoint = CheckpointHandler('cached_threads_details.delta.journal')
+
+        progress, pages = ForumScraper.__track_threads_details(jobs)
+
+        data = []
+        for rows in ForumScraper.__fetch_and_parse(jobs, checkpoint=checkpoint, queues=queues, prefetched=prefetched,
+                                                   progress=pages):
+            data.extend(rows)
+        progress.close()
+
+        threads_details_df = ForumScraper.__to_threads_details_df(data)
+        checkpoint.discard()
+        threads_details_df.index = threads_details_df.index.astype(cached_threads_details_df.index.dtype)
+
+        # Drops the stored posts living on the re-fetched pages
+        post_position = cached_threads_details_df.groupby(level=0).cumcount().to_numpy()
+        kept_posts = cached_threads_details_df.index.map(first_pages).fillna(np.inf).to_numpy(dtype=float)
+        kept = post_position < (kept_posts - 1) * posts_per_page
+
+        merged_df = pd.concat([cached_threads_details_df[kept], threads_details_df])
+
+        # Keeps the posts grouped by thread following the threads order, then in page order
+        thread_order = {thread_id: order for order, thread_id in enumerate(threads_df.index)}
+        order = merged_df.index.map(thread_order).fillna(len(thread_order)).to_numpy()
+
+        return SchemaHandler.compact(merged_df.iloc[np.argsort(order, kind='stable')], 'threads_details')
+
+    @staticmethod
+    def __prefetch_first_pages(thread_ids, forum_ids):
+        """
+        Fetches the first page of the threads whose pagination cannot be planned from their replies, parsing both its
+        pagination and its posts.
+
+        :param list thread_ids: Specify the threads
+        :param dict forum_ids: Specify the forum id of each thread, whose queues the pages are interleaved across
+        :return: A tuple of a dictionary mapping each thread to its last page number, and a dictionary mapping the
+                 url of each first page to its rows
+        """
+
+        if not thread_ids:
+            return {}, {}
+
+        thread_ids = ForumScraper.__interleave(list(thread_ids), forum_ids)
+
+        print(f'Fetching the first page of {len(thread_ids)} thread(s) of unknown pagination...')
+        first_pages = ForumScraper.__fetch_and_parse(
+            {ForumScraper.__get_thread_url(thread_id): (PageParser.parse_with_pagination,
+                                                        PageParser.parse_threads_details_page, thread_id,
+                                                        ForumScraper.__parser_backend)
+             for thread_id in thread_ids})
+
+        paginations = {}
+        prefetched = {}
+        for thread_id, (pagination, rows) in zip(thread_ids, first_pages):
+            paginations[thread_id] = pagination
+            prefetched[ForumScraper.__get_thread_url(thread_id)] = rows
+
+        return paginations, prefetched
+
+    @staticmethod
+    def __get_stale_threads(threads_df):
+        """
+        Returns the threads whose last_replied_date changed since the threads were scraped, walking the listing pages
+        of every forum until reaching an unchanged thread.
+
+        :param pd.DataFrame threads_df: Specify the threads dataframe, e.g. the saved snapshot
+        :return: A set of thread ids
+        """
+
+        print('Checking which saved threads changed since the snapshot...')
+
+        known_dates = dict(zip(threads_df.index, threads_df['last_replied_date']))
+
+        stale = set()
+        for rows, _ in ForumScraper.__walk_forums_incrementally(threads_df):
+            last_replied_dates = NormalizationHandler.parse_datetimes(pd.Series([row[7] for row in rows],
+                                                                                dtype=object))
+
+            for row, last_replied_date in zip(rows, last_replied_dates):
+                thread_id = int(row[0])
+                if thread_id in known_dates and known_dates[thread_id] != last_replied_date:
+                    stale.add(thread_id)
+
+        return stale
+
+    @staticmethod
+    def __get_threads_details_jobs(threads_df, from_snapshot=False):
+        """
+        Plans the pages of each thread, then lists the jobs parsing every page of the threads.
+
+        The pagination of a thread is planned from its replies and the forum's posts per page, as of the listing
+        crawl. Replies over a thousand are abbreviated by the forum (e.g. 1.2K), hence the first page of those threads
+        is fetched beforehand, parsing both its pagination and its posts. So is the first page of the saved threads
+        whose last_replied_date changed since the snapshot, whose replies are outdated.
+
+        :param pd.DataFrame threads_df: Specify the threads dataframe
+        :param bool from_snapshot: Specify whether the threads were read from the saved snapshot rather than scraped
+        :return: A tuple of a dictionary mapping each page's url to its parser and arguments, in threads then page
+                 order, a dictionary mapping each page's url to its forum id, and a dictionary mapping the urls of
+                 the prefetched pages to their rows
+        """
+
+        forum_ids = dict(zip(threads_df.index, threads_df['forum_id']))
+        posts_per_page = ForumScraper.__posts_per_page
+
+        stale = ForumScraper.__get_stale_threads(threads_df) if from_snapshot else set()
+
+        paginations = {thread_id: int(np.ceil((int(replies) + 1) / posts_per_page))
+                       for thread_id, replies in zip(threads_df.index, threads_df['replies'])
+                       if not pd.isna(replies) and replies < 1000 and thread_id not in stale}
+
+        unplanned = [thread_id for thread_id in forum_ids if thread_id not in paginations]
+        first_pages, prefetched = ForumScraper.__prefetch_first_pages(unplanned, forum_ids)
+        paginations.update(first_pages)
+
+        units = [(thread_id, page)
+                 for thread_id in forum_ids
+                 for page in np.arange(1, paginations[thread_id] + 1)]
+
+        jobs = {ForumScraper.__get_thread_url(thread_id, page): (PageParser.parse_threads_details_page, thread_id,
+                                                                 ForumScraper.__parser_backend)
+                for thread_id, page in units}
+        queues = {ForumScraper.__get_thread_url(thread_id, page): forum_ids[thread_id] for thread_id, page in units}
+
+        return jobs, queues, prefetched
+
+    @staticmethod
+    def __track_threads_details(jobs):
+        """
+        Creates the tracker of a thread's details crawl, counting the threads whose pages were all fetched alongside
+        the pages themselves.
+
+        :param dict jobs: Specify the jobs, as returned by __get_threads_details_jobs
+        :return: A tuple of the threads' tracker, to close once the crawl ends, and its nested pages' task
+        """
+
+        progress = ProgressHandler(description='Threads')
+
+        return progress, progress.add_task('Pages', groups={url: job[1] for url, job in jobs.items()})
+
+    @staticmethod
+    def __scrap_threads_details(fast_fetch=False, fast_fetch_threads=False, delta=False):
+        """
+        Scraps data containing a list of thread's details.
+
+        :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :param bool delta: Only fetches the tail pages of the threads which changed since the saved snapshot, if any
+        :return: A thread's details dataframe
+        """
+
+        # Completed pages are journaled as the crawl goes, an interrupted crawl resumes from the journal when re-run
+        if fast_fetch:
+            return ForumScraper.__get_cached_threads_details()
+
+        if delta and ForumScraper.__has_snapshot('threads_details'):
+            threads_details_df = ForumScraper.__scrap_threads_details_delta(
+                ForumScraper.scrap_threads(fast_fetch=fast_fetch_threads))
+            return threads_details_df
+
+        data = []
+
+        threads_df = ForumScraper.scrap_threads(fast_fetch=fast_fetch_threads)
+        jobs, queues, prefetched = ForumScraper.__get_threads_details_jobs(
+            threads_df, from_snapshot=ForumScraper.__threads_from_snapshot)
+
+        checkpoint = CheckpointHandler('cached_threads_details.journal')
+
+        print('Fetching pages of each thread...')
+        progress, pages = ForumScraper.__track_threads_details(jobs)
+        parsed = ForumScraper.__fetch_and_parse(jobs, checkpoint=checkpoint, queues=queues, prefetched=prefetched,
+                                                progress=pages)
+        progress.close()
+
+        for rows in parsed:
+            data.extend(rows)
+
+        threads_details_df = ForumScraper.__to_threads_details_df(data)
+        checkpoint.discard()
+
+        return threads_details_df
+
+    @staticmethod
+    def scrap_threads_details(fast_fetch=False, fast_fetch_threads=False, delta=False, columns=None):
+        """
+        Calls __scrap_threads_details if __threads_details is None, otherwise,
+        it retrieves __threads_details immediately.
+
+        :param bool fast_fetch: Retrieves thread's details from a saved snapshot instantly
+        :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :param bool delta: Only fetches the tail pages of the threads which changed since the saved snapshot, if any
+        :param list columns: Specify the columns to retrieve, None retrieves every column
+        :return: A thread's details dataframe
+        """
+
+        # Projected reads of the snapshot are not kept, since __threads_details must hold every column
+        if fast_fetch and columns is not None and ForumScraper.__threads_details is None:
+            return ForumScraper.__get_cached_threads_details(columns=columns)
+
+        if ForumScraper.__threads_details is None:
+            print('Fetching threads_details, this is a one time process...')
+            ForumScraper.__threads_details = ForumScraper.__scrap_threads_details(fast_fetch=fast_fetch,
+                                                                                  fast_fetch_threads=fast_fetch_threads,
+                                                                                  delta=delta)
+            ForumScraper.__scrape_counts['threads_details'] += 1
+            print('Received threads_details\n')
+
+        if columns is not None:
+            return ForumScraper.__threads_details[columns].copy()
 
         return ForumScraper.__threads_details.copy()
+
+    @staticmethod
+    def __iter_threads_details_batches(jobs, queues, prefetched, batch_pages, progress=None):
+        """
+        Fetches and parses the pages in batches, yielding the normalized dataframe of each batch. The batches share a
+        single process pool of parsers, started once for the whole crawl.
+
+        :param dict jobs: Specify the jobs, as returned by __get_threads_details_jobs
+        :param dict queues: Specify the forum id of each page, as returned by __get_threads_details_jobs
+        :param dict prefetched: Specify the rows of the prefetched pages, as returned by __get_threads_details_jobs
+        :param int batch_pages: Specify the number of pages per batch
+        :param ProgressHandler progress: Specify the tracker of the pages across the batches
+        :return: A generator of thread's details dataframes, in jobs order
+        """
+
+        urls = list(jobs)
+        batches = int(np.ceil(len(urls) / batch_pages))
+
+        with ForumScraper.__get_parse_executor() as parse_executor:
+            for batch, start in enumerate(range(0, len(urls), batch_pages), start=1):
+                print(f'Fetching batch {batch}/{batches}...')
+                batch_urls = urls[start:start + batch_pages]
+                parsed = ForumScraper.__fetch_and_parse({url: jobs[url] for url in batch_urls}, queues=queues,
+                                                        prefetched={url: prefetched.pop(url) for url in batch_urls
+                                                                    if url in prefetched},
+                                                        progress=progress, parse_executor=parse_executor)
+
+                yield ForumScraper.__to_threads_details_df([row for rows in parsed for row in rows])
+
+    @staticmethod
+    def stream_threads_details(file_format='feather', batch_pages=200, fast_fetch_threads=False):
+        """
+        Scraps the thread's details in batches of pages, flushing each normalized batch to disk as soon as it is parsed.
+
+        The memory held at any time is bounded by a single batch regardless of the forum's size, hence the thread's
+        details are not kept in memory; they are loaded back from the written snapshot (feather or csv) when needed.
+        A csv snapshot removes any Feather snapshot, which would otherwise take precedence, whereas parquet is only
+        meant for exporting. A crawl yielding no post still replaces the snapshot, with an empty one.
+
+        :param str file_format: Specify the format of the written file, one of RowSinkHandler.FORMATS
+        :param int batch_pages: Specify the number of pages fetched, parsed and flushed at once
+        :param bool fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: The number of written rows
+        """
+
+        if not isinstance(batch_pages, int) or batch_pages < 1:
+            raise ValueError('batch_pages must be a positive integer')
+
+        sink = RowSinkHandler(f'cached_threads_details.{file_format}', 'threads_details', file_format=file_format)
+
+        threads_df = ForumScraper.scrap_threads(fast_fetch=fast_fetch_threads)
+        jobs, queues, prefetched = ForumScraper.__get_threads_details_jobs(
+            threads_df, from_snapshot=ForumScraper.__threads_from_snapshot)
+        progress, pages = ForumScraper.__track_threads_details(jobs)
+
+        try:
+            for threads_details_df in ForumScraper.__iter_threads_details_batches(jobs, queues, prefetched,
+                                                                                  batch_pages, progress=pages):
+                sink.write(threads_details_df)
+
+            # The previous snapshot must not pass for the result of this crawl, hence an empty one replaces it
+            if sink.rows == 0:
+                print(f'Warning: no post was streamed, {sink.path} is replaced by an empty snapshot')
+                sink.write(ForumScraper.__to_threads_details_df([]))
+        except BaseException:
+            sink.abort()
+            raise
+        finally:
+            progress.close()
+
+        sink.close()
+
+        if file_format != 'parquet':
+            if file_format == 'csv' and os.path.exists('cached_threads_details.feather'):
+                os.remove('cached_threads_details.feather')
+
+            # The streamed snapshot supersedes whatever was scraped or opened during this run
+            ForumScraper.__snapshot_tables.pop('threads_details', None)
+            ForumScraper.__threads_details = None
+
+        print(f'Streamed {sink.rows} post(s) into {sink.path}')
+
+        return sink.rows
+
+    @staticmethod
+    def enqueue_threads_details(queue_path='crawl_queue.sqlite', fast_fetch_threads=False):
+        """
+        Enqueues every page of the threads into a durable work queue, to be fetched and parsed by run_worker from any
+        number of processes or machines, then gathered by collect_threads_details.
+
+        Pages are enqueued round-robin across the forums, so the workers progress through every forum at the same
+        pace. Pages already enqueued by an interrupted coordinator are kept as they are.
+
+        :param str queue_path: Specify the path of the work queue's SQLite database
+        :param bool fast_fetch_threads: Retrieves threads from a saved snapshot instantly
+        :return: The number of newly enqueued pages
+        """
+
+        threads_df = ForumScraper.scrap_threads(fast_fetch=fast_fetch_threads)
+        jobs, queues, prefetched = ForumScraper.__get_threads_details_jobs(
+            threads_df, from_snapshot=ForumScraper.__threads_from_snapshot)
+        order = {url: i for i, url in enumerate(jobs)}
+
+        work_queue = WorkQueueHandler(queue_path)
+        try:
+            enqueued = work_queue.enqueue([(url, {'thread_id': int(jobs[url][1]), 'forum_id': int(queues[url]),
+                                                  'order': order[url]})
+                                           for url in ForumScraper.__interleave(list(jobs), queues)])
+
+            # The pages prefetched to plan the pagination are completed right away
+            for url, rows in prefetched.items():
+                work_queue.complete('coordinator', url, rows)
+
+            print(f'Enqueued {enqueued} page(s) into {queue_path}, queue: {work_queue.get_stats()}')
+        finally:
+            work_queue.close()
+
+        return enqueued
+
+    @staticmethod
+    def run_worker(queue_path='crawl_queue.sqlite', worker_id=None, batch_pages=20, lease_seconds=300,
+                   poll_seconds=5):
+        """
+        Claims batches of pages from the work queue, fetches and parses them, and stores their rows back into the
+        queue until every page is either done or failed.
+
+        The pages leased by other workers are waited for, and claimed again should their lease expire (i.e. their
+        worker crashed). The pages of a batch which were fetched and parsed are completed, while those failing are
+        handed back to the queue alone, to be claimed again by any worker until they fail max_attempts times.
+
+        :param str queue_path: Specify the path of the work queue's SQLite database
+        :param str worker_id: Specify the worker's id, None uses the host name and the process id
+        :param int batch_pages: Specify the number of pages claimed at once
+        :param float lease_seconds: Specify the number of seconds the worker owns a claimed batch, which must exceed
+                                    the time it takes to fetch and parse a batch
+        :param float poll_seconds: Specify the number of seconds to wait for the pages leased by other workers
+        :return: The number of pages completed by this worker
+        """
+
+        if not isinstance(batch_pages, int) or batch_pages < 1:
+            raise ValueError('batch_pages must be a positive integer')
+
+        worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        completed = 0
+
+        work_queue = WorkQueueHandler(queue_path, lease_seconds=lease_seconds)
+        try:
+            while not work_queue.is_finished():
+                units = work_queue.claim(worker_id, limit=batch_pages)
+
+                if not units:
+                    time.sleep(poll_seconds)
+                    continue
+
+                jobs = {url: (PageParser.parse_threads_details_page, payload['thread_id'],
+                              ForumScraper.__parser_backend)
+                        for url, payload in units}
+                queues = {url: payload['forum_id'] for url, payload in units}
+
+                failed = {}
+                try:
+                    parsed = ForumScraper.__fetch_and_parse(jobs, queues=queues, failed=failed)
+                except Exception as e:
+                    print(f'Worker {worker_id} failed a batch of {len(jobs)} page(s): {e}')
+                    work_queue.release(worker_id, list(jobs))
+                    continue
+
+                for url, rows in zip(jobs, parsed):
+                    if url not in failed:
+                        completed += work_queue.complete(worker_id, url, rows)
+
+                if failed:
+                    print(f'Worker {worker_id} failed {len(failed)} of {len(jobs)} page(s): '
+                          f'{next(iter(failed.values()))}')
+                    work_queue.release(worker_id, list(failed))
+
+                print(f'Worker {worker_id} completed {completed} page(s), queue: {work_queue.get_stats()}')
+        finally:
+            work_queue.close()
+
+        return completed
+
+    @staticmethod
+    def collect_threads_details(queue_path='crawl_queue.sqlite', allow_failed=False):
+        """
+        Gathers the rows stored by the workers into the thread's details snapshot, then deletes the work queue.
+
+        :param str queue_path: Specify the path of the work queue's SQLite database
+        :param bool allow_failed: Writes the snapshot even though some pages failed max_attempts times
+        :return: A thread's details dataframe
+        """
+
+        if not os.path.exists(queue_path):
+            raise FileNotFoundError(f'{queue_path} does not exist, enqueue_threads_details must be called first')
+
+        work_queue = WorkQueueHandler(queue_path)
+        try:
+            stats = work_queue.get_stats()
+
+            if not work_queue.is_finished():
+                raise RuntimeError(f'The crawl is still in progress, queue: {stats}')
+
+            if stats['failed'] and not allow_failed:
+                raise RuntimeError(f'{stats["failed"]} page(s) failed, queue: {stats}')
+
+            # Keeps the posts grouped by thread following the threads order, then in page order
+            results = sorted(work_queue.load_results(), key=lambda result: result[1]['order'])
+            threads_details_df = ForumScraper.__to_threads_details_df([row for _, _, rows in results for row in rows])
+        except BaseException:
+            work_queue.close()
+            raise
+
+        ForumScraper.__snapshot_tables.pop('threads_details', None)
+        SnapshotHandler.write(threads_details_df, 'cached_threads_details.feather', 'threads_details')
+        work_queue.discard()
+
+        # The collected snapshot supersedes whatever was scraped during this run
+        ForumScraper.__threads_details = None
+
+        print(f'Collected {len(threads_details_df)} post(s) from {stats["done"]} page(s)')
+
+        return threads_details_df
+
+    @staticmethod
+    def load_threads(columns=None):
+        """
+        Loads a subset of the threads columns without copying the whole threads dataframe.
+
+        :param list columns: Specify the columns to load, None loads every column
+        :return: A threads dataframe which may share read-only memory with the saved snapshot
+        """
+
+        return ForumScraper.__load('threads', columns=columns)
+
+    @staticmethod
+    def load_threads_details(columns=None):
+        """
+        Loads a subset of the thread's details columns without copying the whole thread's details dataframe.
+
+        :param list columns: Specify the columns to load, None loads every column
+        :return: A thread's details dataframe which may share read-only memory with the saved snapshot
+        """
+
+        return ForumScraper.__load('threads_details', columns=columns)
+
+    @staticmethod
+    def unload():
+        """
+        Drops the scraped dataframes and the memory-mapped snapshot tables, so the next load reads the snapshots again.
+        """
+
+        ForumScraper.__threads = None
+        ForumScraper.__threads_details = None
+        ForumScraper.__snapshot_tables.clear()
+
+    @staticmethod
+    def get_version(kind):
+        """
+        Returns a token identifying the data currently returned by load_threads or load_threads_details.
+
+        The token changes whenever the data is scraped again or the snapshot is rewritten, hence it can key the
+        results derived from the data.
+
+        :param str kind: Specify the dataframe kind, either 'threads' or 'threads_details'
+        :return: A hashable token, None if the data was neither scraped nor saved
+        """
+
+        SchemaHandler.get_schema(kind)
+
+        scraped_df = ForumScraper.__threads if kind == 'threads' else ForumScraper.__threads_details
+        if scraped_df is not None:
+            return 'scraped', ForumScraper.__scrape_counts[kind]
+
+        return ForumScraper.__get_snapshot_version(kind)
+
+    @staticmethod
+    def __get_snapshot_version(kind):
+        """
+        Returns a token identifying the saved snapshot, which changes whenever the snapshot is rewritten.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :return: A tuple of the snapshot's format and its timestamp, None if there is no saved snapshot
+        """
+
+        path = f'cached_{kind}.feather'
+        if os.path.exists(path):
+            return 'feather', SnapshotHandler.read_metadata(path)['timestamp']
+
+        path = f'cached_{kind}.csv'
+        if os.path.exists(path):
+            return 'csv', os.stat(path).st_mtime_ns
+
+        return None
+
+    @staticmethod
+    def __load(kind, columns=None):
+        """
+        Loads a subset of a snapshot's columns from memory, the memory-mapped snapshot or the legacy CSV.
+
+        Data already scraped during this run takes precedence over the saved snapshot.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :param list columns: Specify the columns to load, None loads every column
+        :return: A dataframe indexed by thread_id
+        """
+
+        scraped_df = ForumScraper.__threads if kind == 'threads' else ForumScraper.__threads_details
+        if scraped_df is not None:
+            return scraped_df.copy(deep=False) if columns is None else scraped_df[columns]
+
+        return ForumScraper.__load_snapshot(kind, columns=columns)
+
+    @staticmethod
+    def __load_snapshot(kind, columns=None):
+        """
+        Loads a subset of a saved snapshot's columns from the memory-mapped snapshot or the legacy CSV.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :param list columns: Specify the columns to load, None loads every column
+        :return: A dataframe indexed by thread_id
+        """
+
+        path = f'cached_{kind}.feather'
+        if os.path.exists(path):
+            if kind not in ForumScraper.__snapshot_tables:
+                ForumScraper.__snapshot_tables[kind] = SnapshotHandler.open_table(path)
+
+            return SnapshotHandler.to_frame(ForumScraper.__snapshot_tables[kind], columns=columns)
+
+        if kind == 'threads':
+            return ForumScraper.__get_cached_threads(columns=columns)
+
+        return ForumScraper.__get_cached_threads_details(columns=columns)
+
+    @staticmethod
+    def __get_snapshot_store(kind):
+        """
+        Returns the indexed copy of the snapshots, indexing the kind's saved snapshot again if it changed since it was
+        last indexed, e.g. by another run.
+
+        :param str kind: Specify the snapshot kind, either 'threads' or 'threads_details'
+        :return: A SnapshotQueryHandler
+        """
+
+        if ForumScraper.__snapshot_store is None:
+            ForumScraper.__snapshot_store = SnapshotQueryHandler('cached_snapshots.sqlite')
+
+        version = ForumScraper.__get_snapshot_version(kind)
+        if version is None:
+            raise FileNotFoundError(f'There is no saved {kind} snapshot to query')
+
+        # Versions are stored as JSON, which turns the tuples into lists
+        version = list(version)
+        if ForumScraper.__snapshot_store.get_version(kind) != version:
+            print(f'Indexing the {kind} snapshot, this is a one time process per snapshot...')
+            ForumScraper.__snapshot_store.build(kind, ForumScraper.__load_snapshot(kind), version)
+
+        return ForumScraper.__snapshot_store
+
+    @staticmethod
+    def query_threads(columns=None, filters=None, since=None, until=None, order_by=None, descending=False, limit=100,
+                      offset=0):
+        """
+        Returns a page of the saved threads matching the filters, read from the indexed copy of the snapshot rather
+        than from the whole threads dataframe, e.g. the threads of a poster.
+
+        :param list columns: Specify the columns to read besides thread_id, None reads every column
+        :param dict filters: Specify the value, or list of values, each filtered column must hold, e.g.
+                             {'poster_id': 42}
+        :param since: Specify the earliest date_posted, None does not bound it
+        :param until: Specify the latest date_posted (excluded), None does not bound it
+        :param str order_by: Specify the column ordering the threads, None keeps the snapshot's order
+        :param bool descending: Orders the threads in descending order
+        :param int limit: Specify the maximum number of threads, None reads every matching thread
+        :param int offset: Specify the number of matching threads to skip
+        :return: A threads dataframe
+        """
+
+        return ForumScraper.__get_snapshot_store('threads').query(
+            'threads', columns=columns, filters=filters, since=since, until=until, order_by=order_by,
+            descending=descending, limit=limit, offset=offset)
+
+    @staticmethod
+    def query_threads_details(columns=None, filters=None, since=None, until=None, order_by=None, descending=False,
+                              limit=100, offset=0):
+        """
+        Returns a page of the saved posts matching the filters, read from the indexed copy of the snapshot rather
+        than from the whole thread's details dataframe, e.g. the posts of a user or those of a thread between two
+        dates.
+
+        :param list columns: Specify the columns to read besides thread_id, None reads every column
+        :param dict filters: Specify the value, or list of values, each filtered column must hold, e.g.
+                             {'thread_id': 42} or {'user_id': [1, 2]}
+        :param since: Specify the earliest user_post_date, None does not bound it
+        :param until: Specify the latest user_post_date (excluded), None does not bound it
+        :param str order_by: Specify the column ordering the posts, None keeps the snapshot's order
+        :param bool descending: Orders the posts in descending order
+        :param int limit: Specify the maximum number of posts, None reads every matching post
+        :param int offset: Specify the number of matching posts to skip
+        :return: A thread's details dataframe
+        """
+
+        return ForumScraper.__get_snapshot_store('threads_details').query(
+            'threads_details', columns=columns, filters=filters, since=since, until=until, order_by=order_by,
+            descending=descending, limit=limit, offset=offset)
+
+    @staticmethod
+    def count_threads(filters=None, since=None, until=None):
+        """
+        Returns the number of saved threads matching the filters, e.g. to paginate query_threads.
+
+        :param dict filters: Specify the value, or list of values, each filtered column must hold
+        :param since: Specify the earliest date_posted, None does not bound it
+        :param until: Specify the latest date_posted (excluded), None does not bound it
+        :return: The number of threads
+        """
+
+        return ForumScraper.__get_snapshot_store('threads').count('threads', filters=filters, since=since,
+                                                                  until=until)
+
+    @staticmethod
+    def count_threads_details(filters=None, since=None, until=None):
+        """
+        Returns the number of saved posts matching the filters, e.g. to paginate query_threads_details.
+
+        :param dict filters: Specify the value, or list of values, each filtered column must hold
+        :param since: Specify the earliest user_post_date, None does not bound it
+        :param until: Specify the latest user_post_date (excluded), None does not bound it
+        :return: The number of posts
+        """
+
+        return ForumScraper.__get_snapshot_store('threads_details').count('threads_details', filters=filters,
+                                                                          since=since, until=until)
+
+    @staticmethod
+    def __locate_archived_pages(index):
+        """
+        Groups the archived pages into listing pages and thread's pages, keeping the latest copy of each page.
+
+        The url requested for the pagination lacks a page number, it is the first page fetched once more.
+
+        :param dict index: Specify the archive's index, as returned by ArchiveHandler.load_index
+        :return: A tuple of the listing pages locations by forum then page, and the thread's pages locations by thread
+                 then page
+        """
+
+        def keep_latest(pages, page, location):
+            if page not in pages or pages[page]['fetched_at'] < location['fetched_at']:
+                pages[page] = location
+
+        listing_pages = {}
+        threads_pages = {}
+        for url, location in index.items():
+            match = re.search(r'/forums/(?:[\w-]+\.)?(\d+)/(?:page-(\d+))?$', url)
+            if match:
+                keep_latest(listing_pages.setdefault(int(match.group(1)), {}), int(match.group(2) or 1), location)
+                continue
+
+            match = re.search(r'/threads/(\d+)(?:/page-(\d+))?$', url)
+            if match:
+                keep_latest(threads_pages.setdefault(int(match.group(1)), {}), int(match.group(2) or 1), location)
+
+        return listing_pages, threads_pages
+
+    @staticmethod
+    def rebuild_from_archive(directory='archive', processes=None):
+        """
+        Rebuilds both snapshots by re-parsing the archived pages in parallel, without any request.
+
+        Pages are parsed by the same PageParser methods and converted by the same dataframe builders as a crawl, hence
+        a fixed extraction or a new column only requires a rebuild. Threads appearing on several listing pages (the
+        listing shifts between crawls) are kept from the first page they appear on.
+
+        :param str directory: Specify the archive's directory
+        :param int processes: Specify the number of parsing processes, None uses every core
+        :return: A tuple of the threads and the thread's details dataframes
+        """
+
+        archive = ArchiveHandler(directory=directory)
+        listing_pages, threads_pages = ForumScraper.__locate_archived_pages(archive.load_index())
+
+        if not listing_pages:
+            raise ValueError(f'{directory} does not hold any listing page')
+
+        print(f'Re-parsing {sum(len(pages) for pages in listing_pages.values())} listing page(s) of '
+              f'{len(listing_pages)} forum(s) and '
+              f'{sum(len(pages) for pages in threads_pages.values())} thread\'s page(s)...')
+
+        # Follows the order of the crawled forums, then the order of the forum ids
+        forum_ids = [forum_id for forum_id in ForumScraper.__forums if forum_id in listing_pages]
+        forum_ids += sorted(set(listing_pages) - set(forum_ids))
+
+        backend = ForumScraper.__parser_backend
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            listing_futures = [(forum_id, executor.submit(ArchiveHandler.parse_record, directory,
+                                                          listing_pages[forum_id][page],
+                                                          PageParser.parse_threads_page, backend))
+                               for forum_id in forum_ids
+                               for page in sorted(listing_pages[forum_id])]
+            threads_futures = {thread_id: [executor.submit(ArchiveHandler.parse_record, directory, pages[page],
+                                                           PageParser.parse_threads_details_page, thread_id, backend)
+                                           for page in sorted(pages)]
+                               for thread_id, pages in threads_pages.items()}
+
+            data = [[*row, forum_id] for forum_id, future in listing_futures for row in future.result()]
+            threads_df = ForumScraper.__to_threads_df(data)
+            threads_df = threads_df[~threads_df.index.duplicated(keep='first')]
+
+            # Keeps the posts grouped by thread following the threads order, then in page order
+            thread_ids = [thread_id for thread_id in threads_df.index if thread_id in threads_futures]
+            thread_ids += sorted(set(threads_futures) - set(thread_ids))
+
+            data = [row for thread_id in thread_ids for future in threads_futures[thread_id] for row in future.result()]
+            threads_details_df = ForumScraper.__to_threads_details_df(data)
+
+        ForumScraper.__snapshot_tables.clear()
+        SnapshotHandler.write(threads_df, 'cached_threads.feather', 'threads')
+        SnapshotHandler.write(threads_details_df, 'cached_threads_details.feather', 'threads_details')
+
+        # The rebuilt snapshots supersede whatever was scraped during this run
+        ForumScraper.__threads = None
+        ForumScraper.__threads_details = None
+
+        print(f'Rebuilt {len(threads_df)} thread(s) and {len(threads_details_df)} post(s) from {directory}')
+
+        return threads_df, threads_details_df
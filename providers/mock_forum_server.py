@@ -0,0 +1,350 @@
+import collections
+import hashlib
+import http.server
+import random
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from providers.forum_scraper import ForumScraper
+from providers.page_renderer import PageRenderer
+
+
+class MockForumServer:
+    """
+    Local stand-in for the XenForo forum, serving listing pages and thread's pages rendered out of a snapshot.
+
+    Forums are served at {base_url}forums/{slug.}{forum_id}/[page-N], listing the threads of the snapshot's forum_id
+    by last reply date with the sticky threads on top of the first page, and threads at
+    {base_url}threads/{slug.}{thread_id}/[page-N]. Every response can be delayed, and requests can be throttled (403
+    or 429, with a Retry-After header) or fail (5xx) at random or once they exceed a rate, hence the crawler's
+    concurrency, retries and pacing can be measured at scale without touching the live forum. Served pages carry an
+    ETag, a request whose If-None-Match matches the page being answered with a 304.
+
+    Attributes
+    ----------
+        ERROR_STATUSES      Statuses of the randomly failing responses
+        host                Host the server listens on
+        port                Port the server listens on, the one picked by the system if 0 was given
+        base_url            Root url of the served forum, to pass to ForumScraper.set_base_url
+        latency             Minimum number of seconds before each response
+        jitter              Maximum number of extra random seconds before each response
+        error_rate          Probability of a response failing with one of ERROR_STATUSES
+        throttle_rate       Probability of a response being throttled
+        throttle_status     Status of the throttled responses, either 403 or 429
+        rate_limit          Number of requests per second past which the requests are throttled, None never throttles
+        retry_after         Seconds sent in the Retry-After header of the throttled responses, None sends no header
+        threads_per_page    Number of threads per listing page, the sticky threads aside
+        posts_per_page      Number of posts per thread's page
+        __forums            Sticky and normal threads of each forum
+        __threads_details   Posts grouped by thread
+        __posts             Position and number of the posts of each thread within __threads_details
+        __random            Random generator deciding the failures and the delays
+        __recent            Times of the requests received during the last second
+        __lock              Guards the random generator, the rate window and the counters
+        __counters          Per-run counts of the requests and of each response kind
+        __in_flight         Number of requests currently being answered
+        __server            HTTP server, set while started
+        __thread            Thread serving the requests, set while started
+
+    Methods
+    -------
+        start():
+            Starts serving the requests on a background thread.
+        stop():
+            Stops serving the requests.
+        get_stats():
+            Returns the per-run counts of requests, served and unchanged pages, throttled, failed and missing
+            responses.
+        reset_stats():
+            Nullifies the per-run counters.
+        from_snapshots(**kwargs):
+            Creates a server from the saved snapshots.
+    """
+
+    ERROR_STATUSES = [500, 502, 503]
+
+    def __init__(self, threads_df, threads_details_df, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, throttle_status=429, rate_limit=None, retry_after=1, seed=None,
+                 threads_per_page=20, posts_per_page=20):
+        """
+        :param pd.DataFrame threads_df: Specify the served threads, indexed by thread_id
+        :param pd.DataFrame threads_details_df: Specify the served posts, indexed by thread_id
+        :param str host: Specify the host to listen on
+        :param int port: Specify the port to listen on, 0 picks a free port
+        :param float latency: Specify the minimum number of seconds before each response
+        :param float jitter: Specify the maximum number of extra random seconds before each response
+        :param float error_rate: Specify the probability of a response failing with a 5xx status
+        :param float throttle_rate: Specify the probability of a response being throttled
+        :param int throttle_status: Specify the status of the throttled responses, either 403 or 429
+        :param float rate_limit: Specify the number of requests per second past which the requests are throttled,
+                                 None never throttles
+        :param int retry_after: Specify the seconds sent in the Retry-After header of the throttled responses, None
+                                sends no header
+        :param int seed: Specify the seed of the random failures and delays, None seeds from the system
+        :param int threads_per_page: Specify the number of threads per listing page
+        :param int posts_per_page: Specify the number of posts per thread's page, see ForumScraper.set_posts_per_page
+        """
+
+        for name, value in [('latency', latency), ('jitter', jitter)]:
+            if not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f'{name} must be a non-negative number')
+
+        for name, value in [('error_rate', error_rate), ('throttle_rate', throttle_rate)]:
+            if not isinstance(value, (int, float)) or not 0 <= value <= 1:
+                raise ValueError(f'{name} must be a probability between 0 and 1')
+
+        if throttle_status not in (403, 429):
+            raise ValueError('throttle_status must be either 403 or 429')
+
+        if rate_limit is not None and (not isinstance(rate_limit, (int, float)) or rate_limit <= 0):
+            raise ValueError('rate_limit must be a positive number or None')
+
+        for name, value in [('threads_per_page', threads_per_page), ('posts_per_page', posts_per_page)]:
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f'{name} must be a positive integer')
+
+        self.host = host
+        self.port = port
+        self.base_url = None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.throttle_status = throttle_status
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.threads_per_page = threads_per_page
+        self.posts_per_page = posts_per_page
+
+        if 'forum_id' not in threads_df:
+            threads_df = threads_df.assign(forum_id=0)
+
+        threads_df = threads_df.sort_values('last_replied_date', ascending=False, kind='stable')
+        self.__forums = {int(forum_id): (forum_df[forum_df['is_sticky']], forum_df[~forum_df['is_sticky']])
+                         for forum_id, forum_df in threads_df.groupby('forum_id', sort=False)}
+
+        # Posts are sorted by thread once, so a thread's page is a positional slice
+        self.__threads_details = threads_details_df.sort_index(kind='stable')
+        thread_ids, starts, counts = np.unique(self.__threads_details.index.to_numpy(), return_index=True,
+                                               return_counts=True)
+        self.__posts = {int(thread_id): (int(start), int(count))
+                        for thread_id, start, count in zip(thread_ids, starts, counts)}
+
+        self.__random = random.Random(seed)
+        self.__recent = collections.deque()
+        self.__lock = threading.Lock()
+        self.__counters = {'requests': 0, 'served': 0, 'not_modified': 0, 'throttled': 0, 'errors': 0,
+                           'not_found': 0, 'max_in_flight': 0}
+        self.__in_flight = 0
+        self.__server = None
+        self.__thread = None
+
+    @staticmethod
+    def from_snapshots(**kwargs):
+        """
+        Creates a server from the saved snapshots, synthesizing the posts if no thread's details snapshot was saved.
+
+        :param kwargs: Specify any keyword argument of the constructor besides the dataframes
+        :return: A server, not started yet
+        """
+
+        # Imported here, since the benchmarks start their own servers
+        from providers.benchmark_provider import BenchmarkProvider
+
+        threads_df = ForumScraper.load_threads()
+        try:
+            threads_details_df = ForumScraper.load_threads_details()
+        except FileNotFoundError:
+            print('No thread\'s details snapshot was saved, synthesizing posts from the threads...')
+            threads_details_df = BenchmarkProvider.synthesize_threads_details(threads_df)
+
+        return MockForumServer(threads_df, threads_details_df, **kwargs)
+
+    @staticmethod
+    def __get_pages(rows, rows_per_page):
+        """
+        Returns the number of pages holding the rows.
+
+        :param int rows: Specify the number of rows
+        :param int rows_per_page: Specify the number of rows per page
+        :return: The number of pages, at least 1
+        """
+
+        return max(1, -(-rows // rows_per_page))
+
+    def __render(self, path):
+        """
+        Renders the page of a path.
+
+        :param str path: Specify the requested path, relative to base_url
+        :return: The page's HTML, None if the path does not match any page
+        """
+
+        match = re.fullmatch(r'(forums|threads)/(?:[\w-]*\.)?(\d+)/?(?:page-(\d+)/?)?', path.split('?')[0])
+        if match is None:
+            return None
+
+        kind, key, page = match.group(1), int(match.group(2)), int(match.group(3) or 1)
+
+        if kind == 'forums':
+            if key not in self.__forums:
+                return None
+
+            sticky_df, normal_df = self.__forums[key]
+            pages = MockForumServer.__get_pages(len(normal_df), self.threads_per_page)
+            if page > pages:
+                return None
+
+            page_df = normal_df.iloc[(page - 1) * self.threads_per_page:page * self.threads_per_page]
+            if page == 1:
+                page_df = pd.concat([sticky_df, page_df])
+
+            return PageRenderer.render_threads_page(page_df, page=page, pages=pages)
+
+        if key not in self.__posts:
+            return None
+
+        start, count = self.__posts[key]
+        pages = MockForumServer.__get_pages(count, self.posts_per_page)
+        if page > pages:
+            return None
+
+        offset = start + (page - 1) * self.posts_per_page
+        page_df = self.__threads_details.iloc[offset:min(offset + self.posts_per_page, start + count)]
+
+        return PageRenderer.render_threads_details_page(page_df, page=page, pages=pages)
+
+    def __respond(self, path, etag=None):
+        """
+        Decides the response of a request, then renders its page if it is served.
+
+        :param str path: Specify the requested path
+        :param str etag: Specify the request's If-None-Match header, None if it was not sent
+        :return: A tuple of the response's status, headers and body
+        """
+
+        with self.__lock:
+            now = time.monotonic()
+            self.__counters['requests'] += 1
+            self.__in_flight += 1
+            self.__counters['max_in_flight'] = max(self.__counters['max_in_flight'], self.__in_flight)
+
+            while self.__recent and self.__recent[0] <= now - 1:
+                self.__recent.popleft()
+            self.__recent.append(now)
+
+            delay = self.latency + self.__random.uniform(0, self.jitter)
+            draw = self.__random.random()
+
+            if (self.rate_limit is not None and len(self.__recent) > self.rate_limit) or draw < self.throttle_rate:
+                outcome = 'throttled'
+            elif draw < self.throttle_rate + self.error_rate:
+                outcome = 'errors'
+            else:
+                outcome = None
+
+            error_status = self.__random.choice(MockForumServer.ERROR_STATUSES)
+
+        time.sleep(delay)
+
+        if outcome == 'throttled':
+            headers = {} if self.retry_after is None else {'Retry-After': str(self.retry_after)}
+            status, body = self.throttle_status, 'Too many requests'
+        elif outcome == 'errors':
+            headers, status, body = {}, error_status, 'Server error'
+        else:
+            headers = {}
+            prefix = re.sub(r'^https?://[^/]+', '', self.base_url)
+            html = self.__render(path[len(prefix):]) if path.startswith(prefix) else None
+
+            if html is None:
+                outcome, status, body = 'not_found', 404, 'Not found'
+            else:
+                headers['ETag'] = f'"{hashlib.md5(html.encode("utf-8")).hexdigest()}"'
+                if etag == headers['ETag']:
+                    outcome, status, body = 'not_modified', 304, ''
+                else:
+                    outcome, status, body = 'served', 200, html
+
+        with self.__lock:
+            self.__counters[outcome] += 1
+            self.__in_flight -= 1
+
+        return status, headers, body.encode('utf-8')
+
+    def start(self):
+        """
+        Starts serving the requests on a background thread.
+
+        :return: The served forum's root url
+        """
+
+        if self.__server is not None:
+            raise RuntimeError('The server is already started')
+
+        respond = self.__respond
+
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            # Keeps the connections alive, as the live forum does
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, body = respond(self.path, etag=self.headers.get('If-None-Match'))
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.__server = http.server.ThreadingHTTPServer((self.host, self.port), RequestHandler)
+        self.__server.daemon_threads = True
+        self.port = self.__server.server_address[1]
+        self.base_url = f'http://{self.host}:{self.port}/forum/'
+
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+
+        return self.base_url
+
+    def stop(self):
+        """
+        Stops serving the requests.
+        """
+
+        if self.__server is None:
+            return
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+        self.__server = None
+        self.__thread = None
+
+    def get_stats(self):
+        """
+        Returns the per-run counts of requests, served and unchanged pages, throttled, failed and missing responses,
+        alongside the peak number of requests answered at once.
+
+        :return: A dictionary of counters
+        """
+
+        with self.__lock:
+            return dict(self.__counters)
+
+    def reset_stats(self):
+        """
+        Nullifies the per-run counters.
+        """
+
+        with self.__lock:
+            self.__counters = dict.fromkeys(self.__counters, 0)
@@ -0,0 +1,570 @@
+import re
+import time
+
+import bs4
+
+
+class PageParser:
+    """
+    Static methods which extract rows out of raw HTML pages.
+
+    Every method receives the page's HTML as a str and returns plain python objects, hence they can run on a
+    separate process (e.g. a ProcessPoolExecutor) while the network keeps fetching. Dates and counters are returned as
+    shown on the page, they are converted column-wise by NormalizationHandler once the rows are gathered.
+
+    Two backends produce identical rows:
+        bs4     Beautiful Soup over the pure-python html.parser (default)
+        lxml    Compiled XPath queries over lxml's C parser, requires lxml to be installed
+
+    Attributes
+    ----------
+        BACKENDS            Names of the supported parser backends
+        __xpaths            Compiled XPath queries of the lxml backend, compiled on first use
+
+    Methods
+    -------
+        parse_pagination(html, backend='bs4'):
+            Returns the last page number of a paginated page.
+        parse_with_pagination(html, parse, *args):
+            Extracts the rows of a page alongside its last page number.
+        time_parse(html, parse, *args):
+            Extracts the rows of a page alongside the number of seconds the extraction took.
+        parse_threads_page(html, backend='bs4'):
+            Extracts the threads of a listing page.
+        parse_threads_details_page(html, thread_id, backend='bs4'):
+            Extracts the posts of a thread's page.
+    """
+
+    BACKENDS = ['bs4', 'lxml']
+
+    __xpaths = None
+
+    @staticmethod
+    def __validate_backend(backend):
+        """
+        Raises an error if the backend is not supported.
+
+        :param str backend: Specify the parser backend
+        """
+
+        if backend not in PageParser.BACKENDS:
+            raise ValueError(f'backend must be one of {PageParser.BACKENDS}')
+
+    @staticmethod
+    def __get_xpaths():
+        """
+        Compiles the XPath queries of the lxml backend once per process.
+
+        :return: A dictionary of compiled XPath queries
+        """
+
+        if PageParser.__xpaths is None:
+            from lxml import etree
+
+            def has_class(class_name):
+                return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+            def is_class(class_names):
+                return f"normalize-space(@class)='{class_names}'"
+
+            PageParser.__xpaths = {
+                'pagination': etree.XPath(f"(//ul[{has_class('pageNav-main')}])[1]//a"),
+                'threads': etree.XPath(
+                    f"//div[{is_class('structItemContainer-group js-threadList')} or "
+                    f"{is_class('structItemContainer-group structItemContainer-group--sticky XenStickyBg')}]"),
+                'thread': etree.XPath(
+                    ".//div[starts-with(normalize-space(@class), "
+                    "'structItem structItem--thread js-inlineModContainer')]"),
+                'username': etree.XPath(f".//*[self::span or self::a][{has_class('username')}]"),
+                'poster_image': etree.XPath(f"(.//span[{is_class('avatar avatar--s')}])[1]//img"),
+                'last_replier_image': etree.XPath(f"(.//span[{is_class('avatar avatar--xxs')}])[1]//img"),
+                'time': etree.XPath('.//time'),
+                'title': etree.XPath(f"(.//div[{has_class('structItem-title')}])[1]//a"),
+                'locked': etree.XPath(f".//i[{is_class('structItem-status structItem-status--locked')}]"),
+                'sticky': etree.XPath(f".//i[{is_class('structItem-status structItem-status--sticky')}]"),
+                'meta': etree.XPath(f"(.//div[{is_class('structItem-cell structItem-cell--meta')}])[1]//dd"),
+                'post': etree.XPath(f"//article[{is_class('message message--post js-post js-inlineModContainer')}]"),
+                'user_image': etree.XPath(f"(.//span[{is_class('avatar avatar--m')}])[1]//img"),
+                'user_title': etree.XPath(f".//h5[{is_class('userTitle message-userTitle')}]"),
+                'banners': etree.XPath(
+                    f"(.//div[{has_class('message-userDetails')}])[1]"
+                    f"//div[starts-with(normalize-space(@class), 'userBanner userBanner')]"),
+                'user_extras': etree.XPath(f"(.//div[{has_class('message-userExtras')}])[1]//dd"),
+                'reactions': etree.XPath(f".//ul[{has_class('sv-rating-bar__ratings')}]"),
+                'reaction_count': etree.XPath(f".//div[{has_class('sv-rating__count')}]"),
+                'post_date': etree.XPath(f".//time[{has_class('u-dt')}]"),
+                'post_content': etree.XPath(f".//div[{has_class('message-userContent')}]"),
+                'strong': etree.XPath('.//strong'),
+                'a': etree.XPath('.//a'),
+            }
+
+        return PageParser.__xpaths
+
+    @staticmethod
+    def __to_lxml_document(html):
+        """
+        Parses the HTML into an lxml document.
+
+        :param str html: Specify the page's HTML
+        :return: The document's root element, None if the page is empty
+        """
+
+        import lxml.html
+
+        if not html or not html.strip():
+            return None
+
+        return lxml.html.document_fromstring(html)
+
+    @staticmethod
+    def __to_document(html, backend):
+        """
+        Parses the HTML into the document of the backend, so several extractions can share a single parse.
+
+        :param str html: Specify the page's HTML
+        :param str backend: Specify the parser backend
+        :return: A Beautiful Soup document, or the lxml document's root element (None if the page is empty)
+        """
+
+        if backend == 'lxml':
+            return PageParser.__to_lxml_document(html)
+
+        return bs4.BeautifulSoup(html, 'html.parser')
+
+    @staticmethod
+    def __text(element):
+        """
+        Returns the text of an lxml element and all its descendants as a plain str.
+
+        :param element: Specify the lxml element
+        :return: The element's text
+        """
+
+        return str(element.text_content())
+
+    @staticmethod
+    def parse_pagination(html, backend='bs4'):
+        """
+        Returns the last page number of a paginated page.
+
+        :param str html: Specify the page's HTML
+        :param str backend: Specify the parser backend
+        :return: The last page number
+        """
+
+        PageParser.__validate_backend(backend)
+
+        return PageParser.__parse_pagination_document(PageParser.__to_document(html, backend), backend)
+
+    @staticmethod
+    def __parse_pagination_document(document, backend):
+        """
+        Returns the last page number of a parsed page.
+
+        :param document: Specify the page's document, as returned by __to_document
+        :param str backend: Specify the parser backend
+        :return: The last page number
+        """
+
+        if backend == 'lxml':
+            if document is None:
+                return 1
+
+            pages = PageParser.__get_xpaths()['pagination'](document)
+            if not pages:
+                return 1
+
+            return PageParser.__text(pages[-1])
+
+        pages = document.find('ul', attrs={'class': 'pageNav-main'})
+
+        if not pages:
+            return 1
+
+        # A navigation without any link (e.g. while the forum lays it out) holds a single page
+        links = pages.find_all('a')
+        if not links:
+            return 1
+
+        last_page = links[-1].text
+        return last_page
+
+    @staticmethod
+    def parse_with_pagination(html, parse, *args):
+        """
+        Extracts the rows of a page alongside its last page number, so the first page of a paginated page both plans
+        the remaining pages and provides its own rows.
+
+        :param str html: Specify the page's HTML
+        :param parse: Specify the method extracting the rows, e.g. parse_threads_page
+        :param args: Specify the method's extra arguments following the page's HTML, the last one being the backend
+        :return: A tuple of the last page number and the rows
+        """
+
+        backend = args[-1]
+        PageParser.__validate_backend(backend)
+
+        # The page is parsed once, both extractions reading the same document
+        document = PageParser.__to_document(html, backend)
+
+        if parse == PageParser.parse_threads_page:
+            rows = PageParser.__parse_threads_document(document, backend)
+        elif parse == PageParser.parse_threads_details_page:
+            rows = PageParser.__parse_threads_details_document(document, args[0], backend)
+        else:
+            rows = parse(html, *args)
+
+        return int(PageParser.__parse_pagination_document(document, backend)), rows
+
+    @staticmethod
+    def time_parse(html, parse, *args):
+        """
+        Extracts the rows of a page alongside the number of seconds the extraction took, timed within the process
+        which parses the page.
+
+        :param str html: Specify the page's HTML
+        :param parse: Specify the method extracting the rows, e.g. parse_threads_page
+        :param args: Specify the method's extra arguments following the page's HTML
+        :return: A tuple of the number of seconds and the rows
+        """
+
+        started_at = time.perf_counter()
+        rows = parse(html, *args)
+
+        return time.perf_counter() - started_at, rows
+
+    @staticmethod
+    def parse_threads_page(html, backend='bs4'):
+        """
+        Extracts the threads of a listing page.
+
+        :param str html: Specify the listing page's HTML
+        :param str backend: Specify the parser backend
+        :return: A list of rows, each row is a list ordered as the threads dataframe columns
+        """
+
+        PageParser.__validate_backend(backend)
+
+        return PageParser.__parse_threads_document(PageParser.__to_document(html, backend), backend)
+
+    @staticmethod
+    def __parse_threads_document(document, backend):
+        """
+        Extracts the threads of a parsed listing page.
+
+        :param document: Specify the page's document, as returned by __to_document
+        :param str backend: Specify the parser backend
+        :return: A list of rows, each row is a list ordered as the threads dataframe columns
+        """
+
+        if backend == 'lxml':
+            return PageParser.__parse_threads_page_lxml(document)
+
+        return PageParser.__parse_threads_page_bs4(document)
+
+    @staticmethod
+    def __parse_threads_page_bs4(soup):
+        """
+        Extracts the threads of a listing page using Beautiful Soup.
+
+        :param bs4.BeautifulSoup soup: Specify the listing page's document
+        :return: A list of rows, each row is a list ordered as the threads dataframe columns
+        """
+
+        data = []
+
+        threads = soup \
+            .find_all('div',
+                      {'class': ['structItemContainer-group js-threadList',
+                                 'structItemContainer-group structItemContainer-group--sticky XenStickyBg']})
+
+        new_threads = []
+        for threads_container in threads:
+            new_threads.append(threads_container.find_all('div', attrs={
+                'class': re.compile('^structItem structItem--thread js-inlineModContainer.*')}))
+
+        threads = new_threads
+
+        if not threads:
+            return data
+
+        for threads_container in threads:
+            for thread in threads_container:
+                thread_id = thread['class'][-1].split('-')[-1]
+
+                usernames = thread.find_all(['span', 'a'], {'class', 'username'})
+                poster_id = usernames[0]['data-user-id']
+                poster_name = usernames[0].text
+
+                poster_image = None
+                poster_image_container = thread.find('span', {'class', 'avatar avatar--s'})
+                if poster_image_container is not None:
+                    poster_image = poster_image_container.find('img')['src']
+
+                last_replier_id = usernames[-1]['data-user-id']
+                last_replier_name = usernames[-1].text
+
+                last_replier_image = None
+                last_replier_image_container = thread.find('span', {'class', 'avatar avatar--xxs'})
+                if last_replier_image_container is not None:
+                    last_replier_image = last_replier_image_container.find('img')['src']
+
+                times = thread.find_all('time')
+                last_replied_date = times[-1]['datetime']
+                date_posted = times[0]['datetime']
+                title = thread.find('div', {'class': 'structItem-title'}).find('a').text
+                is_locked = thread.find('i', {'class': 'structItem-status structItem-status--locked'}) is not None
+                is_sticky = thread.find('i', {'class': 'structItem-status structItem-status--sticky'}) is not None
+
+                meta = thread.find('div', {'class', 'structItem-cell structItem-cell--meta'}).find_all('dd')
+                replies = meta[0].text
+                views = meta[-1].text
+
+                data.append(
+                    [thread_id, poster_id, poster_name, poster_image,
+                     last_replier_id, last_replier_name, last_replier_image, last_replied_date,
+                     date_posted, title,
+                     is_locked, is_sticky, replies, views])
+
+        return data
+
+    @staticmethod
+    def __parse_threads_page_lxml(document):
+        """
+        Extracts the threads of a listing page using lxml.
+
+        :param document: Specify the listing page's root element, None if the page is empty
+        :return: A list of rows, each row is a list ordered as the threads dataframe columns
+        """
+
+        data = []
+
+        if document is None:
+            return data
+
+        xpaths = PageParser.__get_xpaths()
+
+        for threads_container in xpaths['threads'](document):
+            for thread in xpaths['thread'](threads_container):
+                thread_id = thread.get('class').split()[-1].split('-')[-1]
+
+                usernames = xpaths['username'](thread)
+                poster_id = usernames[0].attrib['data-user-id']
+                poster_name = PageParser.__text(usernames[0])
+
+                poster_image = None
+                poster_image_container = xpaths['poster_image'](thread)
+                if poster_image_container:
+                    poster_image = poster_image_container[0].attrib['src']
+
+                last_replier_id = usernames[-1].attrib['data-user-id']
+                last_replier_name = PageParser.__text(usernames[-1])
+
+                last_replier_image = None
+                last_replier_image_container = xpaths['last_replier_image'](thread)
+                if last_replier_image_container:
+                    last_replier_image = last_replier_image_container[0].attrib['src']
+
+                times = xpaths['time'](thread)
+                last_replied_date = times[-1].attrib['datetime']
+                date_posted = times[0].attrib['datetime']
+                title = PageParser.__text(xpaths['title'](thread)[0])
+                is_locked = len(xpaths['locked'](thread)) > 0
+                is_sticky = len(xpaths['sticky'](thread)) > 0
+
+                meta = xpaths['meta'](thread)
+                replies = PageParser.__text(meta[0])
+                views = PageParser.__text(meta[-1])
+
+                data.append(
+                    [thread_id, poster_id, poster_name, poster_image,
+                     last_replier_id, last_replier_name, last_replier_image, last_replied_date,
+                     date_posted, title,
+                     is_locked, is_sticky, replies, views])
+
+        return data
+
+    @staticmethod
+    def parse_threads_details_page(html, thread_id, backend='bs4'):
+        """
+        Extracts the posts of a thread's page.
+
+        :param str html: Specify the thread's page HTML
+        :param thread_id: Specify the thread's id, prepended to each row
+        :param str backend: Specify the parser backend
+        :return: A list of rows, each row is a list ordered as the thread's details dataframe columns
+        """
+
+        PageParser.__validate_backend(backend)
+
+        return PageParser.__parse_threads_details_document(PageParser.__to_document(html, backend), thread_id,
+                                                           backend)
+
+    @staticmethod
+    def __parse_threads_details_document(document, thread_id, backend):
+        """
+        Extracts the posts of a parsed thread's page.
+
+        :param document: Specify the page's document, as returned by __to_document
+        :param thread_id: Specify the thread's id, prepended to each row
+        :param str backend: Specify the parser backend
+        :return: A list of rows, each row is a list ordered as the thread's details dataframe columns
+        """
+
+        if backend == 'lxml':
+            return PageParser.__parse_threads_details_page_lxml(document, thread_id)
+
+        return PageParser.__parse_threads_details_page_bs4(document, thread_id)
+
+    @staticmethod
+    def __parse_threads_details_page_bs4(soup, thread_id):
+        """
+        Extracts the posts of a thread's page using Beautiful Soup.
+
+        :param bs4.BeautifulSoup soup: Specify the thread's page document
+        :param thread_id: Specify the thread's id, prepended to each row
+        :return: A list of rows, each row is a list ordered as the thread's details dataframe columns
+        """
+
+        data = []
+
+        thread_details = soup \
+            .find_all('article', {'class': 'message message--post js-post js-inlineModContainer'})
+
+        if not thread_details:
+            return data
+
+        for post in thread_details:
+            username = post.find(['span', 'a'], {'class', 'username'})
+            user_id = username['data-user-id']
+            user_name = username.text
+
+            user_image = None
+            user_image_container = post.find('span', {'class', 'avatar avatar--m'})
+            if user_image_container is not None:
+                user_image = user_image_container.find('img')['src']
+
+            user_title = post.find('h5', {'class', 'userTitle message-userTitle'}).text
+
+            banners = post.find('div', {'class', 'message-userDetails'}) \
+                .find_all('div', {'class': re.compile('^userBanner userBanner.*')})
+            user_banner_1 = None
+            user_banner_2 = None
+            if banners is not None:
+                if len(banners) >= 1:
+                    user_banner_1 = banners[0].find('strong').text
+                if len(banners) > 1:
+                    user_banner_2 = banners[1].find('strong').text
+
+            user_extras = post.find('div', {'class': 'message-userExtras'})
+            user_join_date = None
+            user_messages = None
+            user_location = None
+            user_extras = user_extras.find_all('dd') if user_extras is not None else []
+            if len(user_extras) > 0:
+                user_join_date = user_extras[0].text
+            if len(user_extras) > 1:
+                user_messages = user_extras[1].text.replace(',', '')
+            if len(user_extras) > 2:
+                user_location = user_extras[2].find('a').text
+
+            reactions = post.find('ul', {'class': 'sv-rating-bar__ratings'})
+            post_reaction_like = None
+            post_reaction_thanks = None
+            post_reaction_hug = None
+            if reactions:
+                post_reaction_like = reactions.find('a', {'title': 'Like'})
+                post_reaction_thanks = reactions.find('a', {'title': 'Thanks'})
+                post_reaction_hug = reactions.find('a', {'title': 'Hug'})
+                if post_reaction_like is not None:
+                    post_reaction_like = post_reaction_like.find('div', {'class', 'sv-rating__count'}).text
+                if post_reaction_thanks is not None:
+                    post_reaction_thanks = post_reaction_thanks.find('div', {'class', 'sv-rating__count'}).text
+                if post_reaction_hug is not None:
+                    post_reaction_hug = post_reaction_hug.find('div', {'class', 'sv-rating__count'}).text
+
+            user_post_date = post.find('time', {'class', 'u-dt'})['datetime']
+
+            user_post = ' '.join(post.find('div', {'class', 'message-userContent'}).text.split())
+
+            data.append(
+                [thread_id, user_id, user_name, user_image, user_title, user_banner_1,
+                 user_banner_2, user_join_date, user_messages, user_location,
+                 post_reaction_like, post_reaction_thanks, post_reaction_hug,
+                 user_post_date, user_post])
+
+        return data
+
+    @staticmethod
+    def __parse_threads_details_page_lxml(document, thread_id):
+        """
+        Extracts the posts of a thread's page using lxml.
+
+        :param document: Specify the thread's page root element, None if the page is empty
+        :param thread_id: Specify the thread's id, prepended to each row
+        :return: A list of rows, each row is a list ordered as the thread's details dataframe columns
+        """
+
+        data = []
+
+        if document is None:
+            return data
+
+        xpaths = PageParser.__get_xpaths()
+
+        for post in xpaths['post'](document):
+            username = xpaths['username'](post)[0]
+            user_id = username.attrib['data-user-id']
+            user_name = PageParser.__text(username)
+
+            user_image = None
+            user_image_container = xpaths['user_image'](post)
+            if user_image_container:
+                user_image = user_image_container[0].attrib['src']
+
+            user_title = PageParser.__text(xpaths['user_title'](post)[0])
+
+            banners = xpaths['banners'](post)
+            user_banner_1 = None
+            user_banner_2 = None
+            if len(banners) >= 1:
+                user_banner_1 = PageParser.__text(xpaths['strong'](banners[0])[0])
+            if len(banners) > 1:
+                user_banner_2 = PageParser.__text(xpaths['strong'](banners[1])[0])
+
+            user_extras = xpaths['user_extras'](post)
+            user_join_date = None
+            user_messages = None
+            user_location = None
+            if len(user_extras) > 0:
+                user_join_date = PageParser.__text(user_extras[0])
+            if len(user_extras) > 1:
+                user_messages = PageParser.__text(user_extras[1]).replace(',', '')
+            if len(user_extras) > 2:
+                user_location = PageParser.__text(xpaths['a'](user_extras[2])[0])
+
+            reactions = xpaths['reactions'](post)
+            post_reaction_like = None
+            post_reaction_thanks = None
+            post_reaction_hug = None
+            if reactions:
+                for reaction in xpaths['a'](reactions[0]):
+                    title = reaction.get('title')
+                    if title == 'Like' and post_reaction_like is None:
+                        post_reaction_like = PageParser.__text(xpaths['reaction_count'](reaction)[0])
+                    elif title == 'Thanks' and post_reaction_thanks is None:
+                        post_reaction_thanks = PageParser.__text(xpaths['reaction_count'](reaction)[0])
+                    elif title == 'Hug' and post_reaction_hug is None:
+                        post_reaction_hug = PageParser.__text(xpaths['reaction_count'](reaction)[0])
+
+            user_post_date = xpaths['post_date'](post)[0].attrib['datetime']
+
+            user_post = ' '.join(PageParser.__text(xpaths['post_content'](post)[0]).split())
+
+            data.append(
+                [thread_id, user_id, user_name, user_image, user_title, user_banner_1,
+                 user_banner_2, user_join_date, user_messages, user_location,
+                 post_reaction_like, post_reaction_thanks, post_reaction_hug,
+                 user_post_date, user_post])
+
+        return data
@@ -0,0 +1,225 @@
+import html
+
+import pandas as pd
+
+from helpers.normalization_handler import NormalizationHandler
+
+
+class PageRenderer:
+    """
+    Static methods which render snapshot rows back into XenForo-like HTML pages, the inverse of PageParser.
+
+    The rendered pages only hold the markup PageParser reads, hence parsing a rendered page returns the rendered rows.
+    Counters are abbreviated the way the forum shows them (e.g. 1.2K), so they lose their precision past a thousand.
+
+    Attributes
+    ----------
+        __abbreviations     Suffix and divisor of the abbreviated counters, largest first
+
+    Methods
+    -------
+        render_threads_page(threads_df, page=1, pages=1):
+            Renders a listing page holding the given threads.
+        render_threads_details_page(threads_details_df, page=1, pages=1):
+            Renders a thread's page holding the given posts.
+    """
+
+    __abbreviations = [('M', 10 ** 6), ('K', 10 ** 3)]
+
+    @staticmethod
+    def __escape(value):
+        """
+        Escapes a value for the HTML markup, missing values being rendered as empty strings.
+
+        :param value: Specify the value
+        :return: The escaped string
+        """
+
+        return '' if pd.isna(value) else html.escape(str(value))
+
+    @staticmethod
+    def __abbreviate(value):
+        """
+        Abbreviates a counter the way the forum shows it, e.g. 1234 as 1.2K.
+
+        :param value: Specify the counter
+        :return: The abbreviated string
+        """
+
+        value = int(value)
+
+        for suffix, divisor in PageRenderer.__abbreviations:
+            if value >= divisor:
+                return f'{value / divisor:.1f}'.rstrip('0').rstrip('.') + suffix
+
+        return str(value)
+
+    @staticmethod
+    def __format_date(value, date_format=NormalizationHandler.ISO_FORMAT):
+        """
+        Formats a datetime the way the forum shows it.
+
+        :param value: Specify the datetime
+        :param str date_format: Specify the strftime format
+        :return: The formatted string, empty if the value is missing
+        """
+
+        return '' if pd.isna(value) else pd.Timestamp(value).strftime(date_format)
+
+    @staticmethod
+    def __render_pagination(page, pages):
+        """
+        Renders the page navigation, linking the first, the surrounding and the last pages.
+
+        :param int page: Specify the current page number
+        :param int pages: Specify the last page number
+        :return: The navigation's markup, empty if there is a single page
+        """
+
+        if pages <= 1:
+            return ''
+
+        numbers = sorted({1, max(1, page - 1), page, min(pages, page + 1), pages})
+        links = ''.join(f'<li class="pageNav-page"><a href="page-{number}">{number}</a></li>' for number in numbers)
+
+        return f'<ul class="pageNav-main">{links}</ul>'
+
+    @staticmethod
+    def __render_avatar(size, image):
+        """
+        Renders a user's avatar.
+
+        :param str size: Specify the avatar's size class suffix, e.g. 's' or 'm'
+        :param image: Specify the avatar's url, a missing url renders no avatar
+        :return: The avatar's markup
+        """
+
+        if pd.isna(image):
+            return ''
+
+        return f'<span class="avatar avatar--{size}"><img src="{PageRenderer.__escape(image)}"></span>'
+
+    @staticmethod
+    def __render_thread(thread_id, thread):
+        """
+        Renders a single thread of a listing page.
+
+        :param thread_id: Specify the thread's id
+        :param thread: Specify the thread's row, as a named tuple of the threads columns
+        :return: The thread's markup
+        """
+
+        escape = PageRenderer.__escape
+
+        status = ''
+        if thread.is_locked:
+            status += '<i class="structItem-status structItem-status--locked"></i>'
+        if thread.is_sticky:
+            status += '<i class="structItem-status structItem-status--sticky"></i>'
+
+        return f'<div class="structItem structItem--thread js-inlineModContainer js-threadListItem-{thread_id}">' \
+               f'<div class="structItem-cell structItem-cell--icon">' \
+               f'{PageRenderer.__render_avatar("s", thread.poster_image)}</div>' \
+               f'<div class="structItem-cell structItem-cell--main">{status}' \
+               f'<div class="structItem-title"><a href="threads/{thread_id}/">{escape(thread.title)}</a></div>' \
+               f'<a class="username" data-user-id="{escape(thread.poster_id)}">{escape(thread.poster_name)}</a>' \
+               f'<time class="u-dt" datetime="{PageRenderer.__format_date(thread.date_posted)}"></time></div>' \
+               f'<div class="structItem-cell structItem-cell--meta">' \
+               f'<dl><dt>Replies</dt><dd>{PageRenderer.__abbreviate(thread.replies)}</dd></dl>' \
+               f'<dl><dt>Views</dt><dd>{PageRenderer.__abbreviate(thread.views)}</dd></dl></div>' \
+               f'<div class="structItem-cell structItem-cell--latest">' \
+               f'<time class="u-dt" datetime="{PageRenderer.__format_date(thread.last_replied_date)}"></time>' \
+               f'<a class="username" data-user-id="{escape(thread.last_replier_id)}">' \
+               f'{escape(thread.last_replier_name)}</a></div>' \
+               f'<div class="structItem-cell structItem-cell--icon structItem-cell--iconEnd">' \
+               f'{PageRenderer.__render_avatar("xxs", thread.last_replier_image)}</div>' \
+               f'</div>'
+
+    @staticmethod
+    def render_threads_page(threads_df, page=1, pages=1):
+        """
+        Renders a listing page holding the given threads, the sticky ones being grouped first on the first page.
+
+        :param pd.DataFrame threads_df: Specify the page's threads, indexed by thread_id
+        :param int page: Specify the page number
+        :param int pages: Specify the last page number
+        :return: The page's HTML
+        """
+
+        threads = list(threads_df.itertuples())
+        sticky = [thread for thread in threads if thread.is_sticky] if page == 1 else []
+        normal = [thread for thread in threads if not (page == 1 and thread.is_sticky)]
+
+        groups = ''
+        if sticky:
+            groups += '<div class="structItemContainer-group structItemContainer-group--sticky XenStickyBg">' + \
+                      ''.join(PageRenderer.__render_thread(thread.Index, thread) for thread in sticky) + '</div>'
+
+        groups += '<div class="structItemContainer-group js-threadList">' + \
+                  ''.join(PageRenderer.__render_thread(thread.Index, thread) for thread in normal) + '</div>'
+
+        return f'<!DOCTYPE html><html><body>{PageRenderer.__render_pagination(page, pages)}' \
+               f'<div class="structItemContainer">{groups}</div>' \
+               f'{PageRenderer.__render_pagination(page, pages)}</body></html>'
+
+    @staticmethod
+    def __render_post(post):
+        """
+        Renders a single post of a thread's page.
+
+        :param post: Specify the post's row, as a named tuple of the thread's details columns
+        :return: The post's markup
+        """
+
+        escape = PageRenderer.__escape
+
+        banners = ''.join(f'<div class="userBanner userBanner--staff message-userBanner">'
+                          f'<strong>{escape(banner)}</strong></div>'
+                          for banner in [post.user_banner_1, post.user_banner_2] if not pd.isna(banner))
+
+        extras = ''
+        if not pd.isna(post.user_join_date) and not pd.isna(post.user_messages):
+            extras = f'<div class="message-userExtras">' \
+                     f'<dl><dt>Joined</dt><dd>' \
+                     f'{PageRenderer.__format_date(post.user_join_date, NormalizationHandler.JOIN_DATE_FORMAT)}' \
+                     f'</dd></dl><dl><dt>Messages</dt><dd>{int(post.user_messages):,}</dd></dl>'
+            if not pd.isna(post.user_location):
+                extras += f'<dl><dt>Location</dt><dd><a>{escape(post.user_location)}</a></dd></dl>'
+            extras += '</div>'
+
+        reactions = ''.join(f'<li><a title="{title}"><div class="sv-rating__count">{int(count)}</div></a></li>'
+                            for title, count in [('Like', post.post_reaction_like),
+                                                 ('Thanks', post.post_reaction_thanks),
+                                                 ('Hug', post.post_reaction_hug)] if not pd.isna(count))
+        if reactions:
+            reactions = f'<ul class="sv-rating-bar__ratings">{reactions}</ul>'
+
+        return f'<article class="message message--post js-post js-inlineModContainer">' \
+               f'<div class="message-cell message-cell--user">' \
+               f'{PageRenderer.__render_avatar("m", post.user_image)}' \
+               f'<div class="message-userDetails">' \
+               f'<a class="username" data-user-id="{escape(post.user_id)}">{escape(post.user_name)}</a>' \
+               f'<h5 class="userTitle message-userTitle">{escape(post.user_title)}</h5>{banners}</div>' \
+               f'{extras}</div>' \
+               f'<div class="message-cell message-cell--main">' \
+               f'<time class="u-dt" datetime="{PageRenderer.__format_date(post.user_post_date)}"></time>' \
+               f'<div class="message-userContent"><div class="bbWrapper">{escape(post.user_post)}</div></div>' \
+               f'{reactions}</div>' \
+               f'</article>'
+
+    @staticmethod
+    def render_threads_details_page(threads_details_df, page=1, pages=1):
+        """
+        Renders a thread's page holding the given posts.
+
+        :param pd.DataFrame threads_details_df: Specify the page's posts, indexed by thread_id
+        :param int page: Specify the page number
+        :param int pages: Specify the last page number
+        :return: The page's HTML
+        """
+
+        posts = ''.join(PageRenderer.__render_post(post) for post in threads_details_df.itertuples())
+
+        return f'<!DOCTYPE html><html><body>{PageRenderer.__render_pagination(page, pages)}' \
+               f'<div class="block-body">{posts}</div>' \
+               f'{PageRenderer.__render_pagination(page, pages)}</body></html>'
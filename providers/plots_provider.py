@@ -1,10 +1,8 @@
-import datetime
-
 import pandas as pd
-import pytz
 from calplot import calplot
 
-from providers.forum_scraper import ForumScraper
+from helpers.normalization_handler import NormalizationHandler
+from providers.aggregations_provider import AggregationsProvider
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -55,8 +53,7 @@ class PlotsProvider:
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads(fast_fetch=fast_fetch)
-        df = df.reset_index().groupby('date_posted')['thread_id'].count()
+        df = AggregationsProvider.get_daily_threads(fast_fetch=fast_fetch)['threads']
 
         calplot(df, colorbar=True, tight_layout=False, cmap='Blues',
                 suptitle='Amount of Posts Over Time')
@@ -71,10 +68,11 @@ class PlotsProvider:
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads(fast_fetch=fast_fetch)
+        df = AggregationsProvider.get_daily_threads(fast_fetch=fast_fetch)
 
-        df_views = df.groupby('date_posted')['views'].sum()
-        df_replies = df.groupby('date_posted')['replies'].sum()
+        # The counters are nullable integers, which calplot only accepts as floats
+        df_views = df['views'].astype(float)
+        df_replies = df['replies'].astype(float)
 
         calplot(df_views, colorbar=True, tight_layout=False, cmap='Blues',
                 suptitle='Amount of Views Over Time')
@@ -92,11 +90,12 @@ class PlotsProvider:
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads(fast_fetch=fast_fetch)
+        df = AggregationsProvider.get_threads(['views', 'replies'], fast_fetch=fast_fetch)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        sns.regplot(x=df['views'], y=df['replies'])
+        # The counters are nullable integers, which seaborn's regression only accepts as floats
+        sns.regplot(x=df['views'].astype(float), y=df['replies'].astype(float))
 
         ax.set_xlabel('Views')
         ax.set_ylabel('Replies')
@@ -113,12 +112,10 @@ class PlotsProvider:
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads(fast_fetch=fast_fetch)
+        df = AggregationsProvider.get_thread_counts('poster_name', fast_fetch=fast_fetch).head(15)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df = df.groupby('poster_name')['poster_name'].count().sort_values(ascending=False).head(15)
-
         df.plot(kind='bar', ax=ax)
 
         ax.set_xlabel('Users')
@@ -138,17 +135,15 @@ class PlotsProvider:
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads(fast_fetch=fast_fetch)
+        df = AggregationsProvider.get_oldest_threads(fast_fetch=fast_fetch).head(10)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df['age'] = df['date_posted'] \
-            .apply(lambda x: (datetime.datetime.now(tz=pytz.timezone('utc')) - x).days)
+        df['age'] = NormalizationHandler.derive_age(df['date_posted'])
 
-        df['title'] = df['title'] \
-            .apply(lambda x: (x[:25] + '..') if len(x) > 25 else x)
+        df['title'] = NormalizationHandler.truncate_text(df['title'], 25)
 
-        df = df.sort_values(by=['age'], ascending=False)[['title', 'age']].head(10)
+        df = df[['title', 'age']]
 
         df.plot(kind='bar', x='title', ax=ax)
 
@@ -169,12 +164,13 @@ class PlotsProvider:
         :param bool fast_fetch: Retrieves forums from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads(fast_fetch=fast_fetch)
+        locked_counts = AggregationsProvider.get_thread_counts('is_locked', fast_fetch=fast_fetch)
+        sticky_counts = AggregationsProvider.get_thread_counts('is_sticky', fast_fetch=fast_fetch)
 
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 9))
 
-        locked = [df[df['is_locked']].count()['poster_id'], df[~df['is_locked']].count()['poster_id']]
-        sticky = [df[df['is_sticky']].count()['poster_id'], df[~df['is_sticky']].count()['poster_id']]
+        locked = [locked_counts.get(True, 0), locked_counts.get(False, 0)]
+        sticky = [sticky_counts.get(True, 0), sticky_counts.get(False, 0)]
 
         locked_labels = ['Locked', 'Non-Locked']
         sticky_labels = ['Sticky', 'Non-Sticky']
@@ -200,9 +196,7 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
-
-        df_replies = df.groupby('user_post_date')['user_id'].count()
+        df_replies = AggregationsProvider.get_daily_posts(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
 
         calplot(df_replies, colorbar=True, tight_layout=False, cmap='Blues',
                 suptitle='Amount of Replies Over Time')
@@ -218,12 +212,11 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+        df = AggregationsProvider.get_post_counts('user_name', fast_fetch=fast_fetch,
+                                                  fast_fetch_threads=fast_fetch_threads).head(15)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df = df.groupby('user_name')['user_name'].count().sort_values(ascending=False).head(15)
-
         df.plot(kind='bar', ax=ax)
 
         ax.set_xlabel('Users')
@@ -244,13 +237,11 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+        df = AggregationsProvider.get_user_messages(fast_fetch=fast_fetch,
+                                                    fast_fetch_threads=fast_fetch_threads).head(15)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df.drop_duplicates('user_name', inplace=True)
-        df = df.groupby('user_name')['user_messages'].sum().sort_values(ascending=False).head(15)
-
         df.plot(kind='bar', ax=ax)
 
         ax.set_xlabel('Users')
@@ -271,13 +262,11 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+        df = AggregationsProvider.get_user_counts('user_title', fast_fetch=fast_fetch,
+                                                  fast_fetch_threads=fast_fetch_threads)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df.drop_duplicates('user_name', inplace=True)
-        df = df.groupby('user_title')['user_title'].count().sort_values(ascending=False)
-
         df.plot(kind='bar', ax=ax)
 
         ax.set_xlabel('Titles')
@@ -298,14 +287,13 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+        df1 = AggregationsProvider.get_user_counts('user_banner_1', fast_fetch=fast_fetch,
+                                                   fast_fetch_threads=fast_fetch_threads)
+        df2 = AggregationsProvider.get_user_counts('user_banner_2', fast_fetch=fast_fetch,
+                                                   fast_fetch_threads=fast_fetch_threads)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df.drop_duplicates('user_name', inplace=True)
-        df1 = df.groupby('user_banner_1')['user_banner_1'].count().sort_values(ascending=False)
-        df2 = df.groupby('user_banner_2')['user_banner_2'].count().sort_values(ascending=False)
-
         df = pd.concat([df1, df2], axis=1).sum(axis=1)
 
         df.plot(kind='bar', ax=ax)
@@ -328,15 +316,11 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+        df = AggregationsProvider.get_user_counts('user_join_year', fast_fetch=fast_fetch,
+                                                  fast_fetch_threads=fast_fetch_threads).sort_index().cumsum()
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df['user_join_date'] = df['user_join_date'].map(lambda x: x.strftime('%Y'))
-
-        df.drop_duplicates('user_name', inplace=True)
-        df = df.groupby('user_join_date')['user_join_date'].count().cumsum()
-
         df.plot(kind='line', ax=ax)
 
         ax.set_xlabel('Duration')
@@ -355,21 +339,18 @@ class PlotsProvider:
         :param fast_fetch_threads: Retrieves threads from a saved snapshot instantly
         """
 
-        df = ForumScraper.scrap_threads_details(fast_fetch=fast_fetch, fast_fetch_threads=fast_fetch_threads)
+        df = AggregationsProvider.get_user_counts('user_location', fast_fetch=fast_fetch,
+                                                  fast_fetch_threads=fast_fetch_threads)
 
         fig, ax = plt.subplots(figsize=(10, 9))
 
-        df.drop_duplicates('user_name', inplace=True)
-
         identical_country_names = {'USA': 'United States', 'California': 'United States', 'US': 'United States',
                                    'Florida': 'United States', 'Texas': 'United States', 'New York': 'United States',
                                    'usa': 'United States', 'Arkansas': 'United States',
                                    'UK': 'England', 'uk': 'England', 'U.K': 'England', 'Scotland': 'England',
                                    'London': 'England', 'Manchester': 'England',
                                    }
-        df.replace({"user_location": identical_country_names}, inplace=True)
-
-        df = df.groupby('user_location')['user_location'].count().sort_values(ascending=False).head(10)
+        df = df.groupby(lambda x: identical_country_names.get(x, x)).sum().sort_values(ascending=False).head(10)
 
         df.plot(kind='pie', autopct='%1.1f%%', ax=ax)
 
@@ -0,0 +1,209 @@
+import concurrent.futures
+import json
+import os
+
+import matplotlib.pyplot as plt
+
+from providers.forum_scraper import ForumScraper
+from providers.plots_provider import PlotsProvider
+
+
+class RenderProvider:
+    """
+    Static methods which render the plots into image files without any interactive window.
+
+    Charts are rendered from the saved snapshots with the non-interactive Agg backend, each in a process of a pool.
+    The version of the snapshot each chart was rendered from is kept per image format in a manifest within the output
+    directory, hence a chart is only rendered again once its snapshot changes.
+
+    Attributes
+    ----------
+        FORMATS             Supported image formats
+        MANIFEST            Name of the manifest file within the output directory
+        __charts            Snapshot kind and figure suffixes of each plot, None for single figure plots
+
+    Methods
+    -------
+        get_charts():
+            Returns the names of the charts that can be rendered.
+        __get_paths(chart, output_dir, image_format):
+            Returns the paths of the files a chart is rendered into.
+        render_chart(chart, output_dir, image_format='png'):
+            Renders a single chart into files, using the Agg backend.
+        render_all(output_dir, image_format='png', processes=None, force=False):
+            Renders every chart whose snapshot changed since it was last rendered.
+    """
+
+    FORMATS = ['png', 'svg']
+    MANIFEST = 'render_manifest.json'
+
+    __charts = {
+        'plot_threads_posting': ('threads', None),
+        'plot_views_with_replies': ('threads', ['views', 'replies']),
+        'plot_view_with_replies_relation': ('threads', None),
+        'plot_top_15_thread_creators': ('threads', None),
+        'plot_top_15_oldest_threads': ('threads', None),
+        'plot_locked_sticky_threads': ('threads', None),
+        'plot_replies': ('threads_details', None),
+        'plot_top_15_repliers': ('threads_details', None),
+        'plot_top_15_messages': ('threads_details', None),
+        'plot_user_titles': ('threads_details', None),
+        'plot_user_banners': ('threads_details', None),
+        'plot_users_joining': ('threads_details', None),
+        'plot_user_top_10_locations': ('threads_details', None),
+    }
+
+    @staticmethod
+    def get_charts():
+        """
+        Returns the names of the charts that can be rendered.
+
+        :return: A list of PlotsProvider method names
+        """
+
+        return list(RenderProvider.__charts)
+
+    @staticmethod
+    def __get_paths(chart, output_dir, image_format):
+        """
+        Returns the paths of the files a chart is rendered into.
+
+        :param str chart: Specify the chart's name
+        :param str output_dir: Specify the output directory
+        :param str image_format: Specify the image format
+        :return: A list of paths, one per figure of the chart
+        """
+
+        kind, suffixes = RenderProvider.__charts[chart]
+
+        if suffixes is None:
+            return [os.path.join(output_dir, kind, f'{chart}.{image_format}')]
+
+        return [os.path.join(output_dir, kind, f'{chart}_{suffix}.{image_format}') for suffix in suffixes]
+
+    @staticmethod
+    def render_chart(chart, output_dir, image_format='png'):
+        """
+        Renders a single chart into files, using the Agg backend.
+
+        :param str chart: Specify the chart's name, as returned by get_charts
+        :param str output_dir: Specify the output directory
+        :param str image_format: Specify the image format, one of FORMATS
+        :return: A list of the written paths
+        """
+
+        if chart not in RenderProvider.__charts:
+            raise ValueError(f'chart must be one of {RenderProvider.get_charts()}')
+
+        if image_format not in RenderProvider.FORMATS:
+            raise ValueError(f'image_format must be one of {RenderProvider.FORMATS}')
+
+        # plt.show does nothing on Agg, leaving the figures open for saving
+        plt.switch_backend('Agg')
+        plt.close('all')
+
+        paths = RenderProvider.__get_paths(chart, output_dir, image_format)
+
+        try:
+            getattr(PlotsProvider, chart)()
+
+            figures = [plt.figure(number) for number in plt.get_fignums()]
+            if len(figures) != len(paths):
+                raise RuntimeError(f'{chart} drew {len(figures)} figure(s), expected {len(paths)}')
+
+            for figure, path in zip(figures, paths):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                figure.savefig(path, format=image_format, bbox_inches='tight')
+        finally:
+            plt.close('all')
+
+        return paths
+
+    @staticmethod
+    def render_all(output_dir, image_format='png', processes=None, force=False):
+        """
+        Renders every chart whose snapshot changed since it was last rendered, skipping the charts whose snapshot was
+        never saved.
+
+        :param str output_dir: Specify the output directory
+        :param str image_format: Specify the image format, one of FORMATS
+        :param int processes: Specify the number of rendering processes, None uses every core, 1 renders in-process
+        :param bool force: Renders every chart regardless of the manifest
+        :return: A dictionary mapping each rendered chart to its written paths
+        :raises RuntimeError: If any chart failed rendering, once the others are rendered
+        """
+
+        if image_format not in RenderProvider.FORMATS:
+            raise ValueError(f'image_format must be one of {RenderProvider.FORMATS}')
+
+        if processes is not None and (not isinstance(processes, int) or processes < 1):
+            raise ValueError('processes must be a positive integer or None')
+
+        manifest_path = os.path.join(output_dir, RenderProvider.MANIFEST)
+
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+
+        versions = {}
+        charts = []
+        missing = []
+        failed = {}
+        for chart, (kind, _) in RenderProvider.__charts.items():
+            try:
+                if kind not in versions:
+                    version = ForumScraper.get_version(kind)
+
+                    # JSON round-trips tuples as lists
+                    versions[kind] = None if version is None else list(version)
+            except Exception as e:
+                failed[chart] = e
+                continue
+
+            if versions[kind] is None:
+                missing.append(chart)
+                continue
+
+            paths = RenderProvider.__get_paths(chart, output_dir, image_format)
+
+            if (force or manifest.get(f'{chart}.{image_format}') != versions[kind]
+                    or not all(os.path.exists(path) for path in paths)):
+                charts.append(chart)
+
+        if missing:
+            print(f'Skipping {len(missing)} chart(s) lacking a saved snapshot: {", ".join(missing)}')
+
+        print(f'Rendering {len(charts)} of {len(RenderProvider.__charts)} chart(s) into {output_dir}...')
+
+        rendered = {}
+        if processes == 1:
+            for chart in charts:
+                try:
+                    rendered[chart] = RenderProvider.render_chart(chart, output_dir, image_format)
+                except Exception as e:
+                    failed[chart] = e
+        elif charts:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = {chart: executor.submit(RenderProvider.render_chart, chart, output_dir, image_format)
+                           for chart in charts}
+
+                for chart, future in futures.items():
+                    try:
+                        rendered[chart] = future.result()
+                    except Exception as e:
+                        failed[chart] = e
+
+        for chart in rendered:
+            manifest[f'{chart}.{image_format}'] = versions[RenderProvider.__charts[chart][0]]
+
+        if rendered:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=4)
+
+        # The manifest keeps the successfully rendered charts, so only the failed ones are rendered on the next run
+        if failed:
+            raise RuntimeError(f'Failed rendering {list(failed)}') from next(iter(failed.values()))
+
+        return rendered
@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from helpers.schema_handler import SchemaHandler
+from providers.benchmark_provider import BenchmarkProvider
+from providers.forum_scraper import ForumScraper
+from providers.mock_forum_server import MockForumServer
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORUM_ID = 394
+
+
+def build_threads(count=12):
+    """
+    Returns the first threads of the repository's saved snapshot, with reply counts spanning one to three pages.
+    """
+
+    threads_df = pd.read_csv(os.path.join(REPOSITORY_DIRECTORY, 'cached_threads.csv'), index_col='thread_id',
+                             skiprows=1).iloc[:count]
+    threads_df = threads_df.assign(forum_id=FORUM_ID, replies=np.arange(count) * 7 % 50)
+
+    return SchemaHandler.compact(threads_df, 'threads')
+
+
+def build_threads_details(threads_df):
+    """
+    Synthesizes the posts of the threads, the last post of each thread being dated at its last reply.
+    """
+
+    threads_details_df = BenchmarkProvider.synthesize_threads_details(threads_df)
+
+    is_last = (threads_details_df.groupby(level=0).cumcount(ascending=False) == 0).to_numpy()
+    last_replied_dates = threads_df['last_replied_date'].reindex(threads_details_df.index).to_numpy()
+    threads_details_df['user_post_date'] = threads_details_df['user_post_date'].where(
+        ~is_last, pd.Series(last_replied_dates, index=threads_details_df.index))
+
+    return threads_details_df
+
+
+def add_posts(threads_df, threads_details_df, thread_id, count):
+    """
+    Returns copies of the snapshots where a thread was replied to count more times, an hour apart.
+    """
+
+    posts_df = threads_details_df.loc[[thread_id]]
+    last_post_date = posts_df['user_post_date'].max()
+
+    new_posts_df = posts_df.iloc[[-1] * count].copy()
+    new_posts_df['user_post_date'] = [last_post_date + pd.Timedelta(hours=i + 1) for i in range(count)]
+    new_posts_df['user_post'] = [f'New post {i}' for i in range(count)]
+
+    # The replies are widened first, since the compacted dtype may not fit the new count
+    threads_df = threads_df.astype({'replies': 'Int64'})
+    threads_df.loc[thread_id, 'replies'] += count
+    threads_df.loc[thread_id, 'last_replied_date'] = new_posts_df['user_post_date'].iloc[-1]
+
+    position = np.flatnonzero(threads_details_df.index == thread_id)[-1] + 1
+    threads_details_df = pd.concat([threads_details_df.iloc[:position], new_posts_df,
+                                    threads_details_df.iloc[position:]])
+
+    return SchemaHandler.compact(threads_df, 'threads'), SchemaHandler.compact(threads_details_df, 'threads_details')
+
+
+def count_pages(threads_df, posts_per_page=20):
+    """
+    Returns the number of pages of the threads.
+    """
+
+    return int(np.ceil((threads_df['replies'].to_numpy(dtype=int) + 1) / posts_per_page).sum())
+
+
+@pytest.fixture
+def serve_forum(tmp_path, monkeypatch):
+    """
+    Returns a callable serving the given snapshots from a MockForumServer, the crawler pointing at it from within a
+    temporary working directory.
+    """
+
+    monkeypatch.chdir(tmp_path)
+    servers = []
+
+    def serve(threads_df, threads_details_df, **kwargs):
+        for server in servers:
+            server.stop()
+
+        server = MockForumServer(threads_df, threads_details_df, **kwargs)
+        servers.append(server)
+
+        ForumScraper.unload()
+        ForumScraper.set_base_url(server.start())
+        ForumScraper.set_forums([FORUM_ID])
+        ForumScraper.set_rate_limit(rate=None, backoff=0.01)
+        ForumScraper.set_parse_processes(2)
+
+        return server
+
+    yield serve
+
+    for server in servers:
+        server.stop()
+
+    ForumScraper.unload()
+    ForumScraper.set_base_url()
+    ForumScraper.set_forums([FORUM_ID])
+    ForumScraper.set_concurrency()
+    ForumScraper.set_rate_limit()
+    ForumScraper.set_response_cache(path=None)
+    ForumScraper.set_parse_processes()
+    ForumScraper.set_memory_reports(enabled=False)
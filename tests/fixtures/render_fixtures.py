@@ -0,0 +1,95 @@
+"""
+Renders the rendered_*.html fixtures with PageRenderer, run from the repository's root with
+python -m tests.fixtures.render_fixtures
+
+The listing page holds the sticky threads and the most replied threads of cached_threads.csv, a snapshot scraped from
+the live forum; no saved thread reaches a thousand replies, hence one thread's replies are raised to 1,234 so that
+the page shows an abbreviated reply count. The thread's page holds posts synthesized by BenchmarkProvider for the most
+replied thread, a few of them edited to cover users showing no details, missing and double banners, every reaction
+and message counts over a thousand. Neither page was saved from the live forum.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from helpers.schema_handler import SchemaHandler
+from providers.benchmark_provider import BenchmarkProvider
+from providers.page_renderer import PageRenderer
+
+FIXTURES_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(FIXTURES_DIRECTORY))
+THREADS_PER_PAGE = 20
+POSTS_PER_PAGE = 20
+
+
+def build_threads():
+    """
+    Returns the threads of the rendered listing page, alongside its number of pages.
+    """
+
+    threads_df = SchemaHandler.compact(pd.read_csv(os.path.join(REPOSITORY_DIRECTORY, 'cached_threads.csv'),
+                                                   index_col='thread_id', skiprows=1), 'threads')
+    threads_df['replies'] = threads_df['replies'].astype('UInt16')
+
+    sticky_df = threads_df[threads_df['is_sticky']]
+    normal_df = threads_df[~threads_df['is_sticky']].sort_values('replies', ascending=False, kind='stable')
+    normal_df = normal_df.iloc[:THREADS_PER_PAGE].copy()
+    normal_df.iloc[1, normal_df.columns.get_loc('replies')] = 1234
+
+    pages = -(-int((~threads_df['is_sticky']).sum()) // THREADS_PER_PAGE)
+
+    return pd.concat([sticky_df, normal_df]), pages
+
+
+def build_threads_details(threads_df):
+    """
+    Returns the posts of the rendered thread's page, alongside its number of pages.
+    """
+
+    thread_df = threads_df[threads_df['replies'] < 1000].sort_values('replies', ascending=False).iloc[:1]
+    threads_details_df = BenchmarkProvider.synthesize_threads_details(thread_df).iloc[:POSTS_PER_PAGE]
+    # The forum dates the posts to the second
+    threads_details_df['user_post_date'] = threads_details_df['user_post_date'].dt.floor('s')
+    # Edited as plain objects, the compacted categories not holding the new values
+    threads_details_df = threads_details_df.astype(object)
+
+    # A user showing neither an avatar, a title, a banner nor any extra
+    for column in ['user_image', 'user_title', 'user_banner_1', 'user_join_date', 'user_messages', 'user_location']:
+        threads_details_df.iloc[1, threads_details_df.columns.get_loc(column)] = None
+
+    threads_details_df.iloc[2, threads_details_df.columns.get_loc('user_banner_1')] = 'Staff Member'
+    threads_details_df.iloc[2, threads_details_df.columns.get_loc('user_banner_2')] = 'Moderator'
+    threads_details_df.iloc[3, threads_details_df.columns.get_loc('user_banner_1')] = None
+    threads_details_df.iloc[3, threads_details_df.columns.get_loc('user_messages')] = 12345
+    for column, count in [('post_reaction_like', 12), ('post_reaction_thanks', 3), ('post_reaction_hug', 1)]:
+        threads_details_df.iloc[4, threads_details_df.columns.get_loc(column)] = count
+
+    pages = -(-(int(thread_df['replies'].iloc[0]) + 1) // POSTS_PER_PAGE)
+
+    return SchemaHandler.compact(threads_details_df, 'threads_details'), pages
+
+
+def render_fixtures():
+    """
+    Returns the rendered fixtures, mapping each file name to the rendered rows and the page's HTML.
+    """
+
+    threads_df, threads_pages = build_threads()
+    threads_details_df, threads_details_pages = build_threads_details(threads_df)
+
+    return {
+        'rendered_threads_page.html': (threads_df, PageRenderer.render_threads_page(threads_df, page=1,
+                                                                                    pages=threads_pages)),
+        'rendered_threads_details_page.html': (threads_details_df, PageRenderer.render_threads_details_page(
+            threads_details_df, page=1, pages=threads_details_pages)),
+    }
+
+
+if __name__ == '__main__':
+    for name, (_, html) in render_fixtures().items():
+        with open(os.path.join(FIXTURES_DIRECTORY, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+        print(f'Rendered {name}')
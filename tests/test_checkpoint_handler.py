@@ -0,0 +1,24 @@
+import datetime
+
+import numpy as np
+
+from helpers.checkpoint_handler import CheckpointHandler
+
+
+def test_recorded_units_are_loaded_back_by_a_new_run(tmp_path):
+    path = str(tmp_path / 'crawl.journal')
+    posted_at = datetime.datetime(2021, 8, 15, 10, tzinfo=datetime.timezone.utc)
+    rows = [[np.int64(7), 'Post', posted_at, None]]
+
+    checkpoint = CheckpointHandler(path)
+    checkpoint.record('https://example.com/threads/7/', rows)
+    checkpoint.record('https://example.com/threads/7/page-2', [])
+    # The run is killed without closing the journal, while writing a third unit
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"key": "https://example.com/thr')
+
+    units = CheckpointHandler(path).load()
+
+    assert units == {'https://example.com/threads/7/': [[7, 'Post', posted_at, None]],
+                     'https://example.com/threads/7/page-2': []}
+    checkpoint.discard()
@@ -0,0 +1,270 @@
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+from helpers.snapshot_handler import SnapshotHandler
+from helpers.work_queue_handler import WorkQueueHandler
+from providers.forum_scraper import ForumScraper
+from tests.conftest import add_posts, build_threads, build_threads_details, count_pages
+
+
+def test_details_crawl_replans_threads_read_from_an_outdated_snapshot(serve_forum):
+    threads_df = build_threads()
+    threads_details_df = build_threads_details(threads_df)
+    SnapshotHandler.write(threads_df, 'cached_threads.feather', 'threads')
+
+    thread_id = threads_df.index[3]
+    threads_df, threads_details_df = add_posts(threads_df, threads_details_df, thread_id, 30)
+    serve_forum(threads_df, threads_details_df)
+
+    ForumScraper.scrap_threads(fast_fetch=True)
+    crawled_df = ForumScraper.scrap_threads_details(fast_fetch_threads=False)
+
+    assert crawled_df.groupby(level=0).size().to_dict() == threads_details_df.groupby(level=0).size().to_dict()
+
+
+def test_details_crawl_trusts_threads_scraped_during_the_run(serve_forum):
+    threads_df = build_threads()
+    server = serve_forum(threads_df, build_threads_details(threads_df))
+
+    ForumScraper.scrap_threads()
+    server.reset_stats()
+    ForumScraper.scrap_threads_details(fast_fetch_threads=True)
+
+    # Only the thread's pages are requested, the listing pages are not walked again
+    assert server.get_stats()['requests'] == count_pages(threads_df)
+
+
+def test_adapted_concurrency_is_capped_at_the_host_limit(serve_forum):
+    threads_df = build_threads()
+    server = serve_forum(threads_df, build_threads_details(threads_df))
+
+    ForumScraper.set_concurrency(max_workers=8, per_host=2)
+    assert ForumScraper.get_session_stats()['concurrency'] == 2
+
+    ForumScraper.set_rate_limit(rate=None, max_concurrency=16)
+    ForumScraper.scrap_threads_details()
+
+    assert ForumScraper.get_session_stats()['concurrency'] == 2
+    assert server.get_stats()['max_in_flight'] <= 2
+
+    ForumScraper.set_concurrency(max_workers=8, per_host=8)
+    ForumScraper.set_rate_limit(rate=None, max_concurrency=6)
+    assert ForumScraper.get_session_stats()['concurrency'] == 4
+
+    ForumScraper.set_concurrency(max_workers=8, per_host=3)
+    assert ForumScraper.get_session_stats()['concurrency'] == 3
+
+
+def test_streamed_batches_match_the_scraped_details(serve_forum):
+    threads_df = build_threads()
+    serve_forum(threads_df, build_threads_details(threads_df))
+
+    scraped_df = ForumScraper.scrap_threads_details()
+    rows = ForumScraper.stream_threads_details(batch_pages=3, fast_fetch_threads=True)
+
+    assert rows == len(scraped_df)
+    # Categories never seen, e.g. missing banners, are read back without a dtype of their own
+    pd.testing.assert_frame_equal(ForumScraper.load_threads_details(), scraped_df, check_dtype=False,
+                                  check_categorical=False)
+
+
+def test_empty_stream_replaces_the_previous_snapshot(serve_forum):
+    threads_df = build_threads()
+    serve_forum(threads_df, build_threads_details(threads_df))
+    ForumScraper.stream_threads_details()
+
+    serve_forum(threads_df.iloc[:0], build_threads_details(threads_df).iloc[:0])
+    rows = ForumScraper.stream_threads_details()
+
+    threads_details_df = ForumScraper.load_threads_details()
+    assert rows == 0
+    assert threads_details_df.empty
+    expected_df = ForumScraper._ForumScraper__to_threads_details_df([])
+    assert threads_details_df.dtypes.astype(str).to_dict() == expected_df.dtypes.astype(str).to_dict()
+
+
+def test_cached_crawl_revalidates_and_replays_offline(serve_forum):
+    threads_df = build_threads()
+    server = serve_forum(threads_df, build_threads_details(threads_df))
+    ForumScraper.set_response_cache(ttl=0)
+
+    scraped_df = ForumScraper.scrap_threads_details()
+    server.reset_stats()
+    ForumScraper.unload()
+    ForumScraper.scrap_threads_details()
+
+    # Every page is confirmed unchanged rather than downloaded again
+    assert server.get_stats()['served'] == 0
+    assert server.get_stats()['not_modified'] == count_pages(threads_df) + 1
+
+    server.stop()
+    ForumScraper.unload()
+    ForumScraper.set_response_cache(offline=True)
+
+    pd.testing.assert_frame_equal(ForumScraper.scrap_threads_details(), scraped_df)
+
+
+def test_cached_listing_pages_are_always_revalidated(serve_forum):
+    threads_df = build_threads()
+    threads_details_df = build_threads_details(threads_df)
+    server = serve_forum(threads_df, threads_details_df)
+    ForumScraper.set_response_cache(ttl=60 * 60)
+    ForumScraper.scrap_threads_details()
+
+    thread_id = threads_df.index[3]
+    threads_df, threads_details_df = add_posts(threads_df, threads_details_df, thread_id, 30)
+    serve_forum(threads_df, threads_details_df, port=server.port)
+    ForumScraper.set_response_cache(ttl=60 * 60)
+    # Drops the connections kept alive with the stopped server
+    ForumScraper.set_concurrency()
+
+    assert ForumScraper.scrap_threads().loc[thread_id, 'replies'] == threads_df.loc[thread_id, 'replies']
+
+
+def test_memory_reports_are_only_computed_once_enabled(serve_forum):
+    threads_df = build_threads()
+    serve_forum(threads_df, build_threads_details(threads_df))
+
+    ForumScraper.scrap_threads()
+    assert ForumScraper.get_memory_report('threads') is None
+
+    ForumScraper.unload()
+    ForumScraper.set_memory_reports()
+    ForumScraper.scrap_threads()
+
+    report_df = ForumScraper.get_memory_report('threads')
+    assert report_df.loc['Total', 'saved_bytes'] > 0
+
+
+def crawl_delta_and_full(serve_forum, threads_df, threads_details_df, changes):
+    server = serve_forum(threads_df, threads_details_df)
+    ForumScraper.cache_threads()
+    ForumScraper.cache_threads_details()
+
+    for thread_id, count in changes.items():
+        threads_df, threads_details_df = add_posts(threads_df, threads_details_df, thread_id, count)
+
+    server = serve_forum(threads_df, threads_details_df, port=server.port)
+    ForumScraper.set_concurrency()
+    delta_df = ForumScraper.scrap_threads_details(delta=True)
+    delta_requests = server.get_stats()['requests']
+
+    ForumScraper.unload()
+    full_df = ForumScraper.scrap_threads_details()
+
+    return delta_df, full_df, delta_requests
+
+
+def test_delta_crawl_merges_the_new_posts_as_a_full_crawl_would(serve_forum):
+    threads_df = build_threads()
+    threads_details_df = build_threads_details(threads_df)
+    changes = {threads_df.index[1]: 3, threads_df.index[3]: 30}
+
+    delta_df, full_df, delta_requests = crawl_delta_and_full(serve_forum, threads_df, threads_details_df, changes)
+
+    pd.testing.assert_frame_equal(delta_df, full_df, check_dtype=False, check_categorical=False)
+    # The listing page, then the last known page of each changed thread and the pages after it
+    assert delta_requests == 1 + 1 + 2
+
+
+def test_delta_crawl_plans_abbreviated_threads_from_their_first_page(serve_forum):
+    threads_df = build_threads(count=4)
+    threads_details_df = build_threads_details(threads_df)
+    thread_id = threads_df.index[2]
+    threads_df, threads_details_df = add_posts(threads_df, threads_details_df, thread_id, 1000)
+
+    delta_df, full_df, _ = crawl_delta_and_full(serve_forum, threads_df, threads_details_df, {thread_id: 25})
+
+    pd.testing.assert_frame_equal(delta_df, full_df, check_dtype=False, check_categorical=False)
+    assert len(delta_df.loc[thread_id]) == threads_df.loc[thread_id, 'replies'] + 1 + 25
+    assert (delta_df.loc[thread_id, 'user_post'].iloc[-25:] == [f'New post {i}' for i in range(25)]).all()
+
+
+def test_interrupted_crawl_resumes_from_its_journal(serve_forum):
+    threads_df = build_threads()
+    threads_details_df = build_threads_details(threads_df)
+
+    # Some pages fail without being retried, failing the crawl once every other page was journaled
+    server = serve_forum(threads_df, threads_details_df, error_rate=0.3, seed=0)
+    ForumScraper.set_rate_limit(rate=None, max_retries=0)
+    with pytest.raises(requests.HTTPError):
+        ForumScraper.scrap_threads_details()
+
+    with open('cached_threads_details.journal', encoding='utf-8') as f:
+        journaled = len(f.readlines())
+    assert 0 < journaled < count_pages(threads_df)
+
+    # The journal's last line is torn, as if the crawl was killed while writing it
+    with open('cached_threads_details.journal', 'a', encoding='utf-8') as f:
+        f.write('{"key": "http')
+
+    server = serve_forum(threads_df, threads_details_df, port=server.port)
+    ForumScraper.set_concurrency()
+    resumed_df = ForumScraper.scrap_threads_details()
+
+    # The listing page, then the pages missing from the journal alone
+    assert server.get_stats()['requests'] == 1 + count_pages(threads_df) - journaled
+    assert not os.path.exists('cached_threads_details.journal')
+
+    ForumScraper.unload()
+    pd.testing.assert_frame_equal(resumed_df, ForumScraper.scrap_threads_details())
+
+
+def test_worker_reclaims_the_pages_of_a_crashed_worker(serve_forum):
+    threads_df = build_threads()
+    serve_forum(threads_df, build_threads_details(threads_df))
+    scraped_df = ForumScraper.scrap_threads_details()
+
+    assert ForumScraper.enqueue_threads_details(fast_fetch_threads=True) == count_pages(threads_df)
+
+    # A worker leases a batch then dies without completing it
+    work_queue = WorkQueueHandler('crawl_queue.sqlite', lease_seconds=0.2)
+    work_queue.claim('crashed', limit=5)
+    work_queue.close()
+
+    assert ForumScraper.run_worker(worker_id='worker', batch_pages=4, poll_seconds=0.05) == count_pages(threads_df)
+
+    pd.testing.assert_frame_equal(ForumScraper.collect_threads_details(), scraped_df, check_dtype=False,
+                                  check_categorical=False)
+    assert not os.path.exists('crawl_queue.sqlite')
+
+
+def test_worker_gives_up_on_pages_failing_max_attempts_times(serve_forum):
+    threads_df = build_threads(count=3)
+    threads_details_df = build_threads_details(threads_df)
+    server = serve_forum(threads_df, threads_details_df)
+    ForumScraper.enqueue_threads_details()
+
+    serve_forum(threads_df, threads_details_df, port=server.port, error_rate=1.0)
+    ForumScraper.set_concurrency()
+    ForumScraper.set_rate_limit(rate=None, max_retries=0)
+
+    assert ForumScraper.run_worker(worker_id='worker', poll_seconds=0.05) == 0
+
+    with pytest.raises(RuntimeError, match='failed'):
+        ForumScraper.collect_threads_details()
+    assert ForumScraper.collect_threads_details(allow_failed=True).empty
+
+
+def test_queries_follow_the_saved_snapshot(serve_forum):
+    threads_df = build_threads()
+    threads_details_df = build_threads_details(threads_df)
+    server = serve_forum(threads_df, threads_details_df)
+    ForumScraper.cache_threads_details()
+
+    thread_id = threads_df.index[3]
+    assert ForumScraper.count_threads_details(filters={'thread_id': thread_id}) == \
+        len(threads_details_df.loc[thread_id])
+
+    threads_df, threads_details_df = add_posts(threads_df, threads_details_df, thread_id, 30)
+    serve_forum(threads_df, threads_details_df, port=server.port)
+    ForumScraper.set_concurrency()
+    ForumScraper.cache_threads_details()
+
+    # The changed snapshot is indexed again, its new posts paginated by date
+    queried_df = ForumScraper.query_threads_details(columns=['user_post'], filters={'thread_id': thread_id},
+                                                    order_by='user_post_date', descending=True, limit=10, offset=5)
+    assert queried_df['user_post'].tolist() == [f'New post {i}' for i in range(24, 14, -1)]
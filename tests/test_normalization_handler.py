@@ -0,0 +1,133 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from helpers.normalization_handler import NormalizationHandler
+
+NOW = pd.Timestamp('2021-08-15T10:00:00', tz='UTC')
+
+
+def expand_number_row_wise(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return np.nan
+
+    text = str(value).replace(',', '').strip().upper()
+    multiplier = {'K': 10 ** 3, 'M': 10 ** 6}.get(text[-1:], 1)
+
+    return float(round(float(text.rstrip('KM')) * multiplier))
+
+
+def parse_datetime_row_wise(value, date_format):
+    if value is None:
+        return pd.NaT
+
+    parsed = datetime.datetime.strptime(value, date_format)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+
+    return pd.Timestamp(parsed).tz_convert('UTC')
+
+
+def test_expand_numbers_matches_row_wise_conversion():
+    values = ['1.2K', '3M', '1,234', '0', '999', ' 12k ', '2.5m', '1,000,000', 7, None, np.nan]
+    series = pd.Series(values, dtype=object, name='views')
+
+    expanded = NormalizationHandler.expand_numbers(series)
+
+    pd.testing.assert_series_equal(expanded, pd.Series([expand_number_row_wise(value) for value in values],
+                                                       index=series.index, name='views'))
+    assert expanded.tolist()[:3] == [1200.0, 3000000.0, 1234.0]
+
+
+def test_expand_numbers_leaves_non_numbers_missing():
+    expanded = NormalizationHandler.expand_numbers(pd.Series(['1.2X', 'K', '', '1.2.3K'], dtype=object))
+
+    assert expanded.isna().all()
+
+
+def test_expand_numbers_keeps_the_index_of_repeated_values():
+    series = pd.Series(['1K', '2', '1K', None, '2'], index=[10, 11, 12, 13, 14], dtype=object)
+
+    expanded = NormalizationHandler.expand_numbers(series)
+
+    assert expanded.index.tolist() == [10, 11, 12, 13, 14]
+    np.testing.assert_array_equal(expanded.to_numpy(), [1000.0, 2.0, 1000.0, np.nan, 2.0])
+
+
+def test_parse_datetimes_matches_row_wise_iso_conversion():
+    values = ['2021-08-15T10:00:00+0000', '2021-08-15T12:30:00+0200', '2020-02-29T23:59:59-0500', None]
+    series = pd.Series(values, dtype=object)
+
+    parsed = NormalizationHandler.parse_datetimes(series)
+
+    expected = [parse_datetime_row_wise(value, NormalizationHandler.ISO_FORMAT) for value in values]
+    pd.testing.assert_series_equal(parsed, pd.Series(expected, dtype='datetime64[ns, UTC]'))
+
+
+def test_parse_datetimes_matches_row_wise_join_date_conversion():
+    values = ['Aug 15, 2021', 'Feb 29, 2020', None]
+    series = pd.Series(values, dtype=object)
+
+    parsed = NormalizationHandler.parse_datetimes(series, date_format=NormalizationHandler.JOIN_DATE_FORMAT)
+
+    expected = [parse_datetime_row_wise(value, NormalizationHandler.JOIN_DATE_FORMAT) for value in values]
+    pd.testing.assert_series_equal(parsed, pd.Series(expected, dtype='datetime64[ns, UTC]'))
+
+
+def test_parse_datetimes_keeps_parsed_datetimes():
+    value = datetime.datetime(2021, 8, 15, 10, tzinfo=datetime.timezone.utc)
+
+    parsed = NormalizationHandler.parse_datetimes(pd.Series([value, '2021-08-16T10:00:00+0000'], dtype=object))
+
+    assert parsed.tolist() == [pd.Timestamp(value), pd.Timestamp('2021-08-16T10:00:00', tz='UTC')]
+
+
+@pytest.mark.parametrize('value', ['not a date', '2021-13-45T10:00:00+0000'])
+def test_parse_datetimes_raises_on_unparseable_dates(value):
+    with pytest.raises(ValueError):
+        datetime.datetime.strptime(value, NormalizationHandler.ISO_FORMAT)
+
+    with pytest.raises(ValueError):
+        NormalizationHandler.parse_datetimes(pd.Series(['2021-08-15T10:00:00+0000', value], dtype=object))
+
+
+def test_derive_date_parts_matches_row_wise_conversion():
+    series = pd.Series(pd.to_datetime(['2021-08-15T10:00:00', '2020-02-29T23:59:59', None], utc=True))
+
+    parts = NormalizationHandler.derive_date_parts(series)
+
+    for part in ['year', 'month', 'day']:
+        expected = [np.nan if pd.isna(value) else getattr(value, part) for value in series]
+        np.testing.assert_array_equal(parts[part].to_numpy(dtype=float), np.array(expected, dtype=float))
+
+
+def test_derive_age_matches_row_wise_conversion_across_a_birthday():
+    # A year ago to the second, then one second short of it, then one second past it
+    values = ['2020-08-15T10:00:00', '2020-08-15T10:00:01', '2020-08-15T09:59:59', '2021-08-15T10:00:00',
+              '2021-08-14T10:00:01', '2000-01-01T00:00:00']
+    series = pd.Series(pd.to_datetime(values, utc=True))
+
+    ages = NormalizationHandler.derive_age(series, now=NOW)
+
+    assert ages.tolist() == [(NOW - value).days for value in series]
+    assert ages.tolist()[:5] == [365, 364, 365, 0, 0]
+
+
+def test_derive_age_leaves_missing_datetimes_missing():
+    series = pd.Series(pd.to_datetime(['2021-08-14T10:00:00', None], utc=True))
+
+    ages = NormalizationHandler.derive_age(series, now=NOW)
+
+    assert ages.iloc[0] == 1
+    assert pd.isna(ages.iloc[1])
+
+
+def test_truncate_text_matches_row_wise_conversion():
+    values = ['short', 'x' * 25, 'y' * 26, '']
+    series = pd.Series(values)
+
+    truncated = NormalizationHandler.truncate_text(series, 25)
+
+    assert truncated.tolist() == [(value[:25] + '..') if len(value) > 25 else value for value in values]
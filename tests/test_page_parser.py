@@ -0,0 +1,138 @@
+import os
+
+import pandas as pd
+import pytest
+
+from providers.forum_scraper import ForumScraper
+from providers.page_parser import PageParser
+from tests.fixtures.render_fixtures import render_fixtures
+
+pytest.importorskip('lxml')
+
+FIXTURES_DIRECTORY = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# The rendered pages are written by PageRenderer out of the saved threads, see tests/fixtures/render_fixtures.py
+THREADS_PAGES = ['threads_page.html', 'threads_page_edge_cases.html', 'rendered_threads_page.html']
+THREADS_DETAILS_PAGES = ['threads_details_page.html', 'threads_details_page_edge_cases.html',
+                         'rendered_threads_details_page.html']
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIRECTORY, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', THREADS_PAGES + THREADS_DETAILS_PAGES)
+def test_backends_return_identical_page_counts(name):
+    html = read_fixture(name)
+
+    assert PageParser.parse_pagination(html, backend='bs4') == PageParser.parse_pagination(html, backend='lxml')
+
+
+@pytest.mark.parametrize('name', THREADS_PAGES)
+def test_backends_return_identical_threads(name):
+    html = read_fixture(name)
+
+    rows = PageParser.parse_threads_page(html, backend='bs4')
+
+    assert rows
+    assert rows == PageParser.parse_threads_page(html, backend='lxml')
+
+
+@pytest.mark.parametrize('name', THREADS_DETAILS_PAGES)
+def test_backends_return_identical_posts(name):
+    html = read_fixture(name)
+
+    rows = PageParser.parse_threads_details_page(html, 42, backend='bs4')
+
+    assert rows
+    assert rows == PageParser.parse_threads_details_page(html, 42, backend='lxml')
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_parse_with_pagination_matches_separate_parses(backend):
+    html = read_fixture('threads_page.html')
+
+    assert PageParser.parse_with_pagination(html, PageParser.parse_threads_page, backend) == \
+           (39, PageParser.parse_threads_page(html, backend=backend))
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_parse_with_pagination_matches_separate_parses_of_posts(backend):
+    html = read_fixture('threads_details_page.html')
+
+    assert PageParser.parse_with_pagination(html, PageParser.parse_threads_details_page, 42, backend) == \
+           (7, PageParser.parse_threads_details_page(html, 42, backend=backend))
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_pagination_without_links_is_a_single_page(backend):
+    assert PageParser.parse_pagination(read_fixture('threads_page_edge_cases.html'), backend=backend) == 1
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_pagination_of_an_empty_page_is_a_single_page(backend):
+    assert PageParser.parse_pagination('', backend=backend) == 1
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_empty_user_extras_are_missing(backend):
+    guest, newcomer, regular = PageParser.parse_threads_details_page(
+        read_fixture('threads_details_page_edge_cases.html'), 42, backend=backend)
+
+    # user_join_date, user_messages and user_location
+    assert guest[7:10] == [None, None, None]
+    assert newcomer[7:10] == ['Jan 02, 2020', '12345', None]
+    assert regular[7:10] == ['Dec 31, 2019', '987', 'UK']
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_edge_case_threads(backend):
+    sticky, normal = PageParser.parse_threads_page(read_fixture('threads_page_edge_cases.html'), backend=backend)
+
+    assert sticky[0] == '501' and sticky[10:] == [True, True, '0', '1.2M']
+    assert sticky[6] is None
+    assert normal[0] == '777' and normal[3] is None and normal[12:] == ['1,234', '56.7K']
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        PageParser.parse_threads_page('', backend='regex')
+
+
+def test_rendered_fixtures_are_up_to_date():
+    for name, (_, html) in render_fixtures().items():
+        assert read_fixture(name) == html, f'{name} is outdated, run python -m tests.fixtures.render_fixtures'
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_rendered_threads_are_parsed_back(backend):
+    threads_df, _ = render_fixtures()['rendered_threads_page.html']
+    html = read_fixture('rendered_threads_page.html')
+
+    rows = [row + [0] for row in PageParser.parse_threads_page(html, backend=backend)]
+    parsed_df = ForumScraper._ForumScraper__to_threads_df(rows)
+
+    assert int(PageParser.parse_pagination(html, backend=backend)) == 40
+    assert parsed_df.index.tolist() == threads_df.index.tolist()
+    for column in ['poster_id', 'poster_name', 'last_replier_image', 'last_replied_date', 'title', 'is_sticky']:
+        assert parsed_df[column].astype(object).tolist() == threads_df[column].astype(object).tolist(), column
+
+    # Counters past a thousand are abbreviated, e.g. 1,234 replies shown as 1.2K
+    assert parsed_df['replies'].iloc[7] == 1200
+    assert parsed_df['views'].iloc[7] == 9000
+    assert (parsed_df['replies'] - threads_df['replies'].astype(int)).abs().max() <= 50
+
+
+@pytest.mark.parametrize('backend', PageParser.BACKENDS)
+def test_rendered_posts_are_parsed_back(backend):
+    threads_details_df, _ = render_fixtures()['rendered_threads_details_page.html']
+    html = read_fixture('rendered_threads_details_page.html')
+
+    thread_id = threads_details_df.index[0]
+    parsed_df = ForumScraper._ForumScraper__to_threads_details_df(
+        PageParser.parse_threads_details_page(html, thread_id, backend=backend))
+
+    assert int(PageParser.parse_pagination(html, backend=backend)) == 46
+    pd.testing.assert_frame_equal(parsed_df, threads_details_df, check_dtype=False, check_categorical=False,
+                                  check_index_type=False)
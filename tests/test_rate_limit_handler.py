@@ -0,0 +1,83 @@
+import pytest
+import requests
+
+from helpers.rate_limit_handler import RateLimitHandler
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = 'https://example.com/'
+
+
+def get_concurrency_after(outcome, initial_concurrency=8):
+    handler = RateLimitHandler(rate=None, max_retries=0, initial_concurrency=initial_concurrency,
+                               max_concurrency=16)
+
+    def request():
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    try:
+        handler.call(request)
+    except requests.RequestException:
+        pass
+
+    return handler.get_stats()['concurrency']
+
+
+@pytest.mark.parametrize('outcome', [
+    FakeResponse(429),
+    FakeResponse(429, {'Retry-After': '0'}),
+    FakeResponse(503, {'Retry-After': '0'}),
+    requests.Timeout(),
+])
+def test_overload_signals_halve_the_concurrency(outcome):
+    assert get_concurrency_after(outcome) == 4
+
+
+@pytest.mark.parametrize('outcome', [
+    FakeResponse(500),
+    FakeResponse(502),
+    FakeResponse(503),
+    FakeResponse(504),
+    FakeResponse(403),
+    requests.ConnectionError(),
+])
+def test_other_failures_keep_the_concurrency(outcome):
+    assert get_concurrency_after(outcome) == 8
+
+
+def test_concurrency_grows_after_consecutive_successes():
+    handler = RateLimitHandler(rate=None, initial_concurrency=1, max_concurrency=4, increase_after=3)
+
+    for _ in range(6):
+        handler.call(lambda: FakeResponse(200))
+
+    assert handler.get_stats()['concurrency'] == 3
+
+
+def test_server_errors_do_not_reset_the_successes():
+    handler = RateLimitHandler(rate=None, max_retries=0, initial_concurrency=1, max_concurrency=4, increase_after=2)
+
+    handler.call(lambda: FakeResponse(200))
+    with pytest.raises(requests.HTTPError):
+        handler.call(lambda: FakeResponse(500))
+    handler.call(lambda: FakeResponse(200))
+
+    assert handler.get_stats()['concurrency'] == 2
+
+
+def test_lowering_the_max_concurrency_lowers_the_concurrency():
+    handler = RateLimitHandler(rate=None, initial_concurrency=4, max_concurrency=4, increase_after=1)
+
+    handler.set_max_concurrency(2)
+    assert handler.get_stats()['concurrency'] == 2
+
+    handler.set_max_concurrency(3)
+    handler.call(lambda: FakeResponse(200))
+    handler.call(lambda: FakeResponse(200))
+
+    assert handler.get_stats()['concurrency'] == 3
@@ -0,0 +1,107 @@
+import sqlite3
+import time
+
+import pytest
+import requests
+
+from helpers.response_cache_handler import ResponseCacheHandler
+
+URL = 'https://example.com/threads/1/'
+
+
+def make_response(status_code, content=b'', headers=None):
+    response = requests.models.Response()
+    response.url = URL
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.encoding = 'utf-8'
+    response._content = content
+
+    return response
+
+
+class FakeServer:
+    def __init__(self, content=b'page', etag='"1"'):
+        self.content = content
+        self.etag = etag
+        self.requests = []
+
+    def fetch(self, headers):
+        self.requests.append(headers)
+
+        if self.etag is not None and headers.get('If-None-Match') == self.etag:
+            return make_response(304)
+
+        return make_response(200, self.content, {} if self.etag is None else {'ETag': self.etag})
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cached_responses.sqlite')
+
+
+def test_fresh_entries_are_served_without_requests(cache_path):
+    cache = ResponseCacheHandler(cache_path, ttl=60)
+    server = FakeServer()
+
+    assert cache.get(URL, server.fetch).content == b'page'
+    assert cache.get(URL, server.fetch).content == b'page'
+
+    assert len(server.requests) == 1
+    assert cache.get_stats()['cache_hits'] == 1
+
+
+def test_expired_entries_are_revalidated_with_their_etag(cache_path):
+    cache = ResponseCacheHandler(cache_path, ttl=0)
+    server = FakeServer()
+
+    cache.get(URL, server.fetch)
+    response = cache.get(URL, server.fetch)
+
+    assert server.requests[-1]['If-None-Match'] == '"1"'
+    assert (response.status_code, response.content) == (200, b'page')
+    assert cache.get_stats()['cache_revalidations'] == 1
+
+    server.content, server.etag = b'changed', '"2"'
+    assert cache.get(URL, server.fetch).content == b'changed'
+    assert cache.get_stats()['cache_misses'] == 2
+
+
+def test_always_revalidated_urls_ignore_the_ttl(cache_path):
+    cache = ResponseCacheHandler(cache_path, ttl=60, always_revalidate=r'/threads/')
+    server = FakeServer(etag=None)
+
+    cache.get(URL, server.fetch)
+    server.content = b'changed'
+
+    assert cache.get(URL, server.fetch).content == b'changed'
+    assert len(server.requests) == 2
+
+
+def test_offline_serves_expired_entries_and_fails_on_missing_ones(cache_path):
+    ResponseCacheHandler(cache_path, ttl=60).get(URL, FakeServer().fetch)
+    cache = ResponseCacheHandler(cache_path, ttl=0, offline=True)
+
+    def fetch(headers):
+        raise AssertionError('Offline mode must not touch the network')
+
+    assert cache.get(URL, fetch).content == b'page'
+    with pytest.raises(LookupError):
+        cache.get('https://example.com/threads/2/', fetch)
+
+
+def test_access_times_are_written_in_batches(cache_path):
+    cache = ResponseCacheHandler(cache_path, ttl=60)
+    cache.get(URL, FakeServer().fetch)
+
+    def read_accessed_at():
+        with sqlite3.connect(cache_path) as connection:
+            return connection.execute('SELECT accessed_at FROM responses').fetchone()[0]
+
+    stored_at = read_accessed_at()
+    time.sleep(0.01)
+    cache.get(URL, FakeServer().fetch)
+    assert read_accessed_at() == stored_at
+
+    cache.close()
+    assert read_accessed_at() > stored_at
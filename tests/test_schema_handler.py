@@ -0,0 +1,32 @@
+import warnings
+
+import pandas as pd
+
+from helpers.schema_handler import SchemaHandler
+
+
+def compact_index(index):
+    threads_df = pd.DataFrame({'replies': range(len(index))}, index=pd.Index(index, dtype=object))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        return SchemaHandler.compact(threads_df, 'threads').index
+
+
+def test_numeric_ids_are_converted_to_numbers():
+    index = compact_index(['10', '11', 12])
+
+    assert index.tolist() == [10, 11, 12]
+    assert pd.api.types.is_integer_dtype(index)
+    assert index.name == 'thread_id'
+
+
+def test_ids_which_are_not_all_numbers_are_kept():
+    assert compact_index(['10', 'abc']).tolist() == ['10', 'abc']
+
+
+def test_missing_ids_do_not_prevent_the_conversion():
+    index = compact_index(['10', None])
+
+    assert index[0] == 10
+    assert pd.isna(index[1])
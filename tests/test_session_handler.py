@@ -0,0 +1,21 @@
+from helpers.session_handler import SessionHandler
+from providers.mock_forum_server import MockForumServer
+from tests.conftest import build_threads, build_threads_details
+
+
+def test_handshakes_are_counted_since_the_last_reset():
+    threads_df = build_threads(count=2)
+    server = MockForumServer(threads_df, build_threads_details(threads_df))
+    url = f'{server.start()}threads/{threads_df.index[0]}/'
+    session_handler = SessionHandler(pool_size=1)
+
+    try:
+        session_handler.get(url)
+        assert session_handler.get_stats()['handshakes'] == 1
+
+        session_handler.reset_stats()
+        session_handler.get(url)
+        assert session_handler.get_stats()['handshakes'] == 0
+    finally:
+        session_handler.close()
+        server.stop()
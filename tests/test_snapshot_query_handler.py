@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from helpers.snapshot_query_handler import SnapshotQueryHandler
+from tests.conftest import build_threads, build_threads_details
+
+
+@pytest.fixture
+def threads_details_df():
+    threads_details_df = build_threads_details(build_threads())
+    # Scraped dates are to the second, whereas the stored ones are truncated to the microsecond
+    threads_details_df['user_post_date'] = threads_details_df['user_post_date'].dt.floor('s')
+
+    return threads_details_df
+
+
+@pytest.fixture
+def store(tmp_path, threads_details_df):
+    store = SnapshotQueryHandler(str(tmp_path / 'cached_snapshots.sqlite'))
+    store.build('threads_details', threads_details_df, version=[1], chunk_rows=50)
+
+    yield store
+
+    store.close()
+
+
+def assert_rows_equal(queried_df, expected_df):
+    pd.testing.assert_frame_equal(queried_df, expected_df, check_dtype=False, check_categorical=False,
+                                  check_index_type=False)
+
+
+def test_filters_match_the_dataframe(store, threads_details_df):
+    thread_ids = threads_details_df.index.unique()[[1, 4]].tolist()
+    since, until = threads_details_df['user_post_date'].quantile([0.25, 0.75])
+
+    queried_df = store.query('threads_details', filters={'thread_id': thread_ids}, since=since, until=until,
+                             limit=None)
+
+    dates = threads_details_df['user_post_date']
+    expected_df = threads_details_df[threads_details_df.index.isin(thread_ids) & (dates >= since) & (dates < until)]
+    assert_rows_equal(queried_df, expected_df)
+    assert store.count('threads_details', filters={'thread_id': thread_ids}, since=since, until=until) == \
+        len(expected_df)
+
+
+def test_pages_cover_the_ordered_rows_once(store, threads_details_df):
+    pages = [store.query('threads_details', columns=['user_post_date'], order_by='user_post_date', descending=True,
+                         limit=30, offset=offset)
+             for offset in range(0, len(threads_details_df), 30)]
+
+    expected_df = threads_details_df[['user_post_date']].sort_values('user_post_date', ascending=False,
+                                                                      kind='stable')
+    assert [len(page_df) for page_df in pages[:-1]] == [30] * (len(pages) - 1)
+    assert_rows_equal(pd.concat(pages), expected_df)
+
+
+def test_missing_values_and_unknown_columns(store, threads_details_df):
+    assert len(store.query('threads_details', filters={'user_location': None}, limit=None)) == \
+        threads_details_df['user_location'].isna().sum()
+    assert store.query('threads_details', filters={'thread_id': []}).empty
+
+    with pytest.raises(ValueError):
+        store.query('threads_details', filters={'unknown': 1})
+    with pytest.raises(ValueError):
+        store.query('threads_details', order_by='unknown')
+
+
+def test_rebuilding_replaces_the_rows_and_the_version(store, threads_details_df):
+    store.build('threads_details', threads_details_df.iloc[:10], version=[2])
+
+    assert store.get_version('threads_details') == [2]
+    assert store.count('threads_details') == 10
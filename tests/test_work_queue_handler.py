@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from helpers.work_queue_handler import WorkQueueHandler
+
+
+@pytest.fixture
+def work_queue(tmp_path):
+    work_queue = WorkQueueHandler(str(tmp_path / 'crawl_queue.sqlite'), lease_seconds=0.2, max_attempts=2)
+    work_queue.enqueue([(f'page-{i}', {'order': i}) for i in range(3)])
+
+    yield work_queue
+
+    work_queue.discard()
+
+
+def test_leased_units_are_claimed_again_once_their_lease_expires(work_queue):
+    assert [key for key, _ in work_queue.claim('crashed', limit=2)] == ['page-0', 'page-1']
+    assert [key for key, _ in work_queue.claim('worker', limit=3)] == ['page-2']
+    work_queue.complete('worker', 'page-2', [])
+    assert work_queue.get_stats()['leased'] == 2
+
+    time.sleep(0.3)
+    assert work_queue.get_stats()['expired'] == 2
+    assert [key for key, _ in work_queue.claim('worker', limit=3)] == ['page-0', 'page-1']
+
+    # The crashed worker's late completion is kept, since it parsed the same rows
+    assert work_queue.complete('crashed', 'page-0', [[1]])
+    assert not work_queue.complete('worker', 'page-0', [[2]])
+    assert work_queue.load_results()[0] == ('page-0', {'order': 0}, [[1]])
+
+
+def test_units_claimed_max_attempts_times_fail(work_queue):
+    for _ in range(2):
+        work_queue.claim('worker', limit=1)
+        work_queue.release('worker', ['page-0'])
+
+    assert work_queue.get_stats()['failed'] == 1
+    assert [key for key, _ in work_queue.claim('worker', limit=3)] == ['page-1', 'page-2']
+
+    for key in ['page-1', 'page-2']:
+        work_queue.complete('worker', key, [])
+
+    assert work_queue.is_finished()
+    assert work_queue.get_stats() == {'pending': 0, 'leased': 0, 'expired': 0, 'done': 2, 'failed': 1}
+
+
+def test_units_enqueued_again_are_kept_as_they_are(work_queue):
+    work_queue.complete('worker', 'page-0', [])
+
+    assert work_queue.enqueue([('page-0', {'order': 0}), ('page-3', {'order': 3})]) == 1
+    assert work_queue.get_stats()['done'] == 1